@@ -0,0 +1,72 @@
+"""
+Builds the award search index over synthetic awards and reports build time and query latency
+for term, phrase and prefix queries.
+
+Run from the repository root:
+    python -m benchmarks.award_search --awards 300000 --repeats 50
+"""
+import argparse
+import itertools
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from utils.award_index import AwardSearchIndex
+
+VOCABULARY = [
+    "digital", "platform", "cloud", "migration", "services", "support", "maintenance", "data", "analytics",
+    "security", "network", "software", "licence", "consultancy", "framework", "agile", "delivery", "hosting",
+    "infrastructure", "application", "development", "training", "health", "transport", "education", "housing",
+    "legal", "finance", "recruitment", "facilities", "catering", "cleaning", "construction", "design", "research",
+]
+QUERIES = ["cloud migration", '"digital platform"', "digit*", "security", '"data analytics" platform', "infra*"]
+
+
+def synthetic_awards(count: int, vocabulary_size: int) -> pd.DataFrame:
+    """
+    Awards whose words follow a Zipf distribution, like real text: the domain words above are
+    spread through a larger vocabulary of filler words so no single term matches every award.
+    """
+    rng = random.Random(42)
+    words = [f"w{i}" for i in range(vocabulary_size)]
+    for position, word in zip(range(3, vocabulary_size, vocabulary_size // len(VOCABULARY)), VOCABULARY):
+        words[position] = word
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(vocabulary_size)))
+    return pd.DataFrame({
+        "Award ID": [f"award-{i}" for i in range(count)],
+        "Award Year": [rng.choice([2024, 2025, 2026]) for _ in range(count)],
+        "Tender Title": [" ".join(rng.choices(words, cum_weights=cum_weights, k=8)) for _ in range(count)],
+        "Award Description": [" ".join(rng.choices(words, cum_weights=cum_weights, k=40)) for _ in range(count)],
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--awards", type=int, default=300_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    df = synthetic_awards(args.awards, args.vocabulary)
+    with tempfile.TemporaryDirectory() as tmp:
+        index = AwardSearchIndex(Path(tmp) / "award_index.sqlite")
+        started = time.perf_counter()
+        index.upsert(df)
+        print(f"indexed {len(index)} awards in {time.perf_counter() - started:.1f}s")
+
+        for query in QUERIES:
+            timings = []
+            for _ in range(args.repeats):
+                started = time.perf_counter()
+                hits, total = index.search(query, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+            print(f"{query!r:30} {total:>8} matches  median {statistics.median(timings):7.2f} ms  "
+                  f"max {max(timings):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compares Companies House request latency with a fresh client per request (the old
+behaviour) against the shared pooled client.
+
+Run from the repository root with COMPANIES_HOUSE_API_KEY set:
+    python -m benchmarks.companies_house_latency --company-number 06591591 --requests 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from utils.companies_house_API import companies_house, build_http_client
+
+
+async def time_requests(company_number: str, n_requests: int, pooled: bool) -> list[float]:
+    # The response cache is bypassed so that every request goes to the API.
+    timings = []
+    shared_client = build_http_client() if pooled else None
+    try:
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            if pooled:
+                await companies_house(client=shared_client).get_company_information_async(
+                    company_number=company_number, use_cache=False)
+            else:
+                async with httpx.AsyncClient() as client:
+                    await companies_house(client=client).get_company_information_async(
+                        company_number=company_number, use_cache=False)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        if shared_client is not None:
+            await shared_client.aclose()
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    print(f"{label:<22} mean {statistics.mean(timings):8.1f} ms   "
+          f"median {statistics.median(timings):8.1f} ms   "
+          f"first {timings[0]:8.1f} ms   total {sum(timings):9.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--company-number", default="06591591")
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    report("client per request", await time_requests(args.company_number, args.requests, pooled=False))
+    report("shared pooled client", await time_requests(args.company_number, args.requests, pooled=True))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
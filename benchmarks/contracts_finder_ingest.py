@@ -0,0 +1,92 @@
+"""
+Runs the Contracts Finder ingestion engine against a local stand-in server and reports
+pages/sec for sequential (one interval at a time) and concurrent fetching.
+
+The stand-in serves fake OCDS search pages with links.next chains, a fixed per-request
+latency and an optional rate of transient 503 errors, so no network access is needed.
+
+Run from the repository root:
+    python -m benchmarks.contracts_finder_ingest --days 30 --pages-per-interval 3 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from utils.contracts_finder_API import ContractsFinderIngestor, SEARCH_PATH, date_intervals
+
+
+def make_handler(pages_per_interval: int, releases_per_page: int, latency: float, error_rate: float):
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if random.random() < error_rate:
+                self.send_response(503)
+                self.end_headers()
+                return
+
+            parsed = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+            page = int(query.get("page", 0))
+            releases = [
+                {"ocid": f"ocds-{query['publishedFrom']}-{page}-{i}", "awards": [{"id": f"{page}-{i}"}]}
+                for i in range(releases_per_page)
+            ]
+            body = {"releases": releases, "links": {}}
+            if page + 1 < pages_per_interval:
+                next_query = urlencode(dict(query, page=page + 1))
+                body["links"]["next"] = f"http://{self.headers['Host']}{SEARCH_PATH}?{next_query}"
+
+            payload = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+async def run(base_url: str, intervals, max_concurrency: int) -> str:
+    releases = []
+    ingestor = ContractsFinderIngestor(base_url=base_url, max_concurrency=max_concurrency,
+                                       requests_per_window=10_000, window_seconds=1.0, backoff_base=0.05)
+    stats = await ingestor.run(intervals, on_page=lambda interval, page: releases.extend(page))
+    return stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--day-interval", type=int, default=1)
+    parser.add_argument("--pages-per-interval", type=int, default=3)
+    parser.add_argument("--releases-per-page", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="fraction of requests answered with 503")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.pages_per_interval, args.releases_per_page,
+                                                                args.latency, args.error_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    end = date.today()
+    intervals = date_intervals(end - timedelta(days=args.days - 1), end, args.day_interval)
+    try:
+        print(f"sequential:           {asyncio.run(run(base_url, intervals, max_concurrency=1))}")
+        print(f"concurrent (x{args.concurrency}):     {asyncio.run(run(base_url, intervals, max_concurrency=args.concurrency))}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
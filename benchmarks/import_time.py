@@ -0,0 +1,72 @@
+"""
+Tracks MCP server start-up cost: imports server.py in fresh interpreters with -X importtime and reports
+the total import time, the slowest top-level imports, and any heavy dependency loaded at start-up.
+Those are meant to be imported by the first tool call that needs them, so the script exits with an
+error if one is loaded, or if the median import time exceeds --budget.
+
+Run from the repository root:
+    python -m benchmarks.import_time [--repeats 5 --budget 2.0]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFERRED_MODULES = ["pandas", "pyarrow", "numpy", "rapidfuzz", "langchain", "langchain_core", "langchain_community",
+                    "langchain_google_genai", "faiss", "pytesseract", "pdf2image", "pypdfium2", "transformers"]
+
+
+def import_server() -> dict:
+    """
+    Imports server.py in a new interpreter and returns {module: (self_us, cumulative_us, depth)}.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import server"], cwd=REPO_ROOT,
+                            capture_output=True, text=True, check=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=None, help="fail if the median import takes longer (seconds)")
+    args = parser.parse_args()
+
+    import_server()  # writes the .pyc files, so the runs below are comparable
+    runs = [import_server() for _ in range(args.repeats)]
+    totals = [run["server"][1] / 1e6 for run in runs]
+    median = statistics.median(totals)
+    print(f"import server: median {median:.3f}s  min {min(totals):.3f}s  max {max(totals):.3f}s  ({args.repeats} runs)")
+
+    last = runs[-1]
+    # Modules imported by server.py and by the modules it imports directly.
+    nearest = sorted(((cumulative, name) for name, (_, cumulative, depth) in last.items() if 1 <= depth <= 2),
+                     reverse=True)[:args.top]
+    print("\nslowest imports (cumulative):")
+    for cumulative, name in nearest:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = [name for name in DEFERRED_MODULES if name in last]
+    failed = False
+    if loaded:
+        print(f"\nheavy dependencies imported at start-up: {loaded}")
+        failed = True
+    if args.budget is not None and median > args.budget:
+        print(f"\nmedian import time {median:.3f}s is over the {args.budget:.3f}s budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\nno heavy dependencies imported at start-up")
+
+
+if __name__ == "__main__":
+    main()
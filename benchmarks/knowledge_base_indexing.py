@@ -0,0 +1,67 @@
+"""
+Benchmarks knowledge-base indexing and retrieval offline, with a local embedding backend:
+a cold index, a no-op sync, adding one PDF, a full rebuild against a warm embedding cache,
+and similarity-search latency.
+
+Run from the repository root:
+    python -m benchmarks.knowledge_base_indexing --pdfs 20 --pages 10 --backend hashing
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.pdf_text_extraction import generate_sample
+from utils.embeddings import CachedEmbeddings, EmbeddingCache, build_embedding_backend
+from utils.retreival_augmented_generation import sync_vector_store_async
+
+QUERIES = ["turnover for the year", "directors recommend a dividend", "pounds", "annual accounts"]
+
+
+def timed(label: str, coroutine, embeddings: CachedEmbeddings):
+    hits, misses = embeddings.cache.hits, embeddings.cache.misses
+    started = time.perf_counter()
+    vector_store, stats = asyncio.run(coroutine)
+    print(f"{label:28} {time.perf_counter() - started:7.2f}s  chunks indexed {stats['chunks_embedded']:5}  "
+          f"embedding cache hits {embeddings.cache.hits - hits:5}  backend calls for {embeddings.cache.misses - misses:5} texts")
+    return vector_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--backend", default="hashing", help="hashing, test or transformers")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs, index = Path(tmp) / "docs", Path(tmp) / "faiss_index"
+        docs.mkdir()
+        for i in range(args.pdfs):
+            generate_sample(docs / f"filing_{i:03d}.pdf", text_pages=args.pages, scanned_pages=0,
+                            first_line=i * args.pages * 40)
+        embeddings = CachedEmbeddings(build_embedding_backend(args.backend), EmbeddingCache(Path(tmp) / "cache.sqlite"))
+
+        timed("cold index", sync_vector_store_async(docs, index, embeddings), embeddings)
+        timed("no-op sync", sync_vector_store_async(docs, index, embeddings), embeddings)
+        generate_sample(docs / "filing_new.pdf", text_pages=args.pages, scanned_pages=0,
+                        first_line=args.pdfs * args.pages * 40)
+        timed("add one PDF", sync_vector_store_async(docs, index, embeddings), embeddings)
+        vector_store = timed("full rebuild, warm cache", sync_vector_store_async(docs, index, embeddings, full_rebuild=True),
+                             embeddings)
+
+        timings = []
+        for _ in range(args.repeats):
+            for query in QUERIES:
+                started = time.perf_counter()
+                vector_store.similarity_search(query, k=5)
+                timings.append((time.perf_counter() - started) * 1000)
+        print(f"similarity search (k=5)      median {statistics.median(timings):.2f} ms  max {max(timings):.2f} ms "
+              f"over {len(vector_store.index_to_docstore_id)} chunks")
+
+
+if __name__ == "__main__":
+    main()
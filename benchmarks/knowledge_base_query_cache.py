@@ -0,0 +1,92 @@
+"""
+Replays an agent-like session of knowledge-base searches, where a few questions are asked many times with
+small variations (case, spacing, trailing punctuation, different k), with and without the result and query
+embedding caches. A remote embedding API is simulated by adding a delay to every query embedding.
+
+Run from the repository root:
+    python -m benchmarks.knowledge_base_query_cache --calls 500 --questions 40 --embedding-latency-ms 150
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.pdf_text_extraction import generate_sample
+from utils.document_store import DocumentStore
+from utils.embeddings import CachedEmbeddings, EmbeddingCache, HashingEmbeddings
+from utils.query_cache import VersionedLRUCache
+from utils.retreival_augmented_generation import KnowledgeBaseTool
+
+VARIANTS = [str, str.lower, str.upper, lambda q: q + "?", lambda q: "  " + q.replace(" ", "  ")]
+
+
+class SlowQueryEmbeddings(HashingEmbeddings):
+    """
+    Hashing embeddings with a fixed delay per query, standing in for an embedding API round trip.
+    """
+    def __init__(self, latency_seconds: float):
+        super().__init__()
+        self.latency_seconds = latency_seconds
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(self.latency_seconds)
+        return super().embed_query(text)
+
+
+def session(questions: list[str], calls: int, seed: int = 0) -> list[tuple[str, int]]:
+    # Earlier questions are asked more often, as an agent keeps returning to its main topic.
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(questions) + 1)]
+    return [(rng.choice(VARIANTS)(rng.choices(questions, weights)[0]), rng.choice([3, 5, 5, 10])) for _ in range(calls)]
+
+
+def replay(kb: KnowledgeBaseTool, calls: list[tuple[str, int]], label: str):
+    timings = []
+    for query, k in calls:
+        started = time.perf_counter()
+        kb.search(query, k=k)
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f"{label:16} total {sum(timings) / 1000:7.2f}s  median {statistics.median(timings):7.2f} ms  "
+          f"p95 {sorted(timings)[int(len(timings) * 0.95)]:7.2f} ms")
+    return kb.status()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdfs", type=int, default=10)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--questions", type=int, default=40)
+    parser.add_argument("--embedding-latency-ms", type=float, default=150.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        docs = Path(tmp) / "docs"
+        docs.mkdir()
+        for i in range(args.pdfs):
+            generate_sample(docs / f"filing_{i:03d}.pdf", text_pages=args.pages, scanned_pages=0,
+                            first_line=i * args.pages * 40)
+        kb = KnowledgeBaseTool(index_directory=Path(tmp), index_file="faiss_index", docs_directory=docs,
+                               document_store=DocumentStore(Path(tmp) / "filings"))
+        kb.embeddings = CachedEmbeddings(SlowQueryEmbeddings(args.embedding_latency_ms / 1000),
+                                         EmbeddingCache(Path(tmp) / "cache.sqlite"))
+        asyncio.run(kb.refresh_async())
+
+        rng = random.Random(1)
+        figures = rng.sample(range(args.pdfs * args.pages * 40), args.questions)
+        calls = session([f"What turnover of {figure},000 pounds was reported" for figure in figures], args.calls)
+
+        cached = replay(kb, calls, "with caches")
+        kb.result_cache, kb.query_embedding_cache = VersionedLRUCache(0), VersionedLRUCache(0)
+        replay(kb, calls, "without caches")
+        for name in ("result_cache", "query_embedding_cache"):
+            stats = cached[name]
+            print(f"{name:22} hit rate {stats['hit_rate']:6.1%}  entries {stats['entries']:4}  "
+                  f"seconds saved {stats['seconds_saved']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares text-layer-first extraction (extract_pdf_text) with OCR of every page (ocr_pdf) on sample
+documents, reporting time, pages/sec and how many pages each path had to OCR.
+
+Without paths, the PDFs in data/ are used; if there are none, a sample document is generated with
+text-layer pages and image-only (scanned) pages. The OCR path needs the tesseract and poppler binaries.
+
+Run from the repository root:
+    python -m benchmarks.pdf_text_extraction [path/to/file.pdf ...] [--text-pages 20 --scanned-pages 4]
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import pypdfium2 as pdfium
+from PIL import Image, ImageDraw
+
+from utils.file_reader import DATA_DIR
+from utils.pdf_ocr import extract_pdf_text, ocr_pdf
+
+LINE = "Turnover for the year was {n},000 pounds and the directors recommend no dividend."
+
+
+def _text_pdf(pages: int, first_line: int = 0) -> bytes:
+    """
+    A minimal PDF with a Helvetica text layer on every page, written by hand to avoid a PDF-writing dependency.
+    """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        lines = " ".join(f"({LINE.format(n=first_line + page * 40 + i)}) Tj 0 -16 Td" for i in range(40))
+        stream = f"BT /F1 10 Tf 40 800 Td {lines} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    body, offsets = b"%PDF-1.4\n", []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return body
+
+
+def generate_sample(path: Path, text_pages: int, scanned_pages: int, first_line: int = 0):
+    """
+    Writes a PDF with text_pages text-layer pages followed by scanned_pages image-only pages.
+    Samples generated with different first_line values have different text.
+    """
+    pdf = pdfium.PdfDocument(_text_pdf(text_pages, first_line))
+    if scanned_pages:
+        images = []
+        for page in range(scanned_pages):
+            image = Image.new("L", (1240, 1754), 255)
+            draw = ImageDraw.Draw(image)
+            for i in range(40):
+                draw.text((80, 80 + i * 40), LINE.format(n=first_line + (text_pages + page) * 40 + i), fill=0)
+            images.append(image)
+        scanned_path = path.with_suffix(".scanned.pdf")
+        images[0].save(scanned_path, save_all=True, append_images=images[1:], resolution=150)
+        pdf.import_pages(pdfium.PdfDocument(str(scanned_path)))
+    pdf.save(str(path))
+
+
+def run(path: Path):
+    print(f"\n{path.name}")
+    text_first = extract_pdf_text(path)
+    print(f"  text layer first: {text_first.timing_summary()}")
+    ocr_only = ocr_pdf(path)
+    print(f"  OCR every page:   {ocr_only.timing_summary()}")
+    if text_first.seconds:
+        print(f"  speed-up: {ocr_only.seconds / text_first.seconds:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", type=Path)
+    parser.add_argument("--text-pages", type=int, default=20, help="text-layer pages of the generated sample")
+    parser.add_argument("--scanned-pages", type=int, default=4, help="image-only pages of the generated sample")
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(DATA_DIR.glob("*.pdf"))
+    with tempfile.TemporaryDirectory() as tmp:
+        if not paths:
+            sample = Path(tmp) / "sample_accounts.pdf"
+            generate_sample(sample, args.text_pages, args.scanned_pages)
+            paths = [sample]
+        for path in paths:
+            run(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Measures MCP server cold start: the time from launching server.py to the first served request
+(initialize + list_tools), and to the knowledge base answering instead of reporting "warming up".
+
+The server is started on its configured port with the given embedding backend, so no network access
+is needed with the hashing or test backends.
+
+Run from the repository root:
+    python -m benchmarks.server_cold_start --backend hashing
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+from utils.mcp_instance import mcp
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Every poll opens a new client session; keep its request logging out of the results.
+for name in ("httpx", "mcp.client.streamable_http"):
+    logging.getLogger(name).setLevel(logging.WARNING)
+
+
+async def first_request(url: str) -> tuple[int, str]:
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            tools = await session.list_tools()
+            result = await session.call_tool("retrieve_from_knowledge_base", {"query": "turnover"})
+            return len(tools.tools), json.loads(result.content[0].text).get("status", "success")
+
+
+async def knowledge_base_status(url: str) -> str:
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            result = await session.call_tool("retrieve_from_knowledge_base", {"query": "turnover"})
+            return json.loads(result.content[0].text).get("status", "success")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default=os.getenv("EMBEDDINGS_BACKEND", "hashing"))
+    parser.add_argument("--timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    url = f"http://127.0.0.1:{mcp.settings.port}{mcp.settings.streamable_http_path}"
+    env = dict(os.environ, EMBEDDINGS_BACKEND=args.backend)
+    started = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "server.py"], cwd=REPO_ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if server.poll() is not None:
+                raise SystemExit(f"server.py exited with code {server.returncode}")
+            try:
+                tool_count, status = asyncio.run(first_request(url))
+                break
+            except Exception:
+                if time.perf_counter() - started > args.timeout:
+                    raise SystemExit("timed out waiting for the server")
+                time.sleep(0.05)
+        print(f"first served request:   {time.perf_counter() - started:6.2f}s  ({tool_count} tools, knowledge base: {status})")
+
+        while status == "warming_up" and time.perf_counter() - started < args.timeout:
+            time.sleep(0.25)
+            status = asyncio.run(knowledge_base_status(url))
+        print(f"knowledge base {status}:  {time.perf_counter() - started:6.2f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,176 +1,175 @@
-import requests
-import time
-from datetime import date, timedelta, datetime
-from typing import Optional, List, Dict, Any
+import argparse
+import asyncio
+from datetime import date
+from pathlib import Path
+from typing import Optional
 import pandas as pd
 
+from utils import contracts_store
+from utils.award_index import get_award_index
+from utils.companies_house_API import get_companies_house, http_client_lifespan
+from utils.entity_resolution import RESOLUTION_SETTINGS, get_supplier_resolver
+from utils.contract_records import flatten_releases
+from utils.contracts_finder_API import ContractsFinderIngestor, date_intervals
+from utils.ingest_checkpoint import IngestCheckpoint
 
-BASE_URL = "https://www.contractsfinder.service.gov.uk"
 
-def get_all_contracts(
-    publishedFrom: Optional[str] = None, 
-    publishedTo: Optional[str] = None, 
-    stage: str = "awarded", 
-    size: int = 100
-) -> List[Dict[str, Any]]:
-    
-    # Start with the initial search URL
-    next_url = f"{BASE_URL}/Published/Notices/OCDS/Search"
-    
-    all_results = []
-    
-    # Define the initial parameters, including 'size'
-    params = {"stage": stage, "size": size}
-    if publishedFrom: 
-        params["publishedFrom"] = publishedFrom
-    if publishedTo: 
-        params["publishedTo"] = publishedTo
-    
-    # This flag ensures the initial 'params' are only used once
-    is_first_request = True
-
-    while next_url:
-        try:
-            # For the first request, send the parameters. 
-            # For subsequent requests, the full URL provided by the API has everything it needs.
-            if is_first_request:
-                response = requests.get(next_url, params=params)
-                is_first_request = False
-            else:
-
-                response = requests.get(next_url)
-
-            response.raise_for_status()
-            data = response.json()
-            
-            # Get the list of contracts from the 'releases' key
-            releases_on_page = data.get("releases", [])
-            all_results.extend(releases_on_page)
-            
-
-            # Get the 'links' dictionary, and then get the 'next' URL from inside it. I have to use this because each API call only retrieves 100 results but there can be more.
-            #The additional results/releases above the 100max can be found using the next_url... keep finding them until all data is retrieved.
-            next_url = data.get('links', {}).get('next')
-            
-            # The loop will automatically stop when 'next_url' becomes None.
-            
-            time.sleep(0.5)
-
-        except requests.exceptions.RequestException as e:
-            print(f"An error occurred: {e}")
-            break # Stop on any network or HTTP error
-            
-    return all_results
-
-
-def fetch_contracts_by_interval(start_date_str: str = "2025-01-01", day_interval: int = 1) -> List[Dict[str, Any]]:
-    """
-    Fetches all awarded contracts from a start date, in chunks of a given day interval.
-    
-    Args:
-        start_date_str: The start date in "YYYY-MM-DD" format.
-        day_interval: The number of days for each fetching interval (e.g., 7 for weekly).
-    """
-    try:
-        current_interval_start = date.fromisoformat(start_date_str)
-    except ValueError:
-        print("Error: start_date_str must be in YYYY-MM-DD format.")
-        return []
-
-    today = date.today()
-    all_contracts = []
-
-
-    while current_interval_start <= today:
-
-        interval_end_date = current_interval_start + timedelta(days=day_interval - 1)
-
-        if interval_end_date > today:
-            interval_end_date = today
-
-        start_str_for_api = current_interval_start.strftime("%Y-%m-%d")
-        end_str_for_api = interval_end_date.strftime("%Y-%m-%d")
+DATA_DIR = Path(__file__).resolve().parent / "data"
+LEGACY_CONTRACTS_FILE = DATA_DIR / "from_jan_govt_contracts.csv"
+CHECKPOINT_FILE = DATA_DIR / "contracts_checkpoint.json"
+STAGING_DIR = DATA_DIR / "contracts_staging"
+INITIAL_START_DATE = "2025-01-01"
+# Staged pages read into memory at once when merging into the contracts store.
+MERGE_BATCH_FILES = 50
 
-        print(f"--- Fetching contracts for interval: {start_str_for_api} to {end_str_for_api} ---")
-        contracts_in_interval = get_all_contracts(publishedFrom=start_str_for_api, publishedTo=end_str_for_api, stage="awarded")
-        
-        if contracts_in_interval:
-            all_contracts.extend(contracts_in_interval)
-            print(f"  ... found {len(contracts_in_interval)} contracts in this interval.")
-        else:
-            print("  ... found 0 contracts in this interval.")
-        
-        print(f"  Total contracts so far: {len(all_contracts)}\n")
-        current_interval_start += timedelta(days=day_interval)
-        
-        time.sleep(1)
+# Normalised tables. Awards go to the partitioned dataset, the others to keyed tables (see contracts_store.TABLE_KEYS).
+TABLES = ["awards", "parties", "suppliers"]
 
-    print(f"Finished! A total of {len(all_contracts)} contracts were fetched.")
-    return all_contracts
-
-#-------------- Generating file---------
-all_contracts_since_jan = fetch_contracts_by_interval(start_date_str = "2025-01-01", day_interval = 2)
-
-contracts_df = pd.DataFrame(all_contracts_since_jan)
-
-contracts_df = contracts_df.explode('awards').reset_index(drop=True)
-contracts_df = contracts_df.explode('parties').reset_index(drop=True)
-contracts_df['Tender ID'] = contracts_df['tender'].apply(lambda x: x.get('id') if isinstance(x, dict) else None)
-contracts_df['Tender Title'] = contracts_df['tender'].apply(lambda x: x.get('title') if isinstance(x, dict) else None)
-contracts_df['Party ID'] = contracts_df['parties'].apply(lambda x: x.get('id') if isinstance(x, dict) else None)
-contracts_df['Party Name'] = contracts_df['parties'].apply(lambda x: x.get('name') if isinstance(x, dict) else None)
-contracts_df['Buyer ID'] = contracts_df['buyer'].apply(lambda x: x.get('id') if isinstance(x, dict) else None)
-contracts_df['Buyer Name'] = contracts_df['buyer'].apply(lambda x: x.get('name') if isinstance(x, dict) else None)
-
-contracts_df['Award ID'] = contracts_df['awards'].apply(lambda x: x.get('id') if isinstance(x, dict) else None)
-contracts_df['Award Status'] = contracts_df['awards'].apply(lambda x: x.get('status') if isinstance(x, dict) else None)
-contracts_df['Award Date'] = contracts_df['awards'].apply(lambda x: x.get('date') if isinstance(x, dict) else None)
-contracts_df['Award Date Published'] = contracts_df['awards'].apply(lambda x: x.get('datePublished') if isinstance(x, dict) else None)
-contracts_df['Award Value'] = contracts_df['awards'].apply(lambda x: x.get('value', {}).get('amount') if isinstance(x, dict) else None)
-contracts_df['Award Currency'] = contracts_df['awards'].apply(lambda x: x.get('value', {}).get('currency') if isinstance(x, dict) else None)
 
+def merge_staged_pages(checkpoint: IngestCheckpoint, staging_dir: Path = STAGING_DIR, batch_files: int = MERGE_BATCH_FILES):
+    """
+    Upserts every staged page into the Parquet contracts store, then advances the checkpoint watermark.
 
-contracts_df['Supplier ID'] = contracts_df['awards'].apply(lambda x: x.get('suppliers', [{}])[0].get('id') if isinstance(x, dict) else None)
-contracts_df['Supplier Name'] = contracts_df['awards'].apply(lambda x: x.get('suppliers', [{}])[0].get('name') if isinstance(x, dict) else None)
+    Pages are merged batch_files at a time, oldest first, so memory is bounded by the batch rather than
+    by the number of pages staged. Each batch's files are deleted once its rows are in the store; upserts
+    are keyed, so a batch re-merged after a crash does not duplicate rows.
+    """
+    for table in TABLES:
+        staged_files = sorted((staging_dir / table).glob("*.pkl"))
+        merged_rows, partition_writes = 0, 0
+        for start in range(0, len(staged_files), batch_files):
+            batch = staged_files[start:start + batch_files]
+            staged_dfs = [df for df in (pd.read_pickle(staged_file) for staged_file in batch) if not df.empty]
+            if staged_dfs:
+                new_df = pd.concat(staged_dfs, ignore_index=True)
+                if table == "awards":
+                    partition_writes += contracts_store.upsert_awards(new_df)
+                    get_award_index().upsert(new_df)
+                    get_supplier_resolver().resolve(new_df)
+                else:
+                    contracts_store.upsert_table(table, new_df)
+                merged_rows += len(new_df)
+                del staged_dfs, new_df
+
+            # Only forget the staged files once their rows are in the store.
+            for staged_file in batch:
+                staged_file.unlink()
+
+        if merged_rows and table == "awards":
+            print(f"Merged {merged_rows} awards from {len(staged_files)} staged pages ({partition_writes} partition writes).")
+        elif merged_rows:
+            print(f"Merged {merged_rows} {table} rows from {len(staged_files)} staged pages.")
+    checkpoint.advance_watermark()
+
+
+def ingest_contracts(initial_start_date: str = INITIAL_START_DATE, day_interval: int = 2, full_refresh: bool = False):
+    """
+    Fetches the awarded contracts published since the last successful run and upserts them into the contracts store.
 
-contracts_df['Award Contract Start Date'] = contracts_df['awards'].apply(lambda x: x.get('contractPeriod', {}).get('startDate') if isinstance(x, dict) else None)
-contracts_df['Award Contract End Date'] = contracts_df['awards'].apply(lambda x: x.get('contractPeriod', {}).get('endDate') if isinstance(x, dict) else None)
-contracts_df = contracts_df.drop(columns=["awards", "tender", "parties", "buyer"])
+    Every page is flattened into award, party and supplier rows and staged to disk as soon as it arrives,
+    and staged pages are merged into the store in fixed-size batches, so memory does not grow with the date range. An interval is recorded in the checkpoint once all its
+    pages are staged, so a crashed run resumes with only the missing intervals. Intervals reaching today
+    are re-fetched on the next run, as more notices can still be published for today.
+    
+    Args:
+        initial_start_date: Start date in "YYYY-MM-DD" format, used when there is no checkpoint yet.
+        day_interval: The number of days for each fetching interval (e.g., 7 for weekly).
+        full_refresh: Ignore the checkpoint and fetch everything from initial_start_date.
+    """
+    if full_refresh:
+        CHECKPOINT_FILE.unlink(missing_ok=True)
+    checkpoint = IngestCheckpoint(CHECKPOINT_FILE, initial_start=date.fromisoformat(initial_start_date))
+    for table in TABLES:
+        (STAGING_DIR / table).mkdir(parents=True, exist_ok=True)
 
-contracts_df["Award Value"] = pd.to_numeric(contracts_df["Award Value"], errors="raise")
-contracts_df["Award Date"] = pd.to_datetime(contracts_df["Award Date"], errors="raise", utc=True)
-contracts_df['Award Year'] = contracts_df["Award Date"].dt.year
-contracts_df['Award Month'] = contracts_df["Award Date"].dt.month
-contracts_df['Award Day'] = contracts_df["Award Date"].dt.day
-contracts_df["Award Contract Start Date"] = pd.to_datetime(contracts_df["Award Contract Start Date"], errors="raise", utc=True)
-contracts_df["Award Contract End Date"] = pd.to_datetime(contracts_df["Award Contract End Date"], errors="raise", utc=True)
+    # Merge anything a previous, interrupted run fetched but did not merge.
+    merge_staged_pages(checkpoint, staging_dir=STAGING_DIR)
 
-contracts_df["Award Date" ] = contracts_df["Award Date"].dt.strftime('%d-%m-%Y')
-contracts_df[ "Award Contract Start Date"] = contracts_df["Award Contract Start Date"].dt.strftime('%d-%m-%Y')
-contracts_df["Award Contract End Date" ] = contracts_df["Award Contract End Date" ].dt.strftime('%d-%m-%Y')
+    today = date.today()
+    intervals = checkpoint.pending(date_intervals(start=checkpoint.next_start, end=today, day_interval=day_interval))
+    print(f"Fetching {len(intervals)} intervals from {checkpoint.next_start} to {today}.")
+    page_counts = {interval: 0 for interval in intervals}
 
-"""
-old_column_names = contracts_df.columns
-new_column_names = [
-                    'Award ID','Award Status','Award Date','Data Award Published',
-                    'Award Value', 'Award Value Currency',	
-                    'Contracted Period Start Date',	'Contracted Period End Date',	
-                    'Award Description','OCID', 'Contract ID','Language', 'date', 'tag', 'Initiation Type','Title', 'Planning', 'Related Processes', 'Tender ID',
-                    'Tender Title','Party ID','Party Name', 'Buyer ID', 'Buyer Name', 'Supplier ID', 'Supplier Name',	'Award Document ID',
-                    "Award Year", "Award Month", "Award Day"
-                    ]
+    def on_page(interval, releases):
+        start, end = interval
+        page_counts[interval] += 1
+        for table, table_df in flatten_releases(releases).items():
+            table_df.to_pickle(STAGING_DIR / table / f"{start}_{end}_{page_counts[interval]:05d}.pkl")
 
-column_name_mapper = dict(zip(old_column_names,new_column_names))
-contracts_df = contracts_df.rename(axis=1, mapper=column_name_mapper)
+    def on_interval_done(interval):
+        if interval[1] < today:
+            checkpoint.mark_completed(interval)
 
-contracts_df['tag'] = contracts_df['tag'].fillna('').astype(str)
-contracts_df['tag'] = contracts_df['tag'].str.strip(to_strip="['").str.strip(to_strip="']")
+    stats = asyncio.run(ContractsFinderIngestor().run(intervals, on_page=on_page, on_interval_done=on_interval_done))
+    if stats.failed_intervals:
+        print(f"Warning: {len(stats.failed_intervals)} intervals could not be fetched and will be retried next run: {stats.failed_intervals}")
 
-contracts_df['Suppler Name'] = contracts_df['Supplier Name'].fillna('').astype(str)
-"""
-contracts_df['Zaizi'] = contracts_df['Supplier Name'].str.contains('Zaizi', case=False, na=False)
+    merge_staged_pages(checkpoint, staging_dir=STAGING_DIR)
+    print(f"Finished! {stats.summary()}. Watermark is now {checkpoint.watermark}.")
 
 
-contracts_df.to_csv("./data/from_jan_govt_contracts.csv")
+async def fetch_companies_by_sic(sic_codes: list[str]) -> list[dict]:
+    """
+    Lists every company registered under the SIC codes, one paginated advanced search per code.
+    """
+    companies = []
+    ch = get_companies_house()
+    async with http_client_lifespan():
+        for sic_code in sic_codes:
+            companies.extend([company async for company in ch.iter_advanced_company_search_async([sic_code])])
+    return companies
 
 
+def seed_companies(sic_codes: list[str], companies_file: Optional[Path] = None):
+    """
+    Adds companies to the supplier resolution registry, from Companies House searches by SIC code and/or a
+    Companies House bulk company data CSV, then re-resolves every supplier name of the stored awards.
+    """
+    resolver = get_supplier_resolver()
+    if sic_codes:
+        added = resolver.add_companies(asyncio.run(fetch_companies_by_sic(sic_codes)), source="sic_search")
+        print(f"Added {added} companies from SIC codes {sic_codes}.")
+    if companies_file:
+        added = 0
+        # The bulk file has a leading space in some column names, e.g. " CompanyNumber".
+        for chunk in pd.read_csv(companies_file, usecols=lambda column: column.strip() in ("CompanyName", "CompanyNumber"),
+                                 dtype=str, chunksize=100_000):
+            chunk.columns = [column.strip() for column in chunk.columns]
+            added += resolver.add_companies(
+                (dict(company_name=name, company_number=number) for name, number
+                 in chunk[["CompanyName", "CompanyNumber"]].itertuples(index=False)),
+                source=Path(companies_file).name,
+                compact=False,
+            )
+        # Each chunk was appended as a part of the companies table; they are merged once here.
+        contracts_store.compact_table("companies")
+        print(f"Added {added} companies from {companies_file}.")
+
+    mappings = resolver.resolve(contracts_store.read_awards(columns=["Supplier Name", "Supplier ID"]))
+    print(f"{mappings['Company Number'].notna().sum()} of {len(mappings)} supplier names are linked to a company.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally load awarded contracts from Contracts Finder.")
+    parser.add_argument("--start-date", default=INITIAL_START_DATE, help="YYYY-MM-DD, used when no checkpoint exists")
+    parser.add_argument("--day-interval", type=int, default=2)
+    parser.add_argument("--full-refresh", action="store_true", help="ignore the checkpoint and re-fetch everything")
+    parser.add_argument("--import-csv", action="store_true", help=f"import {LEGACY_CONTRACTS_FILE.name} into the Parquet store and exit")
+    parser.add_argument("--seed-companies", action="store_true",
+                        help="fetch the companies of the [entity_resolution] SIC codes for supplier resolution and exit")
+    parser.add_argument("--import-companies", type=Path, metavar="CSV",
+                        help="add a Companies House bulk company data CSV for supplier resolution and exit")
+    args = parser.parse_args()
+
+    if args.import_csv:
+        print(f"Imported {contracts_store.import_awards_csv(LEGACY_CONTRACTS_FILE)} awards from {LEGACY_CONTRACTS_FILE.name}.")
+        print(f"Indexed {get_award_index().rebuild()} awards for search.")
+        get_supplier_resolver().resolve(contracts_store.read_awards(columns=["Supplier Name", "Supplier ID"]))
+        raise SystemExit(0)
+
+    if args.seed_companies or args.import_companies:
+        seed_companies(RESOLUTION_SETTINGS.get("sic_codes", []) if args.seed_companies else [],
+                       companies_file=args.import_companies)
+        raise SystemExit(0)
+
+    ingest_contracts(initial_start_date=args.start_date, day_interval=args.day_interval, full_refresh=args.full_refresh)
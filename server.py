@@ -1,12 +1,23 @@
-from tools.csv_tools import summarise_csv_file, Read_Govt_Awards_CSV
+import anyio
+import tools.csv_tools
 import tools.companies_house_company_info_tools
-import tools.knowledge_base_tools
+from tools.knowledge_base_tools import kb_tool
+import tools.parquet_tools
+from utils.companies_house_API import http_client_lifespan
 from utils.mcp_instance import mcp
 
 
+async def run_server():
+    # The pooled Companies House client lives as long as the server does.
+    async with http_client_lifespan():
+        # Every other tool is available at once; the knowledge base reports progress until it is ready.
+        kb_tool.start_background()
+        await mcp.run_streamable_http_async()
+
+
 def main():
     print("Starting server")
-    mcp.run(transport="streamable-http")
+    anyio.run(run_server)
     
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,58 @@
+import httpx
+import pytest
+
+from utils.companies_house_API import SingleFlight, companies_house
+from utils.document_store import DocumentStore
+from utils.rate_limit import RateLimitScheduler
+from utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def make_companies_house(tmp_path):
+    """
+    Returns a factory of (client, companies_house) pairs whose requests are answered by handler, an
+    httpx.MockTransport handler, instead of the API. The caches and the document store live in tmp_path,
+    and the scheduler backs off in milliseconds. Close the client with `async with client`.
+    """
+    def make(handler) -> tuple[httpx.AsyncClient, companies_house]:
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        ch = companies_house(api_key="test", client=client,
+                             scheduler=RateLimitScheduler(capacity=100, window_seconds=1.0, backoff_base=0.01),
+                             single_flight=SingleFlight(), cache=ResponseCache(tmp_path / "cache.sqlite"),
+                             document_store=DocumentStore(tmp_path / "filings"))
+        return client, ch
+    return make
+
+
+SAMPLE_LINE = "Turnover for the year was {n},000 pounds and the directors recommend no dividend."
+
+
+@pytest.fixture
+def write_sample_pdf():
+    """
+    Returns write(path, pages=2, first_line=0), which writes a PDF with a text layer of 40 numbered
+    lines per page. PDFs written with different first_line values have different text.
+    """
+    def write(path, pages: int = 2, first_line: int = 0):
+        # A minimal hand-written PDF, so the tests need no PDF-writing dependency.
+        objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+        kids = []
+        for page in range(pages):
+            lines = " ".join(f"({SAMPLE_LINE.format(n=first_line + page * 40 + i)}) Tj 0 -16 Td" for i in range(40))
+            stream = f"BT /F1 10 Tf 40 800 Td {lines} ET"
+            objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                           f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+            kids.append(f"{len(objects)} 0 R")
+        objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+        body, offsets = b"%PDF-1.4\n", []
+        for number, obj in enumerate(objects, start=1):
+            offsets.append(len(body))
+            body += f"{number} 0 obj\n{obj}\nendobj\n".encode()
+        xref = len(body)
+        body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+        body += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+        path.write_bytes(body)
+    return write
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+import pytest
+
+from tools import companies_house_company_info_tools as tools
+
+
+@pytest.fixture
+def failing_pages(make_companies_house, monkeypatch):
+    """
+    Serves one full page of results, then times out on the next one.
+    """
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("start_index", "0") != "0":
+            raise httpx.ReadTimeout("timed out", request=request)
+        items = [{"name": f"Officer {i}", "company_number": f"{i:08d}"} for i in range(2)]
+        return httpx.Response(200, json={"items": items, "total_results": 10, "hits": 10})
+
+    client, ch = make_companies_house(handler)
+    monkeypatch.setattr(tools, "get_companies_house", lambda: ch)
+    return client
+
+
+def test_list_company_records_reports_a_network_failure(failing_pages):
+    async def run():
+        async with failing_pages:
+            return await tools.list_company_records(company_number="06591591", max_items=5)
+
+    result = asyncio.run(run())
+
+    assert result["status"] == "error"
+    assert "ReadTimeout" in result["details"]
+
+
+def test_search_all_by_sic_code_reports_a_network_failure(failing_pages):
+    async def run():
+        async with failing_pages:
+            return await tools.search_all_by_sic_code(sic_codes=["62020"], max_items=5)
+
+    result = asyncio.run(run())
+
+    assert result["status"] == "error"
+    assert "ReadTimeout" in result["details"]
@@ -0,0 +1,164 @@
+import pandas as pd
+
+from utils import contracts_store
+
+RELEASES = [
+    {
+        "ocid": "ocds-b5fd17-0001", "id": "release-1", "date": "2025-01-02T09:00:00Z", "tag": ["award"],
+        "initiationType": "tender", "language": "en",
+        "tender": {"id": "tender-1", "title": "Digital services"},
+        "buyer": {"id": "buyer-1", "name": "Cabinet Office"},
+        "parties": [{"id": "buyer-1", "name": "Cabinet Office"}, {"id": "GB-COH-06591591", "name": "Zaizi Ltd"}],
+        "awards": [{
+            "id": "award-1", "status": "active", "date": "2025-01-02T00:00:00Z",
+            "datePublished": "2025-01-03T10:30:00Z",
+            "value": {"amount": 125000.5, "currency": "GBP"},
+            "suppliers": [{"id": "GB-COH-06591591", "name": "Zaizi Ltd"}],
+            "contractPeriod": {"startDate": "2025-02-01T00:00:00Z", "endDate": "2026-01-31T23:59:59Z"},
+        }],
+    },
+]
+
+
+def write_baseline_csv(path, releases):
+    """
+    Writes releases the way the original load_govt_contracts.py did: awards and parties exploded, the derived
+    columns under their original names, and day-month-year dates.
+    """
+    df = pd.DataFrame(releases).explode("awards").reset_index(drop=True).explode("parties").reset_index(drop=True)
+
+    def get(column, *keys):
+        return df[column].apply(lambda value: _dig(value, keys))
+
+    df["Tender ID"], df["Tender Title"] = get("tender", "id"), get("tender", "title")
+    df["Party ID"], df["Party Name"] = get("parties", "id"), get("parties", "name")
+    df["Buyer ID"], df["Buyer Name"] = get("buyer", "id"), get("buyer", "name")
+    df["Award ID"], df["Award Status"], df["Award Date"] = get("awards", "id"), get("awards", "status"), get("awards", "date")
+    df["Award Date Published"] = get("awards", "datePublished")
+    df["Award Value"], df["Award Currency"] = get("awards", "value", "amount"), get("awards", "value", "currency")
+    df["Supplier ID"] = df["awards"].apply(lambda x: x.get("suppliers", [{}])[0].get("id"))
+    df["Supplier Name"] = df["awards"].apply(lambda x: x.get("suppliers", [{}])[0].get("name"))
+    df["Award Contract Start Date"] = get("awards", "contractPeriod", "startDate")
+    df["Award Contract End Date"] = get("awards", "contractPeriod", "endDate")
+    df = df.drop(columns=["awards", "tender", "parties", "buyer"])
+    df["Award Date"] = pd.to_datetime(df["Award Date"], utc=True)
+    df["Award Year"], df["Award Month"], df["Award Day"] = df["Award Date"].dt.year, df["Award Date"].dt.month, df["Award Date"].dt.day
+    for column in ["Award Date", "Award Contract Start Date", "Award Contract End Date"]:
+        df[column] = pd.to_datetime(df[column], utc=True).dt.strftime("%d-%m-%Y")
+    df["Zaizi"] = df["Supplier Name"].str.contains("Zaizi", case=False, na=False)
+    df.to_csv(path)
+
+
+def _dig(value, keys):
+    for key in keys:
+        value = value.get(key, {}) if isinstance(value, dict) else None
+    return value if value != {} else None
+
+
+def test_legacy_csv_import_keeps_renamed_columns(tmp_path):
+    csv_path = tmp_path / "from_jan_govt_contracts.csv"
+    write_baseline_csv(csv_path, RELEASES)
+    awards_dir = tmp_path / "awards"
+
+    assert contracts_store.import_awards_csv(csv_path, awards_dir=awards_dir) == 1
+
+    (award,) = contracts_store.read_awards(awards_dir=awards_dir).to_dict(orient="records")
+    assert award["OCID"] == "ocds-b5fd17-0001"
+    assert award["Award Value"] == 125000.5
+    assert award["Award Value Currency"] == "GBP"
+    assert award["Data Award Published"] == pd.Timestamp("2025-01-03T10:30:00Z")
+    assert award["Award Date"] == pd.Timestamp("2025-01-02T00:00:00Z")
+    assert award["Contracted Period Start Date"] == pd.Timestamp("2025-02-01T00:00:00Z")
+    assert award["Contracted Period End Date"] == pd.Timestamp("2026-01-31T00:00:00Z")
+    assert (award["Award Year"], award["Award Month"], award["Zaizi"]) == (2025, 1, True)
+
+
+def award(award_id: str, award_date: str, value=1000.0) -> dict:
+    awarded = pd.Timestamp(award_date, tz="UTC")
+    return {"Award ID": award_id, "Award Date": awarded, "Award Value": value, "Supplier Name": "Zaizi Ltd",
+            "Award Year": awarded.year, "Award Month": awarded.month, "Award Day": awarded.day, "Zaizi": True}
+
+
+def test_out_of_range_award_values_are_dropped_not_fatal(tmp_path):
+    awards_dir = tmp_path / "awards"
+    contracts_store.upsert_awards(pd.DataFrame([award("ok", "2025-03-01"), award("junk", "2025-03-02", value=1e20),
+                                                award("infinite", "2025-03-03", value=float("inf"))]),
+                                  awards_dir=awards_dir)
+
+    values = contracts_store.read_awards(awards_dir=awards_dir).set_index("Award ID")["Award Value"]
+    assert values["ok"] == 1000.0
+    assert pd.isna(values["junk"]) and pd.isna(values["infinite"])
+
+
+def test_award_moving_partition_is_removed_from_the_old_one(tmp_path):
+    awards_dir = tmp_path / "awards"
+    contracts_store.upsert_awards(pd.DataFrame([award("moved", "2025-03-01"), award("stays", "2025-03-02")]),
+                                  awards_dir=awards_dir)
+    # A later notice corrects the award date into another year.
+    rewritten = contracts_store.upsert_awards(pd.DataFrame([award("moved", "2024-12-30", value=2000.0)]),
+                                              awards_dir=awards_dir)
+
+    assert rewritten == 2
+    awards = contracts_store.read_awards(awards_dir=awards_dir)
+    assert sorted(awards["Award ID"]) == ["moved", "stays"]
+    assert contracts_store.read_awards(year=2025, awards_dir=awards_dir)["Award ID"].tolist() == ["stays"]
+    (moved,) = contracts_store.read_awards(year=2024, month=12, awards_dir=awards_dir).to_dict(orient="records")
+    assert moved["Award ID"] == "moved" and moved["Award Value"] == 2000.0
+    # The aggregates of both partitions follow.
+    assert contracts_store.read_award_cube(2025, awards_dir=awards_dir)["awards"].sum() == 1
+    assert contracts_store.read_award_cube(2024, awards_dir=awards_dir)["total_value"].sum() == 2000.0
+
+
+def test_award_moving_out_of_its_only_partition_deletes_it(tmp_path):
+    awards_dir = tmp_path / "awards"
+    contracts_store.upsert_awards(pd.DataFrame([award("moved", "2025-03-01")]), awards_dir=awards_dir)
+    contracts_store.upsert_awards(pd.DataFrame([award("moved", "2025-04-01")]), awards_dir=awards_dir)
+
+    assert not (awards_dir / "award_year=2025" / "award_month=3").exists()
+    assert contracts_store.read_awards(awards_dir=awards_dir)["Award Month"].tolist() == [4]
+    assert contracts_store.read_award_cube(2025, awards_dir=awards_dir)["Award Month"].tolist() == [4]
+
+
+def parties(*rows) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["OCID", "Party ID", "Party Name", "Party Roles"])
+
+
+def test_table_upserts_append_parts_and_reads_keep_the_newest_rows(tmp_path):
+    contracts_store.upsert_table("parties", parties(("ocds-1", "buyer-1", "Cabinet Office", "buyer"),
+                                                    ("ocds-1", "supplier-1", "Zaizi Ltd", "supplier"),
+                                                    ("ocds-2", "buyer-2", "HMRC", "buyer")), contracts_dir=tmp_path)
+    # A later notice of ocds-1 lists its parties again: they replace every earlier row of that release.
+    contracts_store.upsert_table("parties", parties(("ocds-1", "buyer-1", "Cabinet Office", "buyer")),
+                                 contracts_dir=tmp_path)
+
+    assert len(list((tmp_path / "parties").glob("part-*.parquet"))) == 2
+    stored = contracts_store.read_table("parties", contracts_dir=tmp_path).sort_values("OCID")
+    assert stored[["OCID", "Party ID"]].values.tolist() == [["ocds-1", "buyer-1"], ["ocds-2", "buyer-2"]]
+    assert contracts_store.read_table("parties", columns=["Party Name"], contracts_dir=tmp_path)["Party Name"].tolist() \
+        == ["HMRC", "Cabinet Office"]
+
+
+def test_table_parts_are_compacted(tmp_path, monkeypatch):
+    monkeypatch.setattr(contracts_store, "MAX_TABLE_PARTS", 3)
+    for version in range(5):
+        contracts_store.upsert_table("parties", parties(("ocds-1", "buyer-1", f"Buyer v{version}", "buyer"),
+                                                        (f"ocds-{version + 10}", "buyer-2", "HMRC", "buyer")),
+                                     contracts_dir=tmp_path)
+
+    assert len(list((tmp_path / "parties").glob("part-*.parquet"))) <= 3
+    stored = contracts_store.read_table("parties", contracts_dir=tmp_path).set_index("OCID")
+    assert len(stored) == 6
+    assert stored.loc["ocds-1", "Party Name"] == "Buyer v4"
+
+
+def test_single_file_tables_of_earlier_versions_are_read_as_the_oldest_part(tmp_path):
+    contracts_store._write_atomic(contracts_store._to_table(parties(("ocds-1", "buyer-1", "Old name", "buyer"),
+                                                                    ("ocds-2", "buyer-2", "HMRC", "buyer")),
+                                                            contracts_store.TABLE_SCHEMAS["parties"]),
+                                  tmp_path / "parties.parquet")
+    contracts_store.upsert_table("parties", parties(("ocds-1", "buyer-1", "New name", "buyer")), contracts_dir=tmp_path)
+    contracts_store.compact_table("parties", contracts_dir=tmp_path)
+
+    assert not (tmp_path / "parties.parquet").exists()
+    stored = contracts_store.read_table("parties", contracts_dir=tmp_path).set_index("OCID")["Party Name"]
+    assert stored.to_dict() == {"ocds-1": "New name", "ocds-2": "HMRC"}
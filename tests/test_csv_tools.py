@@ -0,0 +1,45 @@
+import asyncio
+import threading
+
+import pytest
+
+import utils.entity_resolution as entity_resolution
+import utils.file_reader as file_reader
+from tools import csv_tools
+
+
+@pytest.fixture
+def unreadable_awards(tmp_path, monkeypatch):
+    """
+    Serves an analyser whose year failed to load because a partition file is corrupt.
+    """
+    partition = tmp_path / "awards" / "award_year=2025" / "award_month=1"
+    partition.mkdir(parents=True)
+    (partition / "part-0.parquet").write_bytes(b"not parquet")
+    analyser = file_reader.ContractAnalyser(dataset_dir=tmp_path / "awards", year=2025)
+    monkeypatch.setattr(file_reader, "get_contract_analyser", lambda year=None: analyser)
+    return analyser
+
+
+def test_tools_report_awards_that_failed_to_load(unreadable_awards):
+    assert unreadable_awards.contracts_df is None
+
+    for result in [csv_tools.Read_Govt_Awards_CSV(), asyncio.run(csv_tools.competitor_awards_summary(year=2025)),
+                   csv_tools.govt_awards_rollup(year=2025)]:
+        assert result["status"] == "error"
+        assert result["message"].startswith("The 2025 award data could not be loaded")
+
+
+def test_supplier_resolution_runs_off_the_event_loop(monkeypatch):
+    threads = []
+
+    class Resolver:
+        def resolve(self, suppliers):
+            threads.append(threading.get_ident())
+            return suppliers.assign(**{"Company Number": "06591591", "Registry Size": 1})
+
+    monkeypatch.setattr(entity_resolution, "get_supplier_resolver", lambda: Resolver())
+    result = asyncio.run(csv_tools.resolve_supplier_companies(["ZAIZI LIMITED"]))
+
+    assert result["data"] == [{"Supplier Name": "ZAIZI LIMITED", "Company Number": "06591591"}]
+    assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,58 @@
+import asyncio
+
+import httpx
+
+DOCUMENT_URL = "https://document-api.company-information.service.gov.uk/document/abc123"
+CONTENT = b"%PDF-1.4 filing" * 1000
+
+
+def metadata_response() -> httpx.Response:
+    return httpx.Response(200, json={
+        "company_number": "06591591",
+        "barcode": "XB1234",
+        "category": "accounts",
+        "links": {"self": DOCUMENT_URL, "document": f"{DOCUMENT_URL}/content"},
+        "resources": {"application/pdf": {}},
+    })
+
+
+def download(make_companies_house, handler, callers: int) -> list[dict]:
+    async def run():
+        client, ch = make_companies_house(handler)
+        async with client:
+            return await asyncio.gather(*(ch.get_download_document(metadata_response()) for _ in range(callers)))
+    return asyncio.run(run())
+
+
+def test_concurrent_downloads_of_one_document_share_one_request(tmp_path, make_companies_house):
+    content_requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        content_requests.append(request.url)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, content=CONTENT)
+
+    results = download(make_companies_house, handler, callers=3)
+
+    assert len(content_requests) == 1
+    assert [result["status"] for result in results] == ["success"] * 3
+    paths = {result["document"]["path"] for result in results}
+    assert len(paths) == 1
+    with open(paths.pop(), "rb") as f:
+        assert f.read() == CONTENT
+    assert not list((tmp_path / "filings" / "partial").iterdir())
+
+
+def test_download_is_retried_after_a_rate_limit(make_companies_house):
+    content_requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        content_requests.append(request.url)
+        if len(content_requests) == 1:
+            return httpx.Response(429, headers={"Retry-After": "0"})
+        return httpx.Response(200, content=CONTENT)
+
+    (result,) = download(make_companies_house, handler, callers=1)
+
+    assert result["status"] == "success"
+    assert len(content_requests) == 2
@@ -0,0 +1,24 @@
+from utils.entity_resolution import CompanyNameIndex
+
+
+def test_common_trigrams_do_not_crowd_out_the_match():
+    index = CompanyNameIndex(max_candidates=25)
+    # Thousands of names sharing the common words of the query, and so most of its trigrams.
+    for i in range(5000):
+        index.add(f"{i:08d}", f"Digital Services Solutions {i} Ltd")
+    index.add("12345678", "Zaizi Digital Services Solutions Limited")
+
+    match = index.match("Zaizy Digital Services Solutions Ltd")
+
+    assert match["Company Number"] == "12345678"
+    assert match["Method"] == "fuzzy"
+
+
+def test_ambiguous_and_unresolved_names():
+    index = CompanyNameIndex()
+    index.add("00000001", "Acme Consulting Ltd")
+    index.add("00000002", "The Acme Consulting Limited")
+
+    assert index.match("ACME CONSULTING")["Method"] == "ambiguous"
+    assert index.match("Acme Consultin")["Method"] == "ambiguous"
+    assert index.match("Entirely Different Name")["Method"] == "unresolved"
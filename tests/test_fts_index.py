@@ -0,0 +1,28 @@
+import pandas as pd
+from langchain_core.documents import Document
+
+from utils.award_index import AwardSearchIndex
+from utils.chunk_index import ChunkKeywordIndex
+
+
+def test_reindexing_an_award_replaces_its_text(tmp_path):
+    index = AwardSearchIndex(tmp_path / "awards.sqlite")
+    award = {"Award ID": "A1", "Award Year": 2025, "Tender Title": "Cloud migration", "Award Description": None}
+    index.upsert(pd.DataFrame([award, dict(award, **{"Award ID": "A2", "Tender Title": "Cloud hosting"})]))
+    index.upsert(pd.DataFrame([dict(award, **{"Tender Title": "Digital platform"})]))
+
+    assert len(index) == 2
+    hits, total = index.search("cloud")
+    assert total == 1 and [hit["award_id"] for hit in hits] == ["A2"]
+    assert [hit["award_id"] for hit in index.search("digit*", year=2025)[0]] == ["A1"]
+
+
+def test_deleted_chunks_are_not_found(tmp_path):
+    index = ChunkKeywordIndex(tmp_path / "keywords.sqlite")
+    index.add(Document(id=f"c{i}", page_content=f"Turnover {i}", metadata={"source": "a.pdf", "page": i,
+                                                                             "company_number": "06591591"})
+              for i in range(3))
+    index.delete(["c1", "missing"])
+
+    assert len(index) == 2
+    assert sorted(chunk_id for chunk_id, _ in index.search("turnover", company_number="6591591")) == ["c0", "c2"]
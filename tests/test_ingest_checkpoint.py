@@ -0,0 +1,52 @@
+from datetime import date
+
+from utils.contracts_finder_API import date_intervals
+from utils.ingest_checkpoint import IngestCheckpoint
+
+START = date(2025, 1, 1)
+
+
+def test_watermark_only_advances_over_contiguous_completed_intervals(tmp_path):
+    checkpoint = IngestCheckpoint(tmp_path / "checkpoint.json", initial_start=START)
+    first, second, third, fourth = date_intervals(start=START, end=date(2025, 1, 8), day_interval=2)
+    # Fetched concurrently, so they complete out of order and the second one is still missing.
+    checkpoint.mark_completed(third)
+    checkpoint.mark_completed(first)
+    checkpoint.mark_completed(fourth)
+
+    checkpoint.advance_watermark()
+    assert checkpoint.watermark == first[1]
+    assert checkpoint.next_start == second[0]
+    assert checkpoint.completed_intervals == {third, fourth}
+
+    checkpoint.mark_completed(second)
+    checkpoint.advance_watermark()
+    assert checkpoint.watermark == fourth[1]
+    assert checkpoint.completed_intervals == set()
+
+
+def test_resume_after_a_partial_run_fetches_only_missing_intervals(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    intervals = date_intervals(start=START, end=date(2025, 1, 10), day_interval=2)
+    crashed = IngestCheckpoint(path, initial_start=START)
+    crashed.mark_completed(intervals[0])
+    crashed.advance_watermark()
+    crashed.mark_completed(intervals[2])
+    crashed.mark_completed(intervals[4])
+    # The run dies here, before the last merge.
+
+    resumed = IngestCheckpoint(path, initial_start=START)
+    assert resumed.watermark == intervals[0][1]
+    assert resumed.next_start == intervals[1][0]
+
+    pending = resumed.pending(date_intervals(start=resumed.next_start, end=date(2025, 1, 10), day_interval=2))
+    assert pending == [intervals[1], intervals[3]]
+
+
+def test_no_checkpoint_or_an_unreadable_one_starts_from_the_initial_date(tmp_path):
+    assert IngestCheckpoint(tmp_path / "missing.json", initial_start=START).next_start == START
+
+    corrupt = tmp_path / "corrupt.json"
+    corrupt.write_text("{not json")
+    checkpoint = IngestCheckpoint(corrupt, initial_start=START)
+    assert checkpoint.watermark is None and checkpoint.next_start == START
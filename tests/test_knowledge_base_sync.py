@@ -0,0 +1,126 @@
+import asyncio
+import shutil
+
+import httpx
+import pytest
+
+from utils.document_store import DocumentStore
+from utils.embeddings import HashingEmbeddings
+import utils.retreival_augmented_generation as rag
+from utils.retreival_augmented_generation import KnowledgeBaseTool, load_manifest, sync_vector_store_async
+
+
+def sync(docs, index_path):
+    return asyncio.run(sync_vector_store_async(docs, index_path, embeddings=HashingEmbeddings()))
+
+
+def test_unreadable_pdfs_are_retried_on_the_next_sync(tmp_path, write_sample_pdf):
+    docs, index_path = tmp_path / "docs", tmp_path / "index"
+    docs.mkdir()
+    write_sample_pdf(docs / "good.pdf")
+    (docs / "broken.pdf").write_bytes(b"not a pdf")
+
+    _, stats = sync(docs, index_path)
+    assert stats["failed"] == ["broken.pdf"]
+    assert list(load_manifest(index_path)["files"]) == ["good.pdf"]
+
+    _, stats = sync(docs, index_path)
+    assert stats["added"] == ["broken.pdf"] and stats["failed"] == ["broken.pdf"]
+
+    write_sample_pdf(docs / "broken.pdf", first_line=1000)
+    vector_store, stats = sync(docs, index_path)
+    assert stats["added"] == ["broken.pdf"] and stats["failed"] == []
+    assert sorted(load_manifest(index_path)["files"]) == ["broken.pdf", "good.pdf"]
+    assert {document.metadata["source"] for document in vector_store.docstore._dict.values()} == {"broken.pdf", "good.pdf"}
+
+
+def test_company_numbers_come_from_the_document_store(tmp_path, write_sample_pdf):
+    docs, store = tmp_path / "docs", DocumentStore(tmp_path / "filings")
+    docs.mkdir()
+    write_sample_pdf(docs / "filing.pdf")
+    write_sample_pdf(docs / "other.pdf", first_line=1000)
+    shutil.copyfile(docs / "filing.pdf", store.partial_path("document-1"))
+    store.commit("document-1", file_extension=".pdf", metadata={"company_number": "SC123456"})
+
+    kb = KnowledgeBaseTool(index_directory=tmp_path, index_file="index", docs_directory=docs, document_store=store)
+    kb.embeddings = HashingEmbeddings()
+    asyncio.run(kb.refresh_async())
+
+    hits = kb.search("turnover", k=50, company_number="sc123456")
+    assert hits and {(hit["source"], hit["company_number"]) for hit in hits} == {("filing.pdf", "SC123456")}
+
+
+def test_search_after_every_pdf_is_removed(tmp_path, write_sample_pdf):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write_sample_pdf(docs / "filing.pdf")
+    kb = KnowledgeBaseTool(index_directory=tmp_path, index_file="index", docs_directory=docs,
+                           document_store=DocumentStore(tmp_path / "filings"))
+    kb.embeddings = HashingEmbeddings()
+    asyncio.run(kb.refresh_async())
+    assert kb.search("turnover", mode="vector")
+
+    (docs / "filing.pdf").unlink()
+    asyncio.run(kb.refresh_async())
+    assert kb.search("turnover", mode="vector") == []
+    assert kb.search("turnover") == []
+
+
+def test_sync_after_the_manifest_fell_behind_the_index(tmp_path, monkeypatch, write_sample_pdf):
+    docs, index_path = tmp_path / "docs", tmp_path / "index"
+    docs.mkdir()
+    write_sample_pdf(docs / "changed.pdf")
+    write_sample_pdf(docs / "deleted.pdf", first_line=1000)
+    sync(docs, index_path)
+
+    # The next sync saves the index, then is interrupted before it saves the manifest.
+    write_sample_pdf(docs / "changed.pdf", first_line=2000)
+    write_sample_pdf(docs / "added.pdf", first_line=3000)
+    (docs / "deleted.pdf").unlink()
+    def interrupted(index_path, manifest):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(rag, "save_manifest", interrupted)
+        with pytest.raises(OSError):
+            sync(docs, index_path)
+    assert sorted(load_manifest(index_path)["files"]) == ["changed.pdf", "deleted.pdf"]
+
+    vector_store, stats = sync(docs, index_path)
+    assert stats["added"] == ["added.pdf"] and stats["changed"] == ["changed.pdf"] and stats["deleted"] == ["deleted.pdf"]
+    assert stats["chunks_embedded"] == 0
+    assert sorted(load_manifest(index_path)["files"]) == ["added.pdf", "changed.pdf"]
+    assert set(vector_store.index_to_docstore_id.values()) == {
+        chunk_id for entry in load_manifest(index_path)["files"].values() for chunk_id in entry["chunk_ids"]}
+
+
+def test_downloaded_filings_are_searchable_by_company(tmp_path, make_companies_house, write_sample_pdf):
+    write_sample_pdf(tmp_path / "download.pdf")
+    url = "https://document-api.company-information.service.gov.uk/document/abc123"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=(tmp_path / "download.pdf").read_bytes())
+
+    async def run():
+        client, ch = make_companies_house(handler)
+        async with client:
+            return ch, await ch.get_download_document(httpx.Response(200, json={
+                "company_number": "06591591", "barcode": "XB1234", "category": "accounts",
+                "links": {"self": url, "document": f"{url}/content"}, "resources": {"application/pdf": {}},
+            }))
+
+    ch, download = asyncio.run(run())
+    assert download["status"] == "success"
+
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    write_sample_pdf(docs / "other.pdf", first_line=1000)
+    kb = KnowledgeBaseTool(index_directory=tmp_path, index_file="index", docs_directory=docs,
+                           document_store=ch.document_store)
+    kb.embeddings = HashingEmbeddings()
+    stats = asyncio.run(kb.refresh_async())
+    assert sorted(stats["added"]) == ["filings/06591591XB1234accounts.pdf", "other.pdf"]
+
+    hits = kb.search("turnover", k=50, company_number="06591591")
+    assert hits and {(hit["source"], hit["company_number"]) for hit in hits} == {
+        ("filings/06591591XB1234accounts.pdf", "06591591")}
@@ -0,0 +1,31 @@
+from utils.query_cache import VersionedLRUCache, normalise_query
+
+
+def test_near_identical_queries_share_a_key():
+    assert normalise_query("  Turnover in   2023? ") == normalise_query("turnover in 2023") == "turnover in 2023"
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = VersionedLRUCache(max_entries=2)
+    cache.put("a", 1, "A", seconds=0.5)
+    cache.put("b", 1, "B", seconds=0.5)
+    assert cache.get("a", 1) == "A"
+    cache.put("c", 1, "C", seconds=0.5)
+
+    assert cache.get("b", 1) is None
+    assert cache.get("c", 1) == "C"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1, 2)
+    assert stats["seconds_saved"] == 1.0
+
+
+def test_a_newer_index_version_clears_the_cache():
+    cache = VersionedLRUCache()
+    cache.put("query", 1, "old hits", seconds=0.1)
+
+    assert cache.get("query", 2) is None
+    assert cache.stats()["invalidations"] == 1
+    # A search that started on version 1 finishes after the refresh: its result is not kept.
+    cache.put("query", 1, "old hits", seconds=0.1)
+    assert cache.get("query", 1) is None
+    assert cache.get("query", 2) is None
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import httpx
+
+from utils.rate_limit import RateLimitScheduler
+
+
+def responses(*responses: httpx.Response):
+    """
+    A send callable for RateLimitScheduler.run that answers with the given responses in turn, and records
+    when each request was sent.
+    """
+    sent = []
+
+    async def send() -> httpx.Response:
+        sent.append(time.monotonic())
+        return responses[len(sent) - 1]
+    return send, sent
+
+
+def test_retry_after_is_honoured():
+    scheduler = RateLimitScheduler(capacity=100, window_seconds=1.0, backoff_base=0.01)
+    send, sent = responses(httpx.Response(429, headers={"Retry-After": "0.2"}), httpx.Response(200))
+
+    response = asyncio.run(scheduler.run(send))
+
+    assert response.status_code == 200
+    assert len(sent) == 2
+    assert sent[1] - sent[0] >= 0.2
+    assert scheduler.stats()["throttled_responses"] == 1
+
+
+def test_last_429_is_returned_without_blocking_later_callers():
+    scheduler = RateLimitScheduler(capacity=100, window_seconds=1.0, max_retries=2, backoff_base=0.01)
+    send, sent = responses(*[httpx.Response(429, headers={"Retry-After": "0.05"})] * 3)
+
+    response = asyncio.run(scheduler.run(send))
+
+    assert response.status_code == 429
+    assert len(sent) == 3
+    assert scheduler.stats()["blocked_for_seconds"] == 0
+
+
+def test_callers_are_admitted_in_arrival_order():
+    # One token every 20 ms, so every caller after the first has to queue.
+    scheduler = RateLimitScheduler(capacity=1, window_seconds=0.02)
+    admitted = []
+
+    async def caller(i: int):
+        await scheduler.acquire()
+        admitted.append(i)
+
+    async def run():
+        tasks = []
+        for i in range(6):
+            tasks.append(asyncio.create_task(caller(i)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    started = time.monotonic()
+    asyncio.run(run())
+
+    assert admitted == list(range(6))
+    assert time.monotonic() - started >= 5 * 0.02
+
+
+def test_bucket_follows_the_remaining_quota_header():
+    scheduler = RateLimitScheduler(capacity=600, window_seconds=300.0)
+    send, _ = responses(httpx.Response(200, headers={"X-Ratelimit-Remain": "3"}))
+
+    asyncio.run(scheduler.run(send))
+
+    assert scheduler.stats()["remaining_budget"] == 3
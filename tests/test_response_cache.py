@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import httpx
+
+from utils.response_cache import ResponseCache
+
+URL = "https://api.companieshouse.gov.uk/company/06591591"
+
+
+def response(body: dict, etag: str = None) -> httpx.Response:
+    return httpx.Response(200, json=body, headers={"ETag": etag} if etag else None, request=httpx.Request("GET", URL))
+
+
+def test_entries_go_stale_after_their_endpoint_ttl(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl_seconds={"officers": 0})
+    cache.put("profile", "", response({"company_name": "ZAIZI LTD"}))
+    cache.put("officers", "officers", response({"items": []}))
+
+    assert cache.get("profile")["fresh"]
+    assert not cache.get("officers")["fresh"]
+    assert cache.to_response(cache.get("profile")).json() == {"company_name": "ZAIZI LTD"}
+    assert cache.get("missing") is None
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_entries=2)
+    cache.put("a", "", response({"key": "a"}))
+    time.sleep(0.01)
+    cache.put("b", "", response({"key": "b"}))
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.put("c", "", response({"key": "c"}))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_stale_entries_are_revalidated_with_their_etag(make_companies_house):
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"company_name": "ZAIZI LTD"}, headers={"ETag": '"v1"'})
+
+    async def run():
+        client, ch = make_companies_house(handler)
+        ch.cache.ttl_seconds = {"profile": 0}
+        async with client:
+            first = await ch.get_company_information_async(company_number="06591591")
+            second = await ch.get_company_information_async(company_number="06591591")
+        return ch, first, second
+
+    ch, first, second = asyncio.run(run())
+
+    assert len(requests) == 2
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert second.status_code == 200 and second.json() == first.json()
+    assert ch.cache.revalidations == 1
+
+
+def test_fresh_entries_are_served_without_a_request(make_companies_house):
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={"company_name": "ZAIZI LTD"})
+
+    async def run():
+        client, ch = make_companies_house(handler)
+        async with client:
+            for _ in range(3):
+                await ch.get_company_information_async(company_number="06591591")
+        return ch
+
+    ch = asyncio.run(run())
+
+    assert len(requests) == 1
+    assert (ch.cache.hits, ch.cache.misses) == (2, 1)
@@ -0,0 +1,55 @@
+import asyncio
+
+import httpx
+import pytest
+
+COMPANY_NUMBER = "06591591"
+
+
+def test_concurrent_callers_share_one_upstream_request(make_companies_house):
+    upstream_requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        upstream_requests.append(request.url)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"company_number": COMPANY_NUMBER})
+
+    async def run():
+        client, ch = make_companies_house(handler)
+        async with client:
+            responses = await asyncio.gather(*(
+                ch.get_company_information_async(company_number=COMPANY_NUMBER, use_cache=False) for _ in range(20)
+            ))
+        return ch, responses
+
+    ch, responses = asyncio.run(run())
+
+    assert len(upstream_requests) == 1
+    assert [response.json() for response in responses] == [{"company_number": COMPANY_NUMBER}] * 20
+    assert ch.single_flight.coalesced == 19
+    assert ch.single_flight.in_flight == 0
+
+
+def test_upstream_error_reaches_every_waiter(make_companies_house):
+    upstream_requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        upstream_requests.append(request.url)
+        await asyncio.sleep(0.05)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    async def run():
+        client, ch = make_companies_house(handler)
+        async with client:
+            results = await asyncio.gather(*(
+                ch.get_company_information_async(company_number=COMPANY_NUMBER, use_cache=False) for _ in range(10)
+            ), return_exceptions=True)
+            # The failed request is forgotten, so the next call goes upstream again.
+            with pytest.raises(httpx.ConnectError):
+                await ch.get_company_information_async(company_number=COMPANY_NUMBER, use_cache=False)
+        return results
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, httpx.ConnectError) for result in results)
+    assert len(upstream_requests) == 2
@@ -1,5 +1,7 @@
+from typing import Optional
+import httpx
 from utils.mcp_instance import mcp
-from utils.companies_house_API import companies_house
+from utils.companies_house_API import get_companies_house, DOSSIER_SECTIONS
 
 @mcp.tool(name="list_available_competitors")
 def get_competitors() -> dict:
@@ -14,7 +16,7 @@ def get_competitors() -> dict:
     """
     
 
-    competitors = companies_house().competitors
+    competitors = get_companies_house().competitors
     return competitors
 
 
@@ -35,7 +37,7 @@ async def get_company_profile(company_number: str) -> dict:
             "message": "The company number is unknown. You should call the 'list_available_competitors' tool to get a list of companies and their numbers."
         }
  
-    response = await companies_house().get_company_information_async(company_number=company_number)
+    response = await get_companies_house().get_company_information_async(company_number=company_number)
 
 
     if response.status_code == 200:
@@ -64,7 +66,7 @@ async def get_company_charges(company_number: str) -> dict:
             "message": "Ask user if you should call the 'list_available_competitors' tool to get a list of companies and their numbers."
         }
  
-    response = await companies_house().get_company_information_async(company_number=company_number, purpose="charges")
+    response = await get_companies_house().get_company_information_async(company_number=company_number, purpose="charges")
 
 
     if response.status_code == 200:
@@ -94,7 +96,7 @@ async def get_company_officers(company_number: str) -> dict:
             "status": "user_guidance", 
             "message": "The company number is unknown. You should call the 'list_available_competitors' tool to get a list of companies and their numbers."
         }
-    response = await companies_house().get_company_information_async(company_number=company_number, purpose="officers")
+    response = await get_companies_house().get_company_information_async(company_number=company_number, purpose="officers")
 
 
     if response.status_code == 200:
@@ -124,7 +126,7 @@ async def get_person_significant_control(company_number: str) -> dict:
             "message": "The company number is unknown. You should call the 'list_available_competitors' tool to get a list of companies and their numbers."
         }
     
-    response = await companies_house().get_company_information_async(company_number=company_number, purpose="persons-with-significant-control")
+    response = await get_companies_house().get_company_information_async(company_number=company_number, purpose="persons-with-significant-control")
 
 
     if response.status_code == 200:
@@ -152,7 +154,7 @@ async def get_company_latest_filing(company_number: str) -> dict:
             "message": "The company number is unknown. You should call the 'list_available_competitors' tool to get a list of companies and their numbers."
         }
  
-    response = await companies_house().get_company_latest_filing_async(company_number=company_number)
+    response = await get_companies_house().get_company_latest_filing_async(company_number=company_number)
 
 
     if response.status_code == 200:
@@ -164,6 +166,83 @@ async def get_company_latest_filing(company_number: str) -> dict:
             "details": response.text  # .text is often more informative for errors than .json()
         } 
     
+@mcp.tool(name="download_company_latest_filing")
+async def download_company_latest_filing(company_number: str) -> dict: 
+    """
+    Downloads the latest "accounts" filing document of a company into the local document store.
+    Filings that were downloaded before are returned straight from the store.
+
+    Args:
+        company_number (str): The official registration number for the company.
+
+    Returns:
+        dict: On success, a handle with the local file path, sha256, size and filing details (not the file contents). On failure, it contains error details.
+    """
+    if company_number is None:
+        return {
+            "status": "user_guidance", 
+            "message": "The company number is unknown. You should call the 'list_available_competitors' tool to get a list of companies and their numbers."
+        }
+
+    download = await get_companies_house().get_document_with_company_number_async(company_number=company_number)
+    if download is None:
+        return {"status": "error", "details": f"Could not download the latest filing for company {company_number}."}
+    return download
+
+# Collection name accepted by list_company_records -> companies house "purpose" path segment.
+COMPANY_COLLECTIONS = {
+    "officers": "officers",
+    "persons_with_significant_control": "persons-with-significant-control",
+    "charges": "charges",
+    "filing_history": "filing-history",
+}
+
+async def _collect(items, max_items: int) -> dict:
+    # One extra item is requested so that truncation can be reported.
+    collected = [item async for item in items]
+    return {"items": collected[:max_items], "count": min(len(collected), max_items), "truncated": len(collected) > max_items}
+
+@mcp.tool(name="list_company_records")
+async def list_company_records(company_number: str, collection: str = "officers", max_items: int = 200, category: Optional[str] = None) -> dict: 
+    """
+    Obtains every record of a company collection from Companies House, following all result pages.
+    Unlike get_company_officers and similar tools this is not limited to the first page.
+
+    Args:
+        company_number (str): The official registration number for the company.
+        collection (str): One of "officers", "persons_with_significant_control", "charges", "filing_history".
+        max_items (int): Maximum number of records to return. Defaults to 200.
+        category (str, optional): Filing history category filter (e.g. "accounts"). Only used for "filing_history".
+
+    Returns:
+        dict: On success, {"items": [...], "count": n, "truncated": bool}. On failure, it contains error details.
+    """
+    if company_number is None:
+        return {
+            "status": "user_guidance", 
+            "message": "The company number is unknown. You should call the 'list_available_competitors' tool to get a list of companies and their numbers."
+        }
+    if collection not in COMPANY_COLLECTIONS:
+        return {
+            "status": "user_guidance",
+            "message": f"Unknown collection '{collection}'. Choose from {list(COMPANY_COLLECTIONS)}."
+        }
+
+    query_params = {"category": category} if category and collection == "filing_history" else None
+    items = get_companies_house().iter_company_collection_async(company_number=company_number, purpose=COMPANY_COLLECTIONS[collection],
+                                                                max_items=max_items + 1, query_params=query_params)
+    try:
+        return {"status": "success", "data": await _collect(items, max_items)}
+    except httpx.HTTPStatusError as e:
+        return {
+            "status": "error",
+            "statusCode": e.response.status_code,
+            "details": e.response.text
+        }
+    except httpx.RequestError as e:
+        # A network failure or timeout part way through the pages.
+        return {"status": "error", "details": f"{type(e).__name__}: {e}"}
+
 @mcp.tool(name="search_by_sic_code")
 async def get_company_by_sic(sic_codes: list[str], size: str = "10") -> dict: 
     """
@@ -182,7 +261,7 @@ async def get_company_by_sic(sic_codes: list[str], size: str = "10") -> dict:
             "message": "Ask if user wantst to search for companies with the same sic code as Zaizi (62020)."
         }
  
-    response = await companies_house().get_list_advanced_company_search(sic_codes=sic_codes, size=size )
+    response = await get_companies_house().get_list_advanced_company_search(sic_codes=sic_codes, size=size )
 
     if response.status_code == 200:
         return {"status": "success", "data": response.json()}
@@ -192,4 +271,97 @@ async def get_company_by_sic(sic_codes: list[str], size: str = "10") -> dict:
             "statusCode": response.status_code,
             "details": response.text  
         } 
-    
\ No newline at end of file
+    
+
+@mcp.tool(name="get_companies_house_rate_limit_status")
+def get_rate_limit_status() -> dict:
+    """
+    Reports how much of the Companies House request budget is left and how many requests are queued.
+
+    Returns:
+        dict: Queue depth, remaining budget, bucket capacity/window, the number of throttled (429) responses seen,
+        and how many identical in-flight requests were coalesced.
+    """
+    ch = get_companies_house()
+    stats = ch.scheduler.stats()
+    stats["in_flight_requests"] = ch.single_flight.in_flight
+    stats["coalesced_requests"] = ch.single_flight.coalesced
+    return {"status": "success", "data": stats}
+
+
+@mcp.tool(name="get_companies_house_cache_stats")
+def get_cache_stats() -> dict:
+    """
+    Reports hit/miss counters and size of the Companies House response cache.
+
+    Returns:
+        dict: Hits, misses, revalidations, hit rate, evictions and the number of cached entries.
+    """
+    cache = get_companies_house().cache
+    if cache is None:
+        return {"status": "disabled", "message": "The Companies House response cache is disabled in config.toml."}
+    return {"status": "success", "data": cache.stats()}
+
+
+@mcp.tool(name="get_company_dossier")
+async def get_company_dossier(company_numbers: Optional[list[str]] = None, sections: Optional[list[str]] = None) -> dict:
+    """
+    Fetches several sections for several companies from Companies House in one call, concurrently.
+    Prefer this over calling the individual company tools one after another.
+
+    Args:
+        company_numbers (list[str], optional): Companies to brief on. Defaults to every competitor listed in config.toml.
+        sections (list[str], optional): Any of "profile", "officers", "persons_with_significant_control", "charges", "latest_filing". Defaults to all of them.
+
+    Returns:
+        dict: {"status": "success", "data": {company_number: {section: result}}}, where each section result has its own status so one failure does not hide the rest.
+    """
+    ch = get_companies_house()
+    if not company_numbers:
+        company_numbers = [competitor["company_number"] for competitor in ch.competitors]
+    if not sections:
+        sections = list(DOSSIER_SECTIONS)
+
+    unknown = [section for section in sections if section not in DOSSIER_SECTIONS]
+    if unknown:
+        return {
+            "status": "user_guidance",
+            "message": f"Unknown sections {unknown}. Choose from {list(DOSSIER_SECTIONS)}."
+        }
+
+    dossier = await ch.get_company_dossier_async(company_numbers=company_numbers, sections=sections)
+    return {"status": "success", "data": dossier}
+
+
+
+@mcp.tool(name="search_all_by_sic_code")
+async def search_all_by_sic_code(sic_codes: list[str], max_items: int = 100) -> dict: 
+    """
+    Searches for companies by sic code, following result pages until max_items companies are collected.
+
+    Args:
+        sic_codes (list[str]): SIC codes to search for (e.g. ["62020"]).
+        max_items (int): Maximum number of companies to return. Defaults to 100.
+
+    Returns:
+        dict: On success, {"items": [...], "count": n, "truncated": bool}. On failure, it contains error details.
+    """
+    if sic_codes is None:
+        return {
+            "status": "user_guidance", 
+            "message": "Ask if user wantst to search for companies with the same sic code as Zaizi (62020)."
+        }
+
+    items = get_companies_house().iter_advanced_company_search_async(sic_codes=sic_codes, page_size=min(max_items + 1, 5000),
+                                                                     max_items=max_items + 1)
+    try:
+        return {"status": "success", "data": await _collect(items, max_items)}
+    except httpx.HTTPStatusError as e:
+        return {
+            "status": "error",
+            "statusCode": e.response.status_code,
+            "details": e.response.text
+        }
+    except httpx.RequestError as e:
+        # A network failure or timeout part way through the pages.
+        return {"status": "error", "details": f"{type(e).__name__}: {e}"}
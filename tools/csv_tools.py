@@ -1,15 +1,27 @@
 from utils.mcp_instance import mcp
-from utils.file_reader import read_csv_summary, ContractAnalyser
-import pandas as pd
+import base64
+import hashlib
+import json
+from datetime import date
+from typing import Optional
+
+# pandas, pyarrow and the contracts store are imported by the tools that use them, not when the server starts.
+
+MAX_PAGE_SIZE = 100
+MAX_TEXT_LENGTH = 500
+DEFAULT_QUERY_COLUMNS = ['Award ID', 'Award Date', 'Award Status', 'Award Value', 'Award Value Currency',
+                         'Tender Title', 'Buyer Name', 'Supplier Name']
 
 @mcp.tool(name="summarise_csv_file")
-def summarise_csv_file(filename: str) -> str:
+def summarise_csv_file(filename: str, sample_fraction: Optional[float] = None) -> dict:
     """
-    Summarise a CSV file by reporting its number of rows and columns.
+    Summarise a CSV file: its number of rows and, per column, the type, null count, distinct values,
+    examples and min/max/mean/std (numeric) or maximum length (text).
     Args:
         filename: Name of the CSV file in the /data directory (e.g., 'sample.csv')
+        sample_fraction: Optionally read only this fraction (0-1) of the rows, for a quick estimate on a large file.
     Returns:
-        A string describing the file's dimensions.
+        A dictionary describing the file's contents.
     """
 
     if filename is None:
@@ -17,8 +29,16 @@ def summarise_csv_file(filename: str) -> str:
             "status": "user_guidance", 
             "message": "The file name is unknown. Suggest the user uses'sample.csv' as an example."
             }
-    
-    return read_csv_summary(filename)
+    if sample_fraction is not None and not 0 < sample_fraction <= 1:
+        return {"status": "user_guidance", "message": "sample_fraction must be between 0 and 1."}
+
+    from utils.file_reader import read_csv_summary
+
+    try:
+        summary = read_csv_summary(filename, sample_fraction=sample_fraction)
+    except FileNotFoundError:
+        return {"status": "user_guidance", "message": f"There is no file '{filename}' in the data directory."}
+    return {"status": "success", "data": summary}
 
 @mcp.tool(name="Read_Govt_Awards_CSV")
 def Read_Govt_Awards_CSV():
@@ -27,8 +47,277 @@ def Read_Govt_Awards_CSV():
     Loads and returns government contract awards as a list of records.
         
     """
+    from utils.file_reader import get_contract_analyser
+
+    awards = get_contract_analyser()
+    if awards.load_error is not None:
+        return {"status": "error", "message": f"The {awards.year} award data could not be loaded: {awards.load_error}"}
 
-    awards = ContractAnalyser()
-    
     return awards.contracts_df.to_dict(orient="records")
 
+
+@mcp.tool(name="contract_data_status")
+def contract_data_status(year: Optional[int] = None) -> dict:
+    """
+    Reports the state of the in-memory government contracts data for a year.
+
+    Args:
+        year (int, optional): Award year. Defaults to the current year.
+
+    Returns:
+        dict: Number of awards loaded, how long the last (re)load took and how much memory the data uses.
+    """
+    from utils.file_reader import get_contract_analyser
+
+    awards = get_contract_analyser(year=year)
+    return {
+        "status": "success",
+        "data": {
+            "year": awards.year,
+            "awards": 0 if awards.contracts_df is None else len(awards.contracts_df),
+            "load_seconds": awards.load_seconds,
+            "memory_bytes": awards.memory_bytes,
+        }
+    }
+
+
+
+
+def _encode_cursor(offset: int, query_hash: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"offset": offset, "query": query_hash}).encode()).decode()
+
+
+def _decode_cursor(cursor: str, query_hash: str) -> int:
+    state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if state.get("query") != query_hash:
+        raise ValueError("cursor belongs to a different query")
+    return int(state["offset"])
+
+
+def _to_json_records(df: "pd.DataFrame") -> list:
+    import pandas as pd
+
+    records = []
+    for record in df.astype(object).where(df.notna(), None).to_dict(orient="records"):
+        for column, value in record.items():
+            if isinstance(value, pd.Timestamp):
+                record[column] = value.isoformat()
+            elif isinstance(value, str) and len(value) > MAX_TEXT_LENGTH:
+                record[column] = value[:MAX_TEXT_LENGTH] + "..."
+        records.append(record)
+    return records
+
+
+@mcp.tool(name="query_govt_awards")
+def query_govt_awards(buyer: Optional[str] = None, supplier: Optional[str] = None, title: Optional[str] = None,
+                      status: Optional[str] = None, min_value: Optional[float] = None, max_value: Optional[float] = None,
+                      date_from: Optional[str] = None, date_to: Optional[str] = None, columns: Optional[list[str]] = None,
+                      sort_by: str = "Award Date", descending: bool = True, page_size: int = 20,
+                      cursor: Optional[str] = None) -> dict:
+    """
+    Searches government contract awards with filters and returns one page of matching awards.
+    Prefer this over Read_Govt_Awards_CSV, which returns every award of the year.
+
+    Args:
+        buyer (str, optional): Case-insensitive text contained in the buyer name.
+        supplier (str, optional): Case-insensitive text contained in the supplier name (e.g. 'Zaizi').
+        title (str, optional): Case-insensitive text contained in the tender title or award description.
+        status (str, optional): Exact award status (e.g. 'active').
+        min_value (float, optional): Minimum award value.
+        max_value (float, optional): Maximum award value.
+        date_from (str, optional): Earliest award date, YYYY-MM-DD. Without any dates, the current year is searched.
+        date_to (str, optional): Latest award date, YYYY-MM-DD.
+        columns (list[str], optional): Columns to return. Defaults to a compact set of the main columns.
+        sort_by (str): Column to sort by. Defaults to 'Award Date'.
+        descending (bool): Sort order. Defaults to newest/largest first.
+        page_size (int): Awards per page, at most 100. Defaults to 20.
+        cursor (str, optional): The next_cursor from a previous call with the same filters, to get the next page.
+
+    Returns:
+        dict: {"awards": [...], "total": matching awards, "next_cursor": cursor for the next page or None}.
+    """
+    from utils.contract_records import AWARD_COLUMNS
+    from utils import contracts_store
+
+    columns = columns or DEFAULT_QUERY_COLUMNS
+    unknown = [column for column in columns + [sort_by] if column not in AWARD_COLUMNS]
+    if unknown:
+        return {
+            "status": "user_guidance",
+            "message": f"Unknown columns {unknown}. Choose from {AWARD_COLUMNS}."
+        }
+
+    try:
+        start = date.fromisoformat(date_from) if date_from else None
+        end = date.fromisoformat(date_to) if date_to else None
+    except ValueError:
+        return {"status": "user_guidance", "message": "date_from and date_to must be in YYYY-MM-DD format."}
+    if start is None and end is None:
+        start, end = date(date.today().year, 1, 1), date(date.today().year, 12, 31)
+
+    filters = dict(buyer=buyer, supplier=supplier, title=title, status=status, min_value=min_value,
+                   max_value=max_value, date_from=start, date_to=end)
+    query_hash = hashlib.sha1(json.dumps([filters, columns, sort_by, descending], default=str).encode()).hexdigest()
+    try:
+        offset = _decode_cursor(cursor, query_hash) if cursor else 0
+    except (ValueError, json.JSONDecodeError, KeyError) as e:
+        return {"status": "user_guidance", "message": f"Invalid cursor ({e}). Repeat the query without a cursor."}
+
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    # The filters are pushed down into the Parquet scan, so the year's awards are never loaded into memory.
+    page, total = contracts_store.query_awards(filter=contracts_store.build_award_filter(**filters), columns=columns,
+                                               sort_by=sort_by, descending=descending, offset=offset, limit=page_size)
+    next_offset = offset + len(page)
+    return {
+        "status": "success",
+        "data": {
+            "awards": _to_json_records(page),
+            "total": total,
+            "next_cursor": _encode_cursor(next_offset, query_hash) if next_offset < total else None,
+        }
+    }
+
+
+@mcp.tool(name="search_govt_awards")
+def search_govt_awards(query: str, year: Optional[int] = None, page_size: int = 20, offset: int = 0) -> dict:
+    """
+    Keyword search over tender titles and award descriptions, ranked by relevance (BM25).
+    Use it to find contracts about a topic, then query_govt_awards or the Award IDs for details.
+
+    Args:
+        query (str): Words that must all appear, e.g. 'cloud migration'. Use "double quotes" for an exact
+            phrase ('"digital platform"') and a trailing * for a prefix ('digit*').
+        year (int, optional): Only search awards of this year. Defaults to every year.
+        page_size (int): Hits per page, at most 100. Defaults to 20.
+        offset (int): Number of hits to skip, for the next page.
+
+    Returns:
+        dict: {"hits": [{"award_id", "award_year", "tender_title", "score"}, ...], "total": matching awards}.
+    """
+    if not query.strip():
+        return {"status": "user_guidance", "message": "Provide at least one search word."}
+    from utils.award_index import get_award_index
+
+    page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+    hits, total = get_award_index().search(query, year=year, offset=max(0, offset), limit=page_size)
+    return {
+        "status": "success",
+        "data": {
+            "hits": hits,
+            "total": total,
+        }
+    }
+
+
+@mcp.tool(name="govt_awards_rollup")
+def govt_awards_rollup(dimension: str = "supplier", zaizi_only: bool = False, supplier: Optional[str] = None,
+                       buyer: Optional[str] = None, sort_by: str = "total_value", top_n: int = 10,
+                       year: Optional[int] = None) -> dict:
+    """
+    Answers market-intelligence questions from pre-computed award aggregates, e.g.
+    "top buyers for Zaizi this year" (dimension="buyer", zaizi_only=True),
+    "a competitor's wins and value by month" (dimension="month", supplier="Made Tech"),
+    "market share by supplier" (dimension="supplier").
+
+    Args:
+        dimension (str): One of "supplier", "buyer", "month", "supplier_month", "buyer_supplier".
+        zaizi_only (bool): Only count awards won by Zaizi.
+        supplier (str, optional): Only count suppliers whose name contains this text.
+        buyer (str, optional): Only count buyers whose name contains this text.
+        sort_by (str): "total_value", "awards", or a dimension column such as "Award Month".
+        top_n (int): Number of groups to return. Defaults to 10.
+        year (int, optional): Award year. Defaults to the current year.
+
+    Returns:
+        dict: Rows with award counts, total value and value share of the filtered total, plus overall totals.
+    """
+    import pandas as pd
+    from utils.file_reader import ROLLUP_DIMENSIONS, get_contract_analyser
+
+    if dimension not in ROLLUP_DIMENSIONS:
+        return {
+            "status": "user_guidance",
+            "message": f"Unknown dimension '{dimension}'. Choose from {list(ROLLUP_DIMENSIONS)}."
+        }
+    if sort_by not in ["total_value", "awards", *ROLLUP_DIMENSIONS[dimension]]:
+        return {
+            "status": "user_guidance",
+            "message": f"sort_by must be 'total_value', 'awards' or one of {ROLLUP_DIMENSIONS[dimension]}."
+        }
+
+    try:
+        rollup = get_contract_analyser(year=year).rollup(dimension=dimension, zaizi_only=zaizi_only, supplier=supplier,
+                                                         buyer=buyer, sort_by=sort_by, top_n=max(1, top_n))
+    except RuntimeError as e:
+        return {"status": "error", "message": str(e)}
+    rollup["rows"] = _to_json_records(pd.DataFrame(rollup["rows"]))
+    return {"status": "success", "data": rollup}
+
+
+@mcp.tool(name="resolve_supplier_companies")
+async def resolve_supplier_companies(supplier_names: list[str]) -> dict:
+    """
+    Links Contracts Finder supplier names to Companies House company numbers, so the Companies House tools
+    can be used on a supplier. Results are stored, so repeated names are answered without re-matching.
+
+    Args:
+        supplier_names (list[str]): Supplier names as they appear in the awards, e.g. ['MADE TECH LIMITED'].
+
+    Returns:
+        dict: One entry per name with "Company Number" (None when unresolved), "Company Name", "Score" (0-100)
+              and "Method" ("identifier", "exact", "fuzzy", "ambiguous" or "unresolved").
+    """
+    if not supplier_names:
+        return {"status": "user_guidance", "message": "Provide at least one supplier name."}
+    import anyio
+    import pandas as pd
+    from utils.entity_resolution import get_supplier_resolver
+
+    def resolve() -> pd.DataFrame:
+        return get_supplier_resolver().resolve(pd.DataFrame({"Supplier Name": supplier_names}))
+
+    # Building the resolver's name index and matching names are CPU-bound, so they run off the event loop.
+    mappings = await anyio.to_thread.run_sync(resolve)
+    return {"status": "success", "data": _to_json_records(mappings.drop(columns=["Registry Size"]))}
+
+
+@mcp.tool(name="competitor_awards_summary")
+async def competitor_awards_summary(year: Optional[int] = None, company_numbers: Optional[list[str]] = None) -> dict:
+    """
+    Counts the awards and total value won by each competitor, matching awards to companies by their
+    resolved company number rather than by supplier name text.
+
+    Args:
+        year (int, optional): Award year. Defaults to the current year.
+        company_numbers (list[str], optional): Companies to report on. Defaults to the competitors in config.toml.
+
+    Returns:
+        dict: One row per company with "Company Number", "awards", "total_value" and the supplier names it traded as.
+    """
+    import anyio
+
+    # Loading the year and building the resolver's name index are blocking, so they run off the event loop.
+    return await anyio.to_thread.run_sync(_competitor_awards_summary, year, company_numbers)
+
+
+def _competitor_awards_summary(year: Optional[int], company_numbers: Optional[list[str]]) -> dict:
+    from utils.entity_resolution import get_supplier_resolver
+    from utils.file_reader import get_contract_analyser
+
+    analyser = get_contract_analyser(year=year)
+    if analyser.load_error is not None:
+        return {"status": "error", "message": f"The {analyser.year} award data could not be loaded: {analyser.load_error}"}
+
+    resolver = get_supplier_resolver()
+    company_numbers = company_numbers or resolver.competitor_numbers
+    awards = analyser.contracts_df[["Supplier Name", "Supplier ID", "Award Value"]]
+    resolver.resolve(awards)
+
+    linked = resolver.link_awards(awards)
+    linked = linked[linked["Company Number"].isin(company_numbers)]
+    summary = (linked.groupby("Company Number")
+                     .agg(awards=("Award Value", "size"), total_value=("Award Value", "sum"),
+                          supplier_names=("Supplier Name", lambda names: sorted(names.unique())))
+                     .reset_index()
+                     .sort_values("total_value", ascending=False))
+    return {"status": "success", "data": summary.to_dict(orient="records")}
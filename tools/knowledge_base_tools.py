@@ -1,22 +1,76 @@
 from utils.mcp_instance import mcp
 from utils.retreival_augmented_generation import KnowledgeBaseTool
 from pathlib import Path
+from typing import Optional
 
+MAX_HITS = 20
 vector_dir = Path(__file__).resolve().parent.parent 
 vector_name = "faiss_index"
 
+# The index is loaded (or built) in the background once the server starts; see server.py.
 kb_tool = KnowledgeBaseTool(index_directory=vector_dir, index_file=vector_name)
 
+
+def _warming_up() -> dict:
+    if kb_tool.state == "failed":
+        return {"status": "error", "message": f"The knowledge base could not be built: {kb_tool.error}"}
+    return {
+        "status": "warming_up",
+        "progress": kb_tool.progress,
+        "message": f"The knowledge base is warming up, {kb_tool.progress}% done. Try again shortly."
+    }
+
+
 @mcp.tool(name="retrieve_from_knowledge_base")
-def knowledge_base_search(query: str) -> dict:
+def knowledge_base_search(query: str, k: int = 5, source: Optional[str] = None, company_number: Optional[str] = None,
+                          page_from: Optional[int] = None, page_to: Optional[int] = None) -> dict:
     """
-    Searches the internal knowledge base for information relevant to the user's query.
-    Use this to answer questions about specific internal documents.
+    Searches the internal knowledge base (filed company documents) for passages relevant to the user's query.
+    Matches both meaning and exact terms, so company numbers, barcodes and figures can be searched for directly.
+
+    Args:
+        query (str): The question or keywords.
+        k (int): Number of passages to return, at most 20. Defaults to 5.
+        source (str, optional): Only search this document (its file name, as given in a hit's "source").
+        company_number (str, optional): Only search documents filed by this company.
+        page_from (int, optional): First page to search.
+        page_to (int, optional): Last page to search.
+
+    Returns:
+        dict: {"hits": [...]}, best first. Each hit has the passage "text", a citation ("source" file and "page"),
+              "company_number" and its relevance "score".
     """
+    if not kb_tool.ready:
+        return _warming_up()
+    if kb_tool.vector_store is None:
+        return {"status": "user_guidance", "message": "The knowledge base is empty: there are no PDFs in the data directory or downloaded filings."}
 
-    query_result = kb_tool.search(query)
-    result ={"result": query_result}
-    return result
+    hits = kb_tool.search(query, k=max(1, min(k, MAX_HITS)), source=source, company_number=company_number,
+                          page_from=page_from, page_to=page_to)
+    return {"status": "success", "data": {"hits": hits}}
 
 
+@mcp.tool(name="refresh_knowledge_base")
+def refresh_knowledge_base() -> dict:
+    """
+    Indexes PDFs added to, changed in or removed from the data directory since the knowledge base was built.
+    Only those files are read and embedded. Runs in the background; searches keep using the current index meanwhile.
+    """
+    started = kb_tool.start_background()
+    return {
+        "status": "success",
+        "message": "Refreshing the knowledge base in the background." if started else "A refresh is already running.",
+        "data": kb_tool.status()
+    }
+
 
+@mcp.tool(name="knowledge_base_status")
+def knowledge_base_status() -> dict:
+    """
+    Reports the state of the knowledge base: whether it is ready, its index version, and the hit rates and
+    time saved by its search result and query embedding caches.
+
+    Returns:
+        dict: {"state", "progress", "error", "last_refresh", "index_version", "result_cache", "query_embedding_cache"}.
+    """
+    return {"status": "success", "data": kb_tool.status()}
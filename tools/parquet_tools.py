@@ -1,12 +1,18 @@
-from server.server import mcp
-from utils.file_reader import read_parquet_summary
+from utils.mcp_instance import mcp
 @mcp.tool()
-def summarise_parquet_file(filename: str) -> str:
+def summarise_parquet_file(filename: str) -> dict:
     """
-Summarise a Parquet file by reporting its number of rows and columns.
+Summarise a Parquet file by reporting its number of rows, its schema and per-column null counts and min/max.
+    Only the file's metadata is read, so this is fast for any file size.
     Args:
         filename: Name of the Parquet file in the /data directory (e.g., 'sample.parquet')
     Returns:
-        A string describing the file's dimensions.
+        A dictionary describing the file's contents.
     """
-    return read_parquet_summary(filename)
\ No newline at end of file
+    from utils.file_reader import read_parquet_summary
+
+    try:
+        summary = read_parquet_summary(filename)
+    except FileNotFoundError:
+        return {"status": "user_guidance", "message": f"There is no file '{filename}' in the data directory."}
+    return {"status": "success", "data": summary}
@@ -0,0 +1,115 @@
+import logging
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from utils.contracts_store import AWARDS_DIR, CONTRACTS_DIR, read_awards
+from utils.fts_index import FtsIndex, bm25_score, build_match_expression
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = CONTRACTS_DIR / "award_index.sqlite"
+# Columns the index is built from.
+INDEX_SOURCE_COLUMNS = ["Award ID", "Award Year", "Tender Title", "Award Description"]
+# BM25 weights of the title and description columns; a title match counts for more.
+TITLE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+class AwardSearchIndex(FtsIndex):
+    """
+    An on-disk full-text index of award tender titles and descriptions, backed by SQLite FTS5.
+
+    Awards are ranked with BM25, weighting title matches above description matches. Documents are
+    keyed by Award ID, so re-indexing an award replaces its previous entry and the index can be kept
+    up to date with the same rows that are upserted into the contracts store.
+    """
+    def __init__(self, path: Path = INDEX_FILE):
+        super().__init__(path, table="awards", key="award_id", attributes={"award_year": "INTEGER"},
+                         text_columns=["title", "description"], filtered=["award_year"])
+
+    def upsert(self, df: pd.DataFrame) -> int:
+        """
+        Indexes (or re-indexes) awards. df needs the INDEX_SOURCE_COLUMNS.
+
+        Returns:
+            int: The number of awards indexed.
+        """
+        df = df.dropna(subset=["Award ID"]).drop_duplicates(subset=["Award ID"], keep="last")
+        rows = [
+            (str(award_id), None if pd.isna(year) else int(year),
+             "" if pd.isna(title) else str(title), "" if pd.isna(description) else str(description))
+            for award_id, year, title, description in df[INDEX_SOURCE_COLUMNS].itertuples(index=False, name=None)
+        ]
+        self._index_rows(rows)
+        return len(rows)
+
+    def rebuild(self, awards_dir: Path = AWARDS_DIR) -> int:
+        """
+        Re-indexes every award in the contracts dataset, one year at a time.
+        """
+        self.clear()
+        indexed = 0
+        years = sorted(int(path.name.split("=")[1]) for path in Path(awards_dir).glob("award_year=*"))
+        for year in years:
+            indexed += self.upsert(read_awards(year=year, columns=INDEX_SOURCE_COLUMNS, awards_dir=awards_dir))
+        self.optimize()
+        logger.info(f"Indexed {indexed} awards from {awards_dir}.")
+        return indexed
+
+    def search(self, query: str, year: Optional[int] = None, offset: int = 0, limit: int = 20) -> tuple[list[dict], int]:
+        """
+        Ranks awards against a query, best match first.
+
+        Returns:
+            tuple: (the requested page of hits as {"award_id", "award_year", "tender_title", "score"},
+                    total number of matching awards)
+        """
+        expression = build_match_expression(query)
+        if expression is None:
+            return [], 0
+
+        where = "awards_fts MATCH ?"
+        params: list = [expression]
+        if year is not None:
+            where += " AND awards.award_year = ?"
+            params.append(year)
+        # Counting without the join is several times faster when no year filter needs it.
+        count_sql = (f"SELECT COUNT(*) FROM awards_fts JOIN awards ON awards.rowid = awards_fts.rowid WHERE {where}"
+                     if year is not None else "SELECT COUNT(*) FROM awards_fts WHERE awards_fts MATCH ?")
+
+        with self._lock:
+            (total,) = self._conn.execute(count_sql, params).fetchone()
+            rows = self._conn.execute(
+                f"""
+                SELECT awards.award_id, awards.award_year, awards_fts.title,
+                       bm25(awards_fts, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS rank
+                FROM awards_fts JOIN awards ON awards.rowid = awards_fts.rowid
+                WHERE {where}
+                ORDER BY rank
+                LIMIT ? OFFSET ?
+                """,
+                [*params, limit, offset],
+            ).fetchall()
+
+        hits = [
+            {"award_id": award_id, "award_year": award_year, "tender_title": title, "score": bm25_score(rank)}
+            for award_id, award_year, title, rank in rows
+        ]
+        return hits, total
+
+
+_award_index: Optional[AwardSearchIndex] = None
+
+
+def get_award_index() -> AwardSearchIndex:
+    """
+    Returns the process-wide award search index, building it from the contracts dataset on first use
+    if it is empty.
+    """
+    global _award_index
+    if _award_index is None:
+        _award_index = AwardSearchIndex()
+        if len(_award_index) == 0 and AWARDS_DIR.exists():
+            _award_index.rebuild(AWARDS_DIR)
+    return _award_index
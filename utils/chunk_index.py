@@ -0,0 +1,91 @@
+import logging
+from pathlib import Path
+from typing import Iterable, Optional
+
+from langchain_core.documents import Document
+
+from utils.fts_index import FtsIndex, bm25_score, build_match_expression
+
+logger = logging.getLogger(__name__)
+
+# Stored next to the FAISS files.
+KEYWORD_INDEX_FILE = "keywords.sqlite"
+
+def normalise_company_number(company_number: str) -> str:
+    company_number = company_number.strip().upper()
+    return company_number.zfill(8) if company_number.isdigit() else company_number
+
+
+class ChunkKeywordIndex(FtsIndex):
+    """
+    A full-text (BM25) index of knowledge-base chunks, backed by SQLite FTS5, kept alongside the FAISS index.
+
+    Exact tokens such as company numbers, barcodes and figures are matched here rather than by embeddings.
+    Chunks are keyed by the same ids as in the vector store, with their source file, page and company number,
+    so both indexes can be filtered the same way.
+    """
+    def __init__(self, path: Path):
+        super().__init__(path, table="chunks", key="chunk_id",
+                         attributes={"source": "TEXT NOT NULL", "page": "INTEGER", "company_number": "TEXT"},
+                         text_columns=["text"], filtered=["source", "company_number"])
+
+    def add(self, documents: Iterable[Document]):
+        """
+        Indexes (or re-indexes) chunks. Each document needs an id and a "source" metadata entry.
+        """
+        self._index_rows((document.id, document.metadata["source"], document.metadata.get("page"),
+                          document.metadata.get("company_number"), document.page_content) for document in documents)
+
+    @staticmethod
+    def _filters(source: Optional[str], company_number: Optional[str], page_from: Optional[int],
+                 page_to: Optional[int]) -> tuple[list[str], list]:
+        where, params = [], []
+        if source is not None:
+            where.append("chunks.source = ?")
+            params.append(source)
+        if company_number is not None:
+            where.append("chunks.company_number = ?")
+            params.append(normalise_company_number(company_number))
+        if page_from is not None:
+            where.append("chunks.page >= ?")
+            params.append(page_from)
+        if page_to is not None:
+            where.append("chunks.page <= ?")
+            params.append(page_to)
+        return where, params
+
+    def chunk_ids(self, source: Optional[str] = None, company_number: Optional[str] = None,
+                  page_from: Optional[int] = None, page_to: Optional[int] = None) -> list[str]:
+        """
+        Returns the ids of the chunks that pass the filters.
+        """
+        where, params = self._filters(source, company_number, page_from, page_to)
+        sql = "SELECT chunk_id FROM chunks" + (" WHERE " + " AND ".join(where) if where else "")
+        with self._lock:
+            return [chunk_id for (chunk_id,) in self._conn.execute(sql, params)]
+
+    def search(self, query: str, limit: int = 20, source: Optional[str] = None, company_number: Optional[str] = None,
+               page_from: Optional[int] = None, page_to: Optional[int] = None) -> list[tuple[str, float]]:
+        """
+        Ranks the chunks that pass the filters against a query. Any query term may match; chunks matching
+        more (and rarer) terms rank first.
+
+        Returns:
+            list: (chunk_id, BM25 score) pairs, best match first.
+        """
+        expression = build_match_expression(query, operator="OR")
+        if expression is None:
+            return []
+        where, params = self._filters(source, company_number, page_from, page_to)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT chunks.chunk_id, bm25(chunks_fts) AS rank
+                FROM chunks_fts JOIN chunks ON chunks.rowid = chunks_fts.rowid
+                WHERE {" AND ".join(["chunks_fts MATCH ?", *where])}
+                ORDER BY rank
+                LIMIT ?
+                """,
+                [expression, *params, limit],
+            ).fetchall()
+        return [(chunk_id, bm25_score(rank)) for chunk_id, rank in rows]
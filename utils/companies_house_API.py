@@ -1,31 +1,194 @@
 import httpx
 import asyncio
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-import tomllib
+from typing import AsyncIterator, Awaitable, Callable, Optional
 import logging
 from dotenv import load_dotenv
+from utils.config import CONFIG_PATH, config
+from utils.document_store import CHUNK_SIZE, DocumentStore, document_id_from_url, get_document_store
+from utils.rate_limit import RateLimitScheduler
+from utils.response_cache import ResponseCache
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-CONFIG_PATH = Path(__file__).resolve().parent.parent 
-with open(CONFIG_PATH/"config.toml", "rb") as f:
-    config = tomllib.load(f)
+HTTP_SETTINGS = config["companies_house"].get("http", {})
+RATE_LIMIT_SETTINGS = config["companies_house"].get("rate_limit", {})
+CACHE_SETTINGS = config["companies_house"].get("cache", {})
+
+# One pooled client per process, shared by every companies_house instance so that
+# keep-alive connections (and their TLS sessions) are reused across tool calls.
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def build_http_client(http_settings: dict = HTTP_SETTINGS) -> httpx.AsyncClient:
+    """
+    Builds a pooled async client from the [companies_house.http] section of config.toml.
+    """
+    limits = httpx.Limits(
+        max_connections=http_settings.get("max_connections", 20),
+        max_keepalive_connections=http_settings.get("max_keepalive_connections", 10),
+        keepalive_expiry=http_settings.get("keepalive_expiry", 30.0),
+    )
+    http2 = http_settings.get("http2", False)
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logging.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1.")
+            http2 = False
+
+    return httpx.AsyncClient(limits=limits, http2=http2, timeout=http_settings.get("timeout", 30.0))
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared client, creating it on first use (or after it has been closed).
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = build_http_client()
+    return _http_client
+
+
+async def close_http_client():
+    """
+    Closes the shared client and releases its pooled connections.
+    """
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+
+@asynccontextmanager
+async def http_client_lifespan():
+    """
+    Ties the shared client to the lifetime of the MCP server.
+    """
+    get_http_client()
+    try:
+        yield
+    finally:
+        await close_http_client()
+
+
+_rate_limit_scheduler: Optional[RateLimitScheduler] = None
+
+
+def get_rate_limit_scheduler() -> RateLimitScheduler:
+    """
+    Returns the scheduler shared by every companies_house instance, as the quota is per API key.
+    """
+    global _rate_limit_scheduler
+    if _rate_limit_scheduler is None:
+        _rate_limit_scheduler = RateLimitScheduler(**RATE_LIMIT_SETTINGS)
+    return _rate_limit_scheduler
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent requests: the first caller for a key starts the upstream
+    request and every caller that arrives while it is in flight awaits the same result.
+    """
+    def __init__(self):
+        self._in_flight: dict = {}
+        self.coalesced = 0
+
+    async def do(self, key, send):
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(send())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.coalesced += 1
+        # Shielded so that one caller being cancelled does not cancel the request for the others.
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+
+_single_flight = SingleFlight()
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """
+    Returns the shared on-disk response cache, or None when caching is disabled in config.toml.
+    """
+    global _response_cache
+    if _response_cache is None and CACHE_SETTINGS.get("enabled", True):
+        _response_cache = ResponseCache(
+            path=CONFIG_PATH / CACHE_SETTINGS.get("path", "data/companies_house_cache.sqlite"),
+            max_entries=CACHE_SETTINGS.get("max_entries", 5000),
+            default_ttl_seconds=CACHE_SETTINGS.get("default_ttl_seconds", 86400.0),
+            ttl_seconds=CACHE_SETTINGS.get("ttl_seconds", {}),
+        )
+    return _response_cache
+
+
+# Dossier section name -> companies house "purpose" path segment.
+DOSSIER_SECTIONS = {
+    "profile": "",
+    "officers": "officers",
+    "persons_with_significant_control": "persons-with-significant-control",
+    "charges": "charges",
+    "latest_filing": "filing-history",
+}
 
 
 class companies_house:
-    def __init__(self,  api_key  = os.getenv("COMPANIES_HOUSE_API_KEY") , host_api: str = "https://api.companieshouse.gov.uk"):
+    def __init__(self,  api_key  = os.getenv("COMPANIES_HOUSE_API_KEY") , host_api: str = "https://api.companieshouse.gov.uk", client: Optional[httpx.AsyncClient] = None,
+                 scheduler: Optional[RateLimitScheduler] = None, cache: Optional[ResponseCache] = None,
+                 single_flight: Optional[SingleFlight] = None, document_store: Optional[DocumentStore] = None):
         if not api_key:
             raise ValueError("API key cannot be empty or None.")
         self.api_key = api_key
         self.host_api = config["companies_house"]["api_host"]
         self.competitors = config['competitors']
         self.auth = (self.api_key, "")
+        self._client = client
+        self.scheduler = scheduler if scheduler is not None else get_rate_limit_scheduler()
+        self.cache = cache if cache is not None else get_response_cache()
+        self.single_flight = single_flight if single_flight is not None else _single_flight
+        self._document_store = document_store
 
-    async def get_company_information_async(self, company_number:str, purpose:str ="", query_params:dict ={}):
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        The client used for requests; the process-wide pooled client unless one was injected.
+        """
+        return self._client if self._client is not None else get_http_client()
+
+    @property
+    def document_store(self) -> DocumentStore:
+        return self._document_store if self._document_store is not None else get_document_store()
+
+    async def _get(self, url: str, params: Optional[dict] = None, headers: Optional[dict] = None) -> httpx.Response:
+        """
+        Issues an authenticated GET through the pooled client, paced by the rate limit scheduler.
+        Identical requests already in flight are shared rather than sent again.
+        """
+        key = (url, tuple(sorted((params or {}).items())), tuple(sorted((headers or {}).items())))
+        return await self.single_flight.do(
+            key, lambda: self.scheduler.run(lambda: self.client.get(url=url, auth=self.auth, params=params, headers=headers))
+        )
+
+    async def get_company_information_async(self, company_number:str, purpose:str ="", query_params:dict ={}, use_cache: bool = True):
         """
         Asynchronously fetches company information from the Companies House API depending on the query parameter and purpose.
+        Successful responses are served from the response cache while fresh and revalidated with If-None-Match once stale.
         """
         if purpose == "":
             #Just get profile from companies house if any issues.
@@ -35,17 +198,35 @@ class companies_house:
             
             
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url= url, auth=self.auth, params=query_params)
-            return response
+        if not use_cache or self.cache is None:
+            return await self._get(url=url, params=query_params)
+
+        cache_key = self.cache.make_key(company_number, purpose, query_params)
+        cached = self.cache.get(cache_key)
+        if cached is not None and cached["fresh"]:
+            self.cache.hits += 1
+            return self.cache.to_response(cached)
+
+        self.cache.misses += 1
+        headers = {"If-None-Match": cached["etag"]} if cached is not None and cached["etag"] else None
+        response = await self._get(url=url, params=query_params, headers=headers)
+
+        if response.status_code == 304 and cached is not None:
+            self.cache.revalidations += 1
+            self.cache.refresh(cache_key, purpose)
+            return self.cache.to_response(cached)
+        if response.status_code == 200:
+            self.cache.put(cache_key, purpose, response)
+        return response
     
-    async def get_list_advanced_company_search(self, sic_codes: list[str], size: str = "10"):
+    async def get_list_advanced_company_search(self, sic_codes: list[str], size: str = "10", start_index: Optional[int] = None):
         """
         Asynchronously searches for companies using a list of SIC codes.
 
         Args:
             sic_codes (List[str]): A list of SIC codes to search for (e.g., ["62010", "62020"]).
             size (str, optional): The number of results to return. Defaults to "10".
+            start_index (int, optional): Offset of the first result, for paging through results.
         """
         url = f"{self.host_api}/advanced-search/companies" 
         
@@ -55,11 +236,11 @@ class companies_house:
             "sic_codes": formatted_sic_codes,
             "size": size 
         }
+        if start_index is not None:
+            query_params["start_index"] = start_index
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url=url, auth=self.auth, params=query_params)
-
-            return response
+        response = await self._get(url=url, params=query_params)
+        return response
         
     
     async def get_company_latest_filing_async(self, company_number:str, query_params:dict= {
@@ -71,9 +252,123 @@ class companies_house:
         Asynchronously fetches latest company filing.
         """
 
-        async with httpx.AsyncClient() as client:
-            response = await self.get_company_information_async(company_number=company_number, purpose="filing-history", query_params= query_params)
-            return response
+        response = await self.get_company_information_async(company_number=company_number, purpose="filing-history", query_params= query_params)
+        return response
+
+    async def _paginate(self, fetch_page: Callable[[int], Awaitable[httpx.Response]], max_items: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Yields every item of a paged collection, fetching the next page while the current one is consumed.
+
+        Args:
+            fetch_page: Called with a start_index, returns the response for that page.
+            max_items (int, optional): Stop after this many items.
+        """
+        yielded = 0
+        start_index = 0
+        next_page = asyncio.ensure_future(fetch_page(start_index))
+        try:
+            while next_page is not None:
+                response = await next_page
+                next_page = None
+                response.raise_for_status()
+
+                body = response.json()
+                items = body.get("items", [])
+                # Collections report their size under different names.
+                total = body.get("total_results", body.get("total_count", body.get("hits")))
+                start_index += len(items)
+
+                more_wanted = max_items is None or yielded + len(items) < max_items
+                more_available = total is None or start_index < total
+                if items and more_wanted and more_available:
+                    next_page = asyncio.ensure_future(fetch_page(start_index))
+
+                for item in items:
+                    if max_items is not None and yielded >= max_items:
+                        return
+                    yielded += 1
+                    yield item
+        finally:
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    def iter_company_collection_async(self, company_number: str, purpose: str, page_size: int = 100,
+                                      max_items: Optional[int] = None, query_params: Optional[dict] = None) -> AsyncIterator[dict]:
+        """
+        Streams every item of a paged company collection (e.g. "officers", "persons-with-significant-control",
+        "charges", "filing-history").
+        """
+        def fetch_page(start_index: int):
+            params = dict(query_params or {}, items_per_page=page_size, start_index=start_index)
+            return self.get_company_information_async(company_number=company_number, purpose=purpose, query_params=params)
+
+        return self._paginate(fetch_page, max_items=max_items)
+
+    def iter_officers_async(self, company_number: str, max_items: Optional[int] = None) -> AsyncIterator[dict]:
+        return self.iter_company_collection_async(company_number, "officers", max_items=max_items)
+
+    def iter_persons_significant_control_async(self, company_number: str, max_items: Optional[int] = None) -> AsyncIterator[dict]:
+        return self.iter_company_collection_async(company_number, "persons-with-significant-control", max_items=max_items)
+
+    def iter_filing_history_async(self, company_number: str, category: Optional[str] = None,
+                                  max_items: Optional[int] = None) -> AsyncIterator[dict]:
+        query_params = {"category": category} if category else None
+        return self.iter_company_collection_async(company_number, "filing-history", max_items=max_items, query_params=query_params)
+
+    def iter_advanced_company_search_async(self, sic_codes: list[str], page_size: int = 500,
+                                           max_items: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Streams every company matching the SIC codes from the advanced search endpoint.
+        """
+        def fetch_page(start_index: int):
+            return self.get_list_advanced_company_search(sic_codes=sic_codes, size=str(page_size), start_index=start_index)
+
+        return self._paginate(fetch_page, max_items=max_items)
+
+    async def get_company_dossier_async(self, company_numbers: list[str], sections: Optional[list[str]] = None,
+                                        max_concurrency: int = 8) -> dict:
+        """
+        Concurrently fetches several sections for several companies.
+
+        Args:
+            company_numbers (list[str]): Companies to fetch.
+            sections (list[str]): Any of DOSSIER_SECTIONS. Defaults to all of them.
+            max_concurrency (int): Upper bound on requests in flight at once.
+
+        Returns:
+            dict: {company_number: {section: {"status": ..., "data" | "statusCode"/"details": ...}}}.
+            A failing section is reported in place and does not affect the others.
+        """
+        if sections is None:
+            sections = list(DOSSIER_SECTIONS)
+        unknown = [section for section in sections if section not in DOSSIER_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown dossier sections {unknown}. Expected any of {DOSSIER_SECTIONS}.")
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch_section(company_number: str, section: str) -> dict:
+            async with semaphore:
+                try:
+                    if section == "latest_filing":
+                        response = await self.get_company_latest_filing_async(company_number=company_number)
+                    else:
+                        response = await self.get_company_information_async(company_number=company_number,
+                                                                             purpose=DOSSIER_SECTIONS[section])
+                except httpx.HTTPError as e:
+                    return {"status": "error", "details": f"{type(e).__name__}: {e}"}
+
+            if response.status_code == 200:
+                return {"status": "success", "data": response.json()}
+            return {"status": "error", "statusCode": response.status_code, "details": response.text}
+
+        jobs = [(company_number, section) for company_number in company_numbers for section in sections]
+        results = await asyncio.gather(*(fetch_section(company_number, section) for company_number, section in jobs))
+
+        dossier = {company_number: {} for company_number in company_numbers}
+        for (company_number, section), result in zip(jobs, results):
+            dossier[company_number][section] = result
+        return dossier
     
     async def get_document_metadata_url(self, response):
         """
@@ -88,16 +383,59 @@ class companies_house:
         Downloads filing document.
         """
 
-        async with httpx.AsyncClient() as client:
-            document_metadata_response = await client.get(url= document_metadata_url, auth=self.auth)
-            return document_metadata_response
+        document_metadata_response = await self._get(url=document_metadata_url)
+        return document_metadata_response
     
+    async def _stream_to_file(self, url: str, headers: dict, path: Path) -> int:
+        """
+        Streams a download to disk in chunks, resuming from any bytes already in path.
+        """
+        resume_from = path.stat().st_size if path.exists() else 0
+        request_headers = dict(headers)
+        if resume_from:
+            request_headers["Range"] = f"bytes={resume_from}-"
+
+        response = await self.scheduler.run(lambda: self.client.send(
+            self.client.build_request("GET", url, headers=request_headers), auth=self.auth, stream=True,
+            follow_redirects=True))
+        try:
+            if response.status_code == 416 and resume_from:
+                # Nothing left to fetch: the partial file is already complete.
+                return response.status_code
+            if response.is_error:
+                await response.aread()
+                response.raise_for_status()
+
+            # A 200 (rather than 206) means the server ignored the range, so start again.
+            mode = "ab" if response.status_code == 206 else "wb"
+            with open(path, mode) as f:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    f.write(chunk)
+            return response.status_code
+        finally:
+            await response.aclose()
+
+    async def _download_to_store(self, document_url: str, document_id: str, headers: dict, file_extension: str,
+                                 metadata: dict) -> dict:
+        # Another caller's download of the same document may have finished while this one was queued.
+        stored = self.document_store.lookup(document_id)
+        if stored is not None:
+            return stored
+        await self._stream_to_file(url=document_url, headers=headers, path=self.document_store.partial_path(document_id))
+        return self.document_store.commit(document_id, file_extension=file_extension, metadata=metadata)
+
     async def get_download_document(self, document_metadata_response):
         """
-        Downloads filing document.
+        Downloads filing document into the content-addressed document store.
+        Returns a handle to the stored file rather than its contents.
         """
         metadata_dict = document_metadata_response.json()
         document_url =metadata_dict['links']['document']
+        document_id = document_id_from_url(metadata_dict['links'].get('self', document_url))
+
+        stored = self.document_store.lookup(document_id)
+        if stored is not None:
+            return {"status": "success", "cached": True, "document": stored}
 
         content_type = str(list(metadata_dict['resources'].keys())[0])
         headers = {
@@ -111,40 +449,46 @@ class companies_house:
             file_extension = ""
             print("extension not accounted for")
 
-        file_name = f"{metadata_dict["company_number"]}{metadata_dict['barcode']}{metadata_dict['category']}{file_extension}"
+        file_name = f"{metadata_dict['company_number']}{metadata_dict['barcode']}{metadata_dict['category']}{file_extension}"
         
         
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                document_response = await client.get(url=document_url, auth=self.auth, headers=headers)
-
-
-                document_response.raise_for_status() 
-
-                with open(file=file_name, mode="wb") as f:
-                    f.write(document_response.content)
+        metadata = {
+            "file_name": file_name,
+            "content_type": content_type,
+            "company_number": metadata_dict['company_number'],
+            "barcode": metadata_dict.get('barcode'),
+            "category": metadata_dict.get('category'),
+        }
+        try:
+            # Concurrent requests for one document share a single download: they would otherwise all write
+            # to the same partial file, and only the first could commit it.
+            stored = await self.single_flight.do(
+                ("download", document_id),
+                lambda: self._download_to_store(document_url, document_id, headers, file_extension, metadata),
+            )
 
-                print(f"Successfully downloaded: {file_name}")
-                return document_response.status_code # Will be 200-299 if raise_for_status passes
+            print(f"Successfully downloaded: {file_name}")
+            return {"status": "success", "cached": False, "document": dict(stored)}
 
-            except httpx.HTTPStatusError as e:
-                print(f"HTTP Error during download: {e.response.status_code} - {e.response.text}")
-                return e.response.status_code # Return the error status code
+        except httpx.HTTPStatusError as e:
+            print(f"HTTP Error during download: {e.response.status_code} - {e.response.text}")
+            return {"status": "error", "statusCode": e.response.status_code, "details": e.response.text}
 
-            except httpx.RequestError as e:
-                print(f"Request Error during download ({e.request.url}): {e}")
-                return None # Indicate a request/network failure
+        except httpx.RequestError as e:
+            # The partial file is kept so the next attempt resumes where this one stopped.
+            print(f"Request Error during download ({e.request.url}): {e}")
+            return {"status": "error", "details": str(e)}
 
-            except Exception as e:
-                print(f"An unexpected error occurred during download: {e}")
-                return None # Catch any other unforeseen issues
+        except Exception as e:
+            print(f"An unexpected error occurred during download: {e}")
+            return {"status": "error", "details": str(e)}
             
 
     async def get_document_with_company_number_async(self, company_number: str):
         """
         Downloads the latest filing document using the company_number.
-        Returns the downloaded document content or None if an error occurs.
+        Returns a handle to the stored document (see get_download_document) or None if an error occurs.
         """
         try:
             # Step 1: Get the latest filing information
@@ -160,6 +504,11 @@ class companies_house:
                 logging.error("Could not extract document metadata URL from the filing response.")
                 return None
 
+            stored = self.document_store.lookup(document_id_from_url(metadata_url))
+            if stored is not None:
+                logging.info(f"Latest filing for company {company_number} is already stored at {stored['path']}")
+                return {"status": "success", "cached": True, "document": stored}
+
             # Step 3: Get the document metadata
             logging.info(f"Fetching document metadata from: {metadata_url}")
             document_metadata = await self.get_document_metadata(document_metadata_url=metadata_url)
@@ -182,3 +531,16 @@ class companies_house:
             # General exception handler for other issues (e.g., network errors, parsing errors)
             logging.error(f"An unexpected error occurred for company {company_number}: {e}", exc_info=True)
             return None
+
+
+_companies_house: Optional[companies_house] = None
+
+
+def get_companies_house() -> companies_house:
+    """
+    Returns the companies_house instance shared by the MCP tools.
+    """
+    global _companies_house
+    if _companies_house is None:
+        _companies_house = companies_house()
+    return _companies_house
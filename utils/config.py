@@ -0,0 +1,13 @@
+import tomllib
+from pathlib import Path
+
+# The repository root, which holds config.toml. Relative paths in config.toml are resolved against it.
+CONFIG_PATH = Path(__file__).resolve().parent.parent
+
+
+def load_config(path: Path = CONFIG_PATH / "config.toml") -> dict:
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+config = load_config()
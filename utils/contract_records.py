@@ -0,0 +1,94 @@
+from typing import Any, Dict, List
+
+import pandas as pd
+
+# One row per award. These are the column names ContractAnalyser reads.
+AWARD_COLUMNS = [
+    'Award ID', 'Award Status', 'Award Date', 'Data Award Published', 'Award Value', 'Award Value Currency',
+    'Contracted Period Start Date', 'Contracted Period End Date', 'Award Description', 'OCID', 'Contract ID',
+    'Tender ID', 'Tender Title', 'Buyer ID', 'Buyer Name', 'Supplier ID', 'Supplier Name',
+    'Award Year', 'Award Month', 'Award Day', 'Zaizi',
+]
+# One row per party of a release.
+PARTY_COLUMNS = ['OCID', 'Party ID', 'Party Name', 'Party Roles']
+# One row per supplier of an award.
+SUPPLIER_COLUMNS = ['OCID', 'Award ID', 'Supplier ID', 'Supplier Name']
+# Companies House companies that supplier names are resolved against.
+COMPANY_COLUMNS = ['Company Number', 'Company Name', 'Source']
+# One row per distinct supplier name, with the company it resolved to (if any).
+SUPPLIER_COMPANY_COLUMNS = ['Supplier Name', 'Company Number', 'Company Name', 'Score', 'Method', 'Registry Size']
+
+
+def _dict(value) -> dict:
+    return value if isinstance(value, dict) else {}
+
+
+def _list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+def build_records(releases: List[Dict[str, Any]]) -> tuple[list, list, list]:
+    """
+    Walks the releases once and builds plain award, party and supplier records.
+
+    Awards and parties are kept in separate record lists, so a release with A awards and
+    P parties produces A + P rows rather than the A x P rows of exploding both columns.
+    """
+    awards, parties, suppliers = [], [], []
+    for release in releases:
+        ocid = release.get('ocid')
+        tender = _dict(release.get('tender'))
+        buyer = _dict(release.get('buyer'))
+        contract_ids = {contract.get('awardID'): contract.get('id') for contract in _list(release.get('contracts'))
+                        if isinstance(contract, dict)}
+
+        for party in _list(release.get('parties')):
+            if isinstance(party, dict):
+                parties.append((ocid, party.get('id'), party.get('name'), ','.join(_list(party.get('roles')))))
+
+        for award in _list(release.get('awards')):
+            if not isinstance(award, dict):
+                continue
+            value = _dict(award.get('value'))
+            period = _dict(award.get('contractPeriod'))
+            award_suppliers = [supplier for supplier in _list(award.get('suppliers')) if isinstance(supplier, dict)]
+            first_supplier = award_suppliers[0] if award_suppliers else {}
+
+            awards.append((
+                award.get('id'), award.get('status'), award.get('date'), award.get('datePublished'),
+                value.get('amount'), value.get('currency'), period.get('startDate'), period.get('endDate'),
+                award.get('description'), ocid, contract_ids.get(award.get('id')),
+                tender.get('id'), tender.get('title'), buyer.get('id'), buyer.get('name'),
+                first_supplier.get('id'), first_supplier.get('name'),
+            ))
+            for supplier in award_suppliers:
+                suppliers.append((ocid, award.get('id'), supplier.get('id'), supplier.get('name')))
+
+    return awards, parties, suppliers
+
+
+def flatten_releases(releases: List[Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+    """
+    Flattens a batch (e.g. one API page) of OCDS releases into normalised tables.
+
+    Returns:
+        dict: {"awards": DataFrame, "parties": DataFrame, "suppliers": DataFrame}
+    """
+    awards, parties, suppliers = build_records(releases)
+
+    awards_df = pd.DataFrame.from_records(awards, columns=AWARD_COLUMNS[:-4])
+    awards_df['Award Value'] = pd.to_numeric(awards_df['Award Value'], errors='coerce')
+
+    for column in ['Award Date', 'Data Award Published', 'Contracted Period Start Date', 'Contracted Period End Date']:
+        awards_df[column] = pd.to_datetime(awards_df[column], errors='coerce', utc=True, format='ISO8601')
+    awards_df['Award Year'] = awards_df['Award Date'].dt.year.astype('Int64')
+    awards_df['Award Month'] = awards_df['Award Date'].dt.month.astype('Int64')
+    awards_df['Award Day'] = awards_df['Award Date'].dt.day.astype('Int64')
+
+    awards_df['Zaizi'] = awards_df['Supplier Name'].str.contains('Zaizi', case=False, na=False)
+
+    return {
+        "awards": awards_df,
+        "parties": pd.DataFrame.from_records(parties, columns=PARTY_COLUMNS),
+        "suppliers": pd.DataFrame.from_records(suppliers, columns=SUPPLIER_COLUMNS),
+    }
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+import httpx
+
+from utils.config import config
+from utils.rate_limit import RateLimitScheduler
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+CONTRACTS_FINDER_SETTINGS = config.get("contracts_finder", {})
+BASE_URL = CONTRACTS_FINDER_SETTINGS.get("base_url", "https://www.contractsfinder.service.gov.uk")
+SEARCH_PATH = "/Published/Notices/OCDS/Search"
+
+
+def date_intervals(start: date, end: date, day_interval: int) -> list[tuple[date, date]]:
+    """
+    Splits [start, end] into consecutive windows of day_interval days (the last one may be shorter).
+    """
+    intervals = []
+    current = start
+    while current <= end:
+        interval_end = min(current + timedelta(days=day_interval - 1), end)
+        intervals.append((current, interval_end))
+        current += timedelta(days=day_interval)
+    return intervals
+
+
+@dataclass
+class IngestStats:
+    pages: int = 0
+    releases: int = 0
+    retries: int = 0
+    completed_intervals: int = 0
+    failed_intervals: list = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.pages} pages / {self.releases} releases from {self.completed_intervals} intervals "
+                f"in {self.elapsed_seconds:.1f}s ({self.pages_per_second:.2f} pages/sec, {self.retries} retries, "
+                f"{len(self.failed_intervals)} failed intervals)")
+
+
+class ContractsFinderIngestor:
+    """
+    Fetches Contracts Finder OCDS notices for many date intervals concurrently.
+
+    Each interval follows its own links.next chain. Up to max_concurrency intervals are in
+    flight at once and every request is paced by a token bucket. Transient failures (network
+    errors and 5xx responses) are retried with jittered backoff. An interval that still fails
+    is reported in IngestStats.failed_intervals instead of being silently cut short.
+    """
+    def __init__(self, base_url: str = BASE_URL, stage: str = "awarded",
+                 page_size: int = CONTRACTS_FINDER_SETTINGS.get("page_size", 100),
+                 max_concurrency: int = CONTRACTS_FINDER_SETTINGS.get("max_concurrency", 4),
+                 requests_per_window: int = CONTRACTS_FINDER_SETTINGS.get("requests_per_window", 10),
+                 window_seconds: float = CONTRACTS_FINDER_SETTINGS.get("window_seconds", 5.0),
+                 max_retries: int = CONTRACTS_FINDER_SETTINGS.get("max_retries", 5),
+                 backoff_base: float = CONTRACTS_FINDER_SETTINGS.get("backoff_base", 1.0),
+                 client: Optional[httpx.AsyncClient] = None):
+        self.search_url = f"{base_url.rstrip('/')}{SEARCH_PATH}"
+        self.stage = stage
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.scheduler = RateLimitScheduler(capacity=requests_per_window, window_seconds=window_seconds,
+                                            max_retries=max_retries, backoff_base=backoff_base,
+                                            name="Contracts Finder")
+        self._client = client
+        self.stats = IngestStats()
+
+    async def _get_page(self, client: httpx.AsyncClient, url: str, params: Optional[dict]) -> dict:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.scheduler.run(lambda: client.get(url, params=params))
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = f"{response.status_code} {response.reason_phrase}"
+            except httpx.RequestError as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                break
+            self.stats.retries += 1
+            delay = min(60.0, self.backoff_base * 2 ** attempt) + random.uniform(0, self.backoff_base)
+            logging.warning(f"Transient error fetching {url} ({error}), retrying in {delay:.1f}s.")
+            await asyncio.sleep(delay)
+        raise httpx.RequestError(f"Giving up on {url} after {self.max_retries} retries: {error}")
+
+    async def fetch_interval(self, client: httpx.AsyncClient, start: date, end: date,
+                             on_page: Callable[[tuple[date, date], list], None]):
+        """
+        Fetches every page of one interval, passing each page's releases to on_page.
+        """
+        url = self.search_url
+        params = {
+            "stage": self.stage,
+            "size": self.page_size,
+            "publishedFrom": start.strftime("%Y-%m-%d"),
+            "publishedTo": end.strftime("%Y-%m-%d"),
+        }
+        while url:
+            data = await self._get_page(client, url, params)
+            releases = data.get("releases", [])
+            self.stats.pages += 1
+            self.stats.releases += len(releases)
+            on_page((start, end), releases)
+
+            # The next link already carries every query parameter.
+            url = data.get("links", {}).get("next")
+            params = None
+
+    async def run(self, intervals: list[tuple[date, date]], on_page: Callable[[tuple[date, date], list], None],
+                  on_interval_done: Optional[Callable[[tuple[date, date]], None]] = None) -> IngestStats:
+        """
+        Fetches all intervals concurrently and returns the ingestion statistics.
+
+        Args:
+            intervals: (start, end) date windows, e.g. from date_intervals.
+            on_page: Called with (interval, releases) for every page fetched.
+            on_interval_done: Called with the interval once all its pages have been fetched.
+        """
+        self.stats = IngestStats()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        started = time.perf_counter()
+
+        async def run_interval(client: httpx.AsyncClient, interval: tuple[date, date]):
+            async with semaphore:
+                try:
+                    await self.fetch_interval(client, *interval, on_page=on_page)
+                except (httpx.HTTPError, ValueError) as e:
+                    logging.error(f"Interval {interval[0]} to {interval[1]} failed: {e}")
+                    self.stats.failed_intervals.append(interval)
+                    return
+            self.stats.completed_intervals += 1
+            if on_interval_done is not None:
+                on_interval_done(interval)
+
+        if self._client is not None:
+            await asyncio.gather(*(run_interval(self._client, interval) for interval in intervals))
+        else:
+            limits = httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+            async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+                await asyncio.gather(*(run_interval(client, interval) for interval in intervals))
+
+        self.stats.elapsed_seconds = time.perf_counter() - started
+        logging.info(f"Contracts Finder ingestion finished: {self.stats.summary()}")
+        return self.stats
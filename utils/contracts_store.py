@@ -0,0 +1,409 @@
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from utils.contract_records import (AWARD_COLUMNS, COMPANY_COLUMNS, PARTY_COLUMNS, SUPPLIER_COLUMNS,
+                                    SUPPLIER_COMPANY_COLUMNS)
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CONTRACTS_DIR = DATA_DIR / "contracts"
+AWARDS_DIR = CONTRACTS_DIR / "awards"
+
+# Awards are partitioned as awards/award_year=YYYY/award_month=M/part-0.parquet. Undated awards go to year/month 0.
+PARTITION_COLUMNS = ["award_year", "award_month"]
+PARTITIONING = ds.partitioning(pa.schema([("award_year", pa.int16()), ("award_month", pa.int8())]), flavor="hive")
+
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+_CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+AWARD_SCHEMA = pa.schema([
+    ("Award ID", pa.string()),
+    ("Award Status", _CATEGORY),
+    ("Award Date", _TIMESTAMP),
+    ("Data Award Published", _TIMESTAMP),
+    ("Award Value", pa.decimal128(18, 2)),
+    ("Award Value Currency", _CATEGORY),
+    ("Contracted Period Start Date", _TIMESTAMP),
+    ("Contracted Period End Date", _TIMESTAMP),
+    ("Award Description", pa.string()),
+    ("OCID", pa.string()),
+    ("Contract ID", pa.string()),
+    ("Tender ID", pa.string()),
+    ("Tender Title", pa.string()),
+    ("Buyer ID", pa.string()),
+    ("Buyer Name", _CATEGORY),
+    ("Supplier ID", pa.string()),
+    ("Supplier Name", pa.string()),
+    ("Award Year", pa.int16()),
+    ("Award Month", pa.int8()),
+    ("Award Day", pa.int8()),
+    ("Zaizi", pa.bool_()),
+])
+assert AWARD_SCHEMA.names == AWARD_COLUMNS
+
+TABLE_SCHEMAS = {
+    "parties": pa.schema([(column, pa.string()) for column in PARTY_COLUMNS]),
+    "suppliers": pa.schema([(column, pa.string()) for column in SUPPLIER_COLUMNS]),
+    "companies": pa.schema([(column, pa.string()) for column in COMPANY_COLUMNS]),
+    "supplier_companies": pa.schema([
+        ("Supplier Name", pa.string()),
+        ("Company Number", pa.string()),
+        ("Company Name", pa.string()),
+        ("Score", pa.float64()),
+        ("Method", pa.dictionary(pa.int8(), pa.string())),
+        ("Registry Size", pa.int64()),
+    ]),
+}
+assert TABLE_SCHEMAS["supplier_companies"].names == SUPPLIER_COMPANY_COLUMNS
+# The key of each table: an upsert replaces every stored row with a key in the new rows.
+TABLE_KEYS = {
+    "parties": "OCID",
+    "suppliers": "Award ID",
+    "companies": "Company Number",
+    "supplier_companies": "Supplier Name",
+}
+# Each upsert of a table appends a part file; past this many they are merged into one.
+MAX_TABLE_PARTS = 64
+
+
+def _to_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+    """
+    Converts a DataFrame to an Arrow table with the given schema, casting column by column.
+    """
+    arrays = []
+    for field in schema:
+        series = df[field.name] if field.name in df.columns else pd.Series([None] * len(df), dtype=object)
+        if pa.types.is_timestamp(field.type):
+            array = pa.array(pd.to_datetime(series, errors="coerce", utc=True))
+        elif pa.types.is_decimal(field.type):
+            values = pd.to_numeric(series, errors="coerce").astype(float)
+            # Junk amounts (e.g. 1e20) occur in the feeds and would make the cast fail for the whole batch.
+            out_of_range = values.abs() >= 10 ** (field.type.precision - field.type.scale)
+            if out_of_range.any():
+                logger.warning(f"Dropping {out_of_range.sum()} {field.name} values outside the {field.type} range, "
+                               f"e.g. {values[out_of_range].iloc[0]}")
+                values = values.mask(out_of_range)
+            array = pa.array(values, type=pa.float64(), from_pandas=True)
+        elif pa.types.is_floating(field.type):
+            array = pa.array(pd.to_numeric(series, errors="coerce"), type=field.type, from_pandas=True)
+        elif pa.types.is_integer(field.type):
+            array = pa.array(pd.to_numeric(series, errors="coerce"), from_pandas=True)
+        elif pa.types.is_boolean(field.type):
+            array = pa.array(series.eq(True).to_numpy())
+        else:
+            array = pa.array(series.astype(object).where(series.notna(), None), type=pa.string())
+        arrays.append(array.cast(field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_atomic(table: pa.Table, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _partition_dir(awards_dir: Path, year: int, month: int) -> Path:
+    return awards_dir / f"award_year={year}" / f"award_month={month}"
+
+
+def _awards_dataset(awards_dir: Path = AWARDS_DIR) -> Optional[ds.Dataset]:
+    if not awards_dir.exists() or not any(awards_dir.rglob("*.parquet")):
+        return None
+    return ds.dataset(awards_dir, format="parquet", partitioning=PARTITIONING, schema=AWARD_SCHEMA.append(
+        pa.field("award_year", pa.int16())).append(pa.field("award_month", pa.int8())))
+
+
+def read_awards(year: Optional[int] = None, month: Optional[int] = None, columns: Optional[list[str]] = None,
+                filter: Optional[ds.Expression] = None, awards_dir: Path = AWARDS_DIR) -> pd.DataFrame:
+    """
+    Reads awards from the partitioned dataset. Year/month filters prune whole partitions, and only the
+    requested columns are read. Award Value is returned as float64 for analysis.
+
+    Args:
+        year (int, optional): Only read this award year.
+        month (int, optional): Only read this award month.
+        columns (list[str], optional): Columns to read. Defaults to all award columns.
+        filter (pyarrow.dataset.Expression, optional): Further row filter, pushed down into the scan.
+        awards_dir (Path): Root of the partitioned awards dataset.
+    """
+    columns = columns or AWARD_COLUMNS
+    dataset = _awards_dataset(awards_dir)
+    if dataset is None:
+        return _to_table(pd.DataFrame(columns=AWARD_COLUMNS), AWARD_SCHEMA).select(columns).to_pandas()
+
+    expression = filter
+    if year is not None:
+        expression = (ds.field("award_year") == year) & expression if expression is not None else ds.field("award_year") == year
+    if month is not None:
+        expression = (ds.field("award_month") == month) & expression if expression is not None else ds.field("award_month") == month
+
+    table = dataset.to_table(columns=columns, filter=expression)
+    if "Award Value" in table.column_names:
+        index = table.column_names.index("Award Value")
+        table = table.set_column(index, "Award Value", table.column("Award Value").cast(pa.float64()))
+    return table.to_pandas()
+
+
+def _contains(column: str, text: str) -> ds.Expression:
+    return pc.match_substring(ds.field(column).cast(pa.string()), text, ignore_case=True)
+
+
+def _utc(day: date) -> pa.Scalar:
+    return pa.scalar(datetime(day.year, day.month, day.day, tzinfo=timezone.utc), _TIMESTAMP)
+
+
+def build_award_filter(buyer: Optional[str] = None, supplier: Optional[str] = None, title: Optional[str] = None,
+                       status: Optional[str] = None, min_value: Optional[float] = None, max_value: Optional[float] = None,
+                       date_from: Optional[date] = None, date_to: Optional[date] = None) -> Optional[ds.Expression]:
+    """
+    Builds a dataset filter expression for award queries. Text filters are case-insensitive substring matches,
+    and the date range is on Award Date (inclusive) and also prunes award_year partitions.
+    """
+    conditions = []
+    if buyer:
+        conditions.append(_contains("Buyer Name", buyer))
+    if supplier:
+        conditions.append(_contains("Supplier Name", supplier))
+    if title:
+        conditions.append(_contains("Tender Title", title) | _contains("Award Description", title))
+    if status:
+        conditions.append(ds.field("Award Status").cast(pa.string()) == status)
+    if min_value is not None:
+        conditions.append(ds.field("Award Value") >= pa.scalar(Decimal(str(min_value)), pa.decimal128(18, 2)))
+    if max_value is not None:
+        conditions.append(ds.field("Award Value") <= pa.scalar(Decimal(str(max_value)), pa.decimal128(18, 2)))
+    if date_from is not None:
+        conditions.append(ds.field("award_year") >= date_from.year)
+        conditions.append(ds.field("Award Date") >= _utc(date_from))
+    if date_to is not None:
+        conditions.append(ds.field("award_year") <= date_to.year)
+        conditions.append(ds.field("Award Date") < _utc(date_to + timedelta(days=1)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def query_awards(filter: Optional[ds.Expression] = None, columns: Optional[list[str]] = None,
+                 sort_by: str = "Award Date", descending: bool = True, offset: int = 0, limit: int = 50,
+                 awards_dir: Path = AWARDS_DIR) -> tuple[pd.DataFrame, int]:
+    """
+    Runs a filtered, sorted, paginated scan over the awards dataset. The filter is applied inside the
+    scan, so non-matching partitions and row groups are skipped.
+
+    Returns:
+        tuple: (the requested page as a DataFrame, total number of matching awards)
+    """
+    columns = columns or AWARD_COLUMNS
+    dataset = _awards_dataset(awards_dir)
+    if dataset is None:
+        return pd.DataFrame(columns=columns), 0
+
+    scan_columns = list(dict.fromkeys(columns + [sort_by, "Award ID"]))
+    table = dataset.to_table(columns=scan_columns, filter=filter)
+    order = "descending" if descending else "ascending"
+    sort_column = table.column(sort_by)
+    if pa.types.is_dictionary(sort_column.type):
+        # Dictionary columns cannot be sorted directly, so sort on their decoded values.
+        table = table.append_column("__sort_key", sort_column.cast(pa.string()))
+        sort_by = "__sort_key"
+    table = table.sort_by([(sort_by, order), ("Award ID", "ascending")])
+
+    page = table.slice(offset, limit).select(columns)
+    if "Award Value" in page.column_names:
+        index = page.column_names.index("Award Value")
+        page = page.set_column(index, "Award Value", page.column("Award Value").cast(pa.float64()))
+    return page.to_pandas(), table.num_rows
+
+
+# Aggregates are pre-computed per partition, one row per (year, month, buyer, supplier, Zaizi flag).
+CUBE_SOURCE_COLUMNS = ["Award Year", "Award Month", "Buyer Name", "Supplier Name", "Zaizi", "Award Value"]
+CUBE_KEYS = ["Award Year", "Award Month", "Buyer Name", "Supplier Name", "Zaizi"]
+
+
+def _cube_path(awards_dir: Path, year: int, month: int) -> Path:
+    return awards_dir.parent / "aggregates" / f"award_year={year}" / f"award_month={month}.parquet"
+
+
+def build_award_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates awards into award counts and total values per (year, month, buyer, supplier, Zaizi flag).
+    Every market rollup can be answered from this much smaller table.
+    """
+    df = df[CUBE_SOURCE_COLUMNS].copy()
+    df["Award Value"] = pd.to_numeric(df["Award Value"], errors="coerce").astype(float)
+    for column in ["Buyer Name", "Supplier Name"]:
+        df[column] = df[column].astype(object).where(df[column].notna(), None)
+    cube = (df.groupby(CUBE_KEYS, dropna=False, observed=True)["Award Value"]
+              .agg(awards="size", total_value="sum")
+              .reset_index())
+    return cube
+
+
+def read_award_cube(year: int, awards_dir: Path = AWARDS_DIR) -> Optional[pd.DataFrame]:
+    """
+    Reads the pre-computed aggregates of every partition of a year, or None if a partition has none yet.
+    """
+    # A partition whose awards all moved elsewhere may leave an empty directory behind.
+    partition_dirs = sorted(partition_dir for partition_dir in (awards_dir / f"award_year={year}").glob("award_month=*")
+                            if any(partition_dir.glob("*.parquet")))
+    cubes = []
+    for partition_dir in partition_dirs:
+        month = int(partition_dir.name.split("=")[1])
+        cube_path = _cube_path(awards_dir, year, month)
+        if not cube_path.exists():
+            return None
+        cubes.append(pq.read_table(cube_path).to_pandas())
+    if not cubes:
+        return build_award_cube(pd.DataFrame(columns=CUBE_SOURCE_COLUMNS))
+    return pd.concat(cubes, ignore_index=True)
+
+
+def upsert_awards(new_df: pd.DataFrame, awards_dir: Path = AWARDS_DIR) -> int:
+    """
+    Upserts awards by Award ID. Only the partitions holding the new awards, or older copies of them,
+    are rewritten.
+
+    Returns:
+        int: The number of partitions rewritten.
+    """
+    new_df = new_df.drop_duplicates(subset=["Award ID"], keep="last")
+    new_table = _to_table(new_df, AWARD_SCHEMA)
+    new_keys = new_table.column("Award ID")
+    new_years = pc.fill_null(new_table.column("Award Year"), 0).to_pylist()
+    new_months = pc.fill_null(new_table.column("Award Month"), 0).to_pylist()
+
+    partitions = set(zip(new_years, new_months))
+    dataset = _awards_dataset(awards_dir)
+    if dataset is not None:
+        # An award may have moved partition since it was last stored, so find every partition holding its key.
+        previous = dataset.to_table(columns=PARTITION_COLUMNS, filter=ds.field("Award ID").isin(new_keys))
+        partitions |= set(zip(previous.column("award_year").to_pylist(), previous.column("award_month").to_pylist()))
+
+    for year, month in partitions:
+        path = _partition_dir(awards_dir, year, month) / "part-0.parquet"
+        parts = []
+        if path.exists():
+            existing = pq.read_table(path, schema=AWARD_SCHEMA)
+            parts.append(existing.filter(pc.invert(pc.is_in(existing.column("Award ID"), value_set=new_keys))))
+        mask = pa.array([(y, m) == (year, month) for y, m in zip(new_years, new_months)])
+        parts.append(new_table.filter(mask))
+
+        table = pa.concat_tables(parts).combine_chunks()
+        cube_path = _cube_path(awards_dir, year, month)
+        if table.num_rows:
+            _write_atomic(table, path)
+            # Keep the partition's aggregates in step with its awards.
+            cube = build_award_cube(table.select(CUBE_SOURCE_COLUMNS).to_pandas())
+            _write_atomic(pa.Table.from_pandas(cube, preserve_index=False), cube_path)
+        else:
+            path.unlink(missing_ok=True)
+            cube_path.unlink(missing_ok=True)
+            if path.parent.exists() and not any(path.parent.iterdir()):
+                path.parent.rmdir()
+    return len(partitions)
+
+
+def _table_parts(name: str, contracts_dir: Path) -> list[Path]:
+    """
+    The part files of a table, oldest first. Earlier versions stored a table as a single name.parquet file,
+    which is read as its oldest part.
+    """
+    legacy_path = contracts_dir / f"{name}.parquet"
+    parts = sorted((contracts_dir / name).glob("part-*.parquet"))
+    return ([legacy_path] if legacy_path.exists() else []) + parts
+
+
+def _next_part_path(name: str, contracts_dir: Path, parts: list[Path]) -> Path:
+    sequence = int(parts[-1].stem.split("-")[1]) + 1 if parts and parts[-1].name.startswith("part-") else 1
+    return contracts_dir / name / f"part-{sequence:06d}.parquet"
+
+
+def _current_rows(name: str, parts: list[Path], columns: Optional[list[str]] = None) -> pd.DataFrame:
+    key = TABLE_KEYS[name]
+    columns = columns or TABLE_SCHEMAS[name].names
+    read_columns = list(dict.fromkeys([key, *columns]))
+    df = pd.concat([pq.read_table(part, columns=read_columns).to_pandas().assign(_part=i) for i, part in enumerate(parts)],
+                   ignore_index=True)
+    # An upsert replaces every row of a key, so only the rows in the newest part holding the key are current.
+    df = df[df["_part"] == df.groupby(key, dropna=False)["_part"].transform("max")]
+    return df[columns].reset_index(drop=True)
+
+
+def upsert_table(name: str, new_df: pd.DataFrame, compact: bool = True, contracts_dir: Path = CONTRACTS_DIR):
+    """
+    Upserts rows of an unpartitioned table (see TABLE_KEYS): stored rows whose key appears in new_df are replaced.
+
+    The new rows are written as a new part file, so an upsert costs the size of new_df however much is stored,
+    and reads keep the newest rows of each key. Parts are merged once there are more than MAX_TABLE_PARTS,
+    unless compact is False (bulk loads call compact_table once at the end).
+    """
+    if new_df.empty:
+        return
+    parts = _table_parts(name, contracts_dir)
+    _write_atomic(_to_table(new_df.drop_duplicates(keep="last"), TABLE_SCHEMAS[name]),
+                  _next_part_path(name, contracts_dir, parts))
+    if compact and len(parts) + 1 > MAX_TABLE_PARTS:
+        compact_table(name, contracts_dir=contracts_dir)
+
+
+def compact_table(name: str, contracts_dir: Path = CONTRACTS_DIR):
+    """
+    Merges the parts of a table into one holding only the current rows.
+    """
+    parts = _table_parts(name, contracts_dir)
+    if len(parts) < 2:
+        return
+    _write_atomic(_to_table(_current_rows(name, parts), TABLE_SCHEMAS[name]), _next_part_path(name, contracts_dir, parts))
+    # The merged part is the newest, so reads stay correct if this is interrupted.
+    for part in parts:
+        part.unlink()
+
+
+def read_table(name: str, columns: Optional[list[str]] = None, contracts_dir: Path = CONTRACTS_DIR) -> pd.DataFrame:
+    parts = _table_parts(name, contracts_dir)
+    if not parts:
+        return pd.DataFrame(columns=columns or TABLE_SCHEMAS[name].names)
+    return _current_rows(name, parts, columns)
+
+
+# Columns of the awards CSV written by earlier versions of load_govt_contracts.py, by their canonical names.
+LEGACY_AWARD_COLUMNS = {
+    "ocid": "OCID",
+    "Award Date Published": "Data Award Published",
+    "Award Currency": "Award Value Currency",
+    "Award Contract Start Date": "Contracted Period Start Date",
+    "Award Contract End Date": "Contracted Period End Date",
+}
+
+
+def import_awards_csv(csv_path: Path, awards_dir: Path = AWARDS_DIR) -> int:
+    """
+    One-off migration of an awards CSV written by earlier versions of load_govt_contracts.py into the
+    Parquet dataset. Those name some columns differently (see LEGACY_AWARD_COLUMNS), format the award and
+    contract period dates as day-month-year, and repeat each award once per party of its release.
+    """
+    df = pd.read_csv(csv_path, low_memory=False,
+                     usecols=lambda column: LEGACY_AWARD_COLUMNS.get(column, column) in AWARD_COLUMNS)
+    df = df.rename(columns=LEGACY_AWARD_COLUMNS)
+    for column in ["Award Date", "Contracted Period Start Date", "Contracted Period End Date"]:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], format="%d-%m-%Y", errors="coerce", utc=True)
+    if "Data Award Published" in df.columns:
+        df["Data Award Published"] = pd.to_datetime(df["Data Award Published"], format="ISO8601", errors="coerce",
+                                                    utc=True)
+    upsert_awards(df, awards_dir=awards_dir)
+    return df["Award ID"].nunique()
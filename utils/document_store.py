@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def document_id_from_url(url: str) -> str:
+    """
+    Extracts the document id from a document API url such as
+    https://document-api.company-information.service.gov.uk/document/<id>[/content].
+    """
+    parts = [part for part in url.rstrip("/").split("/") if part]
+    if "document" in parts:
+        index = parts.index("document")
+        if index + 1 < len(parts):
+            return parts[index + 1]
+    return parts[-1]
+
+
+class DocumentStore:
+    """
+    Content-addressed store for downloaded filing documents.
+
+    Files are written to partial/<document_id>.part while downloading, so an interrupted
+    download can be resumed, then moved to blobs/<sha256[:2]>/<sha256><ext>. Identical files
+    are stored once. index.json maps each document id to its blob so that a document already
+    on disk is never requested again.
+    """
+    def __init__(self, root: Path = DATA_DIR / "filings"):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.partial_dir = self.root / "partial"
+        self.index_path = self.root / "index.json"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Could not read document index {self.index_path}, starting empty: {e}")
+            return {}
+
+    def _save_index(self):
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, document_id: str) -> Optional[dict]:
+        """
+        Returns the stored entry for a document id if its blob is still on disk.
+        """
+        entry = self._index.get(document_id)
+        if entry is not None and (self.root / entry["path"]).exists():
+            return dict(entry, path=str(self.root / entry["path"]))
+        return None
+
+    def company_numbers_by_sha256(self) -> dict[str, str]:
+        """
+        Maps the content hash of each stored filing to its company number, so a copy of a filing can be
+        attributed to its company whatever the copy is named.
+        """
+        with self._lock:
+            return {entry["sha256"]: entry["company_number"] for entry in self._index.values()
+                    if entry.get("company_number")}
+
+    def pdf_files(self) -> dict[str, dict]:
+        """
+        The stored PDF filings whose blobs are on disk, for indexing: {"filings/<file name>": {"path", "sha256",
+        "company_number"}}. Filings stored without a file name are named after their document id.
+        """
+        with self._lock:
+            entries = list(self._index.values())
+        files = {}
+        for entry in entries:
+            path = self.root / entry["path"]
+            if path.suffix != ".pdf" or not path.exists():
+                continue
+            name = entry.get("file_name") or f"{entry['document_id']}.pdf"
+            files[f"filings/{name}"] = {"path": path, "sha256": entry["sha256"],
+                                        "company_number": entry.get("company_number")}
+        return files
+
+    def partial_path(self, document_id: str) -> Path:
+        return self.partial_dir / f"{document_id}.part"
+
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def commit(self, document_id: str, file_extension: str = "", metadata: Optional[dict] = None) -> dict:
+        """
+        Moves a completed partial download into the blob store and records it in the index.
+        """
+        partial_path = self.partial_path(document_id)
+        sha256 = self._hash_file(partial_path)
+        relative_path = Path("blobs") / sha256[:2] / f"{sha256}{file_extension}"
+        blob_path = self.root / relative_path
+
+        if blob_path.exists():
+            partial_path.unlink()
+        else:
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(partial_path, blob_path)
+
+        entry = {
+            "document_id": document_id,
+            "sha256": sha256,
+            "size": blob_path.stat().st_size,
+            "path": str(relative_path),
+            **(metadata or {}),
+        }
+        with self._lock:
+            self._index[document_id] = entry
+            self._save_index()
+        return dict(entry, path=str(blob_path))
+
+
+_document_store: Optional[DocumentStore] = None
+
+
+def get_document_store() -> DocumentStore:
+    global _document_store
+    if _document_store is None:
+        _document_store = DocumentStore()
+    return _document_store
@@ -0,0 +1,234 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from utils.config import CONFIG_PATH, config
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_SETTINGS = config.get("embeddings", {})
+
+_TOKEN = re.compile(r"\w+")
+
+
+class EmbeddingCache:
+    """
+    A persistent store of embedding vectors backed by SQLite, keyed by (model, SHA-256 of the text).
+    Vectors are stored as float32 bytes.
+    """
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, text_hashes: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters, so look the hashes up in slices.
+            for start in range(0, len(text_hashes), 500):
+                batch = text_hashes[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(batch))})",
+                    [model, *batch],
+                ).fetchall()
+                found.update((text_hash, np.frombuffer(vector, dtype=np.float32).tolist()) for text_hash, vector in rows)
+        return found
+
+    def put_many(self, model: str, vectors: dict[str, list[float]]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                [(model, text_hash, np.asarray(vector, dtype=np.float32).tobytes()) for text_hash, vector in vectors.items()],
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    A local CPU embedder that needs no model download or network: word and character-trigram counts are
+    hashed into a fixed number of signed dimensions, log-scaled and L2-normalised. It captures lexical
+    rather than semantic similarity.
+    """
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+        self.model = f"hashing-{dimensions}"
+
+    def _features(self, text: str) -> list[str]:
+        words = _TOKEN.findall(text.lower())
+        trigrams = [word[i:i + 3] for word in words if len(word) > 3 for i in range(len(word) - 2)]
+        return words + trigrams
+
+    def _embed(self, text: str) -> list[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in self._features(text):
+            digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+            vector[digest % self.dimensions] += 1.0 if digest >> 63 else -1.0
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text)
+
+
+class TransformerEmbeddings(Embeddings):
+    """
+    A local CPU embedder running a Hugging Face sentence-embedding model (mean pooling, L2-normalised).
+    model_name can be a local directory, so it works on hosts without network access.
+    """
+    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", max_length: int = 512):
+        from transformers import AutoModel, AutoTokenizer
+
+        self.model = model_name
+        self.max_length = max_length
+        self._tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self._model = AutoModel.from_pretrained(model_name)
+        self._model.eval()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        import torch
+
+        with torch.no_grad():
+            inputs = self._tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="pt")
+            hidden = self._model(**inputs).last_hidden_state
+            mask = inputs["attention_mask"].unsqueeze(-1).type_as(hidden)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            return torch.nn.functional.normalize(pooled, dim=1).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def build_embedding_backend(backend: str, model: Optional[str] = None) -> Embeddings:
+    """
+    Creates the embedding backend named in config.toml: "google" (Gemini embeddings API), "transformers"
+    (a local Hugging Face model), "hashing" (local, no model files) or "test" (deterministic fake vectors).
+    """
+    if backend == "google":
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        return GoogleGenerativeAIEmbeddings(model=model or "models/embedding-001")
+    if backend == "transformers":
+        return TransformerEmbeddings(model_name=model) if model else TransformerEmbeddings()
+    if backend == "hashing":
+        return HashingEmbeddings(dimensions=int(EMBEDDING_SETTINGS.get("dimensions", 512)))
+    if backend == "test":
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        return DeterministicFakeEmbedding(size=int(EMBEDDING_SETTINGS.get("dimensions", 512)))
+    raise ValueError(f"Unknown embeddings backend '{backend}'. Use google, transformers, hashing or test.")
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an embedding backend with a persistent cache and batching.
+
+    Documents are looked up in the cache by (model, text hash); only the missing distinct texts are sent
+    to the backend, in batches of batch_size with at most max_concurrency batches in flight. A chunk that
+    has been embedded once, in this run or any earlier one, is never embedded again.
+    """
+    def __init__(self, backend: Embeddings, cache: EmbeddingCache, batch_size: int = 100, max_concurrency: int = 4):
+        self.backend = backend
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.model = str(getattr(backend, "model", None) or type(backend).__name__)
+
+    def _lookup(self, texts: list[str]) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+        hashes = [self.cache.text_hash(text) for text in texts]
+        found = self.cache.get_many(self.model, list(set(hashes)))
+        missing = {text_hash: text for text_hash, text in zip(hashes, texts) if text_hash not in found}
+        self.cache.hits += len(texts) - sum(text_hash in missing for text_hash in hashes)
+        self.cache.misses += len(missing)
+        return hashes, found, missing
+
+    def _batches(self, missing: dict[str, str]) -> list[list[tuple[str, str]]]:
+        items = list(missing.items())
+        return [items[start:start + self.batch_size] for start in range(0, len(items), self.batch_size)]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes, found, missing = self._lookup(texts)
+        for batch in self._batches(missing):
+            vectors = dict(zip([text_hash for text_hash, _ in batch],
+                               self.backend.embed_documents([text for _, text in batch])))
+            self.cache.put_many(self.model, vectors)
+            found.update(vectors)
+        return [found[text_hash] for text_hash in hashes]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes, found, missing = self._lookup(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_batch(batch: list[tuple[str, str]]):
+            async with semaphore:
+                embedded = await self.backend.aembed_documents([text for _, text in batch])
+            vectors = dict(zip([text_hash for text_hash, _ in batch], embedded))
+            self.cache.put_many(self.model, vectors)
+            found.update(vectors)
+
+        await asyncio.gather(*(embed_batch(batch) for batch in self._batches(missing)))
+        return [found[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.backend.embed_query(text)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return await self.backend.aembed_query(text)
+
+
+_embeddings: Optional[CachedEmbeddings] = None
+
+
+def get_embeddings() -> CachedEmbeddings:
+    """
+    Returns the process-wide cached embeddings for the backend configured in config.toml
+    (overridable with the EMBEDDINGS_BACKEND environment variable, e.g. on offline hosts).
+    """
+    global _embeddings
+    if _embeddings is None:
+        backend = os.getenv("EMBEDDINGS_BACKEND", EMBEDDING_SETTINGS.get("backend", "google"))
+        model = EMBEDDING_SETTINGS.get("model") if backend == EMBEDDING_SETTINGS.get("backend", "google") else None
+        cache_path = CONFIG_PATH / EMBEDDING_SETTINGS.get("cache_path", "data/embedding_cache.sqlite")
+        _embeddings = CachedEmbeddings(build_embedding_backend(backend, model), EmbeddingCache(cache_path),
+                                       batch_size=int(EMBEDDING_SETTINGS.get("batch_size", 100)),
+                                       max_concurrency=int(EMBEDDING_SETTINGS.get("max_concurrency", 4)))
+        logger.info(f"Embedding with {backend} backend ({_embeddings.model}).")
+    return _embeddings
@@ -0,0 +1,266 @@
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+import pandas as pd
+from rapidfuzz import fuzz, process
+
+from utils import contracts_store
+from utils.config import config
+from utils.contract_records import COMPANY_COLUMNS, SUPPLIER_COMPANY_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+RESOLUTION_SETTINGS = config.get("entity_resolution", {})
+
+# Trailing words that only state the legal form, e.g. "ACME SOLUTIONS LTD" and "Acme Solutions Limited".
+LEGAL_SUFFIXES = {"LIMITED", "LTD", "PLC", "LLP", "LP", "CIC", "INC", "INCORPORATED", "CORP", "CORPORATION",
+                  "CO", "COMPANY"}
+# OCDS organisation identifiers in the Companies House scheme carry the company number, e.g. GB-COH-06591591.
+_COMPANIES_HOUSE_IDENTIFIER = re.compile(r"GB-COH-([A-Z0-9]{1,8})\b", re.IGNORECASE)
+
+
+def normalise_company_name(name) -> str:
+    """
+    Upper-cases a company name, strips accents, punctuation, a leading "THE" and legal-form suffixes.
+    """
+    if not isinstance(name, str):
+        return ""
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().upper()
+    name = re.sub(r"[^A-Z0-9]+", " ", name.replace("&", " AND "))
+    tokens = name.split()
+    if tokens[:1] == ["THE"]:
+        tokens = tokens[1:]
+    while tokens and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def company_number_from_identifier(identifier) -> Optional[str]:
+    """
+    Returns the company number of a GB-COH organisation identifier, or None.
+    """
+    match = _COMPANIES_HOUSE_IDENTIFIER.search(identifier) if isinstance(identifier, str) else None
+    if match is None:
+        return None
+    number = match.group(1).upper()
+    return number.zfill(8) if number.isdigit() else number
+
+
+def _ngrams(normalised: str, n: int = 3) -> set[str]:
+    padded = f" {normalised} "
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class CompanyNameIndex:
+    """
+    An in-memory blocking index of company names.
+
+    Names are normalised and indexed both exactly and by character trigrams. A supplier name is only
+    fuzzy-scored against the companies sharing the most trigrams with it. Only its rarest trigrams are
+    counted, since common ones (" UK", "ING") are shared by a large part of the index; the cost of a
+    lookup grows with the posting lists of those rare trigrams, not with the number of companies.
+    """
+    def __init__(self, max_candidates: int = 200, max_query_grams: int = 8):
+        self.max_candidates = max_candidates
+        self.max_query_grams = max_query_grams
+        self.company_numbers: list[str] = []
+        self.company_names: list[str] = []
+        self.normalised_names: list[str] = []
+        self._positions: dict[str, int] = {}
+        self._exact: dict[str, list[int]] = defaultdict(list)
+        self._grams: dict[str, list[int]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.company_numbers)
+
+    def __contains__(self, company_number: str) -> bool:
+        return company_number in self._positions
+
+    def add(self, company_number: str, company_name: str) -> bool:
+        """
+        Adds a company. Returns False if it was already indexed or its name normalises to nothing.
+        """
+        normalised = normalise_company_name(company_name)
+        if not company_number or not normalised or company_number in self._positions:
+            return False
+        position = len(self.company_numbers)
+        self.company_numbers.append(company_number)
+        self.company_names.append(company_name)
+        self.normalised_names.append(normalised)
+        self._positions[company_number] = position
+        self._exact[normalised].append(position)
+        for gram in _ngrams(normalised):
+            self._grams[gram].append(position)
+        return True
+
+    def company_name(self, company_number: str) -> Optional[str]:
+        position = self._positions.get(company_number)
+        return None if position is None else self.company_names[position]
+
+    def candidates(self, normalised: str) -> list[int]:
+        """
+        The indexed companies sharing the most of a normalised name's max_query_grams rarest trigrams
+        (at least a third of them). Trigrams no indexed name contains are ignored.
+        """
+        postings = sorted((self._grams[gram] for gram in _ngrams(normalised) if gram in self._grams), key=len)
+        postings = postings[:self.max_query_grams]
+        shared = Counter()
+        for positions in postings:
+            shared.update(positions)
+        minimum = max(1, len(postings) // 3)
+        return [position for position, count in shared.most_common(self.max_candidates) if count >= minimum]
+
+    def match(self, name: str, min_score: float = 90.0, min_margin: float = 5.0) -> dict:
+        """
+        Resolves a name to a company.
+
+        Returns:
+            dict: {"Company Number", "Company Name", "Score", "Method"}. Method is "exact" or "fuzzy" when resolved,
+                  "ambiguous" when several companies match equally well, or "unresolved".
+        """
+        normalised = normalise_company_name(name)
+        unresolved = {"Company Number": None, "Company Name": None, "Score": None, "Method": "unresolved"}
+        if not normalised:
+            return unresolved
+
+        exact = self._exact.get(normalised, [])
+        if len(exact) == 1:
+            return {"Company Number": self.company_numbers[exact[0]], "Company Name": self.company_names[exact[0]],
+                    "Score": 100.0, "Method": "exact"}
+        if len(exact) > 1:
+            return dict(unresolved, Score=100.0, Method="ambiguous")
+
+        # The candidate block is scored in one rapidfuzz call; only the two best are needed for the margin.
+        block = self.candidates(normalised)
+        scored = [(score, block[i]) for _, score, i in process.extract(
+            normalised, [self.normalised_names[position] for position in block], scorer=fuzz.token_sort_ratio,
+            limit=2)]
+        if not scored or scored[0][0] < min_score:
+            return dict(unresolved, Score=scored[0][0] if scored else None)
+        best_score, best = scored[0]
+        if len(scored) > 1 and best_score - scored[1][0] < min_margin:
+            return dict(unresolved, Score=best_score, Method="ambiguous")
+        return {"Company Number": self.company_numbers[best], "Company Name": self.company_names[best],
+                "Score": best_score, "Method": "fuzzy"}
+
+
+class SupplierResolver:
+    """
+    Resolves Contracts Finder supplier names to Companies House company numbers, in bulk.
+
+    Companies are taken from the persisted "companies" table (seeded from Companies House searches or a
+    bulk company data file) and the competitors in config.toml. Results are persisted per distinct
+    supplier name in the "supplier_companies" table, so each name is resolved once; unresolved names are
+    retried only after more companies have been added.
+    """
+    def __init__(self, min_score: float = RESOLUTION_SETTINGS.get("min_score", 90.0),
+                 min_margin: float = RESOLUTION_SETTINGS.get("min_margin", 5.0),
+                 competitors: Optional[list[dict]] = None):
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.competitors = config.get("competitors", []) if competitors is None else competitors
+        self.index = CompanyNameIndex()
+        # Tools resolve from worker threads; the index, the mappings and their tables are updated by one at a time.
+        self._lock = threading.Lock()
+
+        for row in contracts_store.read_table("companies").itertuples(index=False):
+            self.index.add(row[0], row[1])
+        for competitor in self.competitors:
+            self.index.add(competitor["company_number"], competitor["name"])
+
+        self.mappings = contracts_store.read_table("supplier_companies").set_index("Supplier Name", drop=False)
+
+    @property
+    def competitor_numbers(self) -> list[str]:
+        return [competitor["company_number"] for competitor in self.competitors]
+
+    def add_companies(self, companies: Iterable[dict], source: str, compact: bool = True) -> int:
+        """
+        Adds companies ({"company_number", "company_name"}, as returned by Companies House searches) to the
+        registry and persists the new ones. Bulk imports pass compact=False and compact the "companies" table
+        once at the end.
+
+        Returns:
+            int: The number of companies that were not known yet.
+        """
+        with self._lock:
+            new_rows = [(company["company_number"], company["company_name"], source) for company in companies
+                        if self.index.add(company.get("company_number"), company.get("company_name"))]
+            if new_rows:
+                contracts_store.upsert_table("companies", pd.DataFrame(new_rows, columns=COMPANY_COLUMNS),
+                                             compact=compact)
+        return len(new_rows)
+
+    def resolve_name(self, supplier_name: str, supplier_id: Optional[str] = None) -> dict:
+        """
+        Resolves one supplier, preferring a Companies House identifier over name matching.
+        """
+        company_number = company_number_from_identifier(supplier_id)
+        if company_number is not None:
+            return {"Supplier Name": supplier_name, "Company Number": company_number,
+                    "Company Name": self.index.company_name(company_number), "Score": 100.0, "Method": "identifier",
+                    "Registry Size": len(self.index)}
+        return {"Supplier Name": supplier_name,
+                **self.index.match(supplier_name, min_score=self.min_score, min_margin=self.min_margin),
+                "Registry Size": len(self.index)}
+
+    def resolve(self, suppliers: pd.DataFrame) -> pd.DataFrame:
+        """
+        Resolves the distinct supplier names of a DataFrame with "Supplier Name" (and optionally "Supplier ID")
+        columns, e.g. awards. Only names without a usable stored result are resolved.
+
+        Returns:
+            DataFrame: One SUPPLIER_COMPANY_COLUMNS row per distinct supplier name.
+        """
+        if "Supplier ID" not in suppliers.columns:
+            suppliers = suppliers.assign(**{"Supplier ID": None})
+        distinct = suppliers.dropna(subset=["Supplier Name"]).drop_duplicates(subset=["Supplier Name"])
+
+        with self._lock:
+            stored = self.mappings.reindex(distinct["Supplier Name"])
+            # Resolved names are final; unresolved ones are retried once the registry has grown.
+            stale = stored["Method"].isna() | (stored["Method"].isin(["unresolved", "ambiguous"])
+                                               & (stored["Registry Size"] < len(self.index)))
+            to_resolve = distinct[stale.to_numpy()]
+
+            if not to_resolve.empty:
+                resolved = pd.DataFrame([self.resolve_name(name, supplier_id) for name, supplier_id
+                                         in to_resolve[["Supplier Name", "Supplier ID"]].itertuples(index=False)],
+                                        columns=SUPPLIER_COMPANY_COLUMNS)
+                contracts_store.upsert_table("supplier_companies", resolved)
+                kept = self.mappings.drop(resolved["Supplier Name"], errors="ignore")
+                self.mappings = pd.DataFrame.from_records([*kept.to_dict(orient="records"), *resolved.to_dict(orient="records")],
+                                                          columns=SUPPLIER_COMPANY_COLUMNS).set_index("Supplier Name", drop=False)
+                logger.info(f"Resolved {resolved['Company Number'].notna().sum()} of {len(resolved)} new supplier names.")
+
+            return self.mappings.reindex(distinct["Supplier Name"]).reset_index(drop=True)
+
+    def link_awards(self, awards_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Adds "Company Number" and "Competitor" (the company is a configured competitor) columns to awards
+        with a single join against the stored supplier mappings.
+        """
+        mapping = self.mappings[["Company Number"]].rename_axis("Supplier Name").reset_index()
+        linked = awards_df.merge(mapping, on="Supplier Name", how="left")
+        linked["Competitor"] = linked["Company Number"].isin(self.competitor_numbers)
+        return linked
+
+
+_supplier_resolver: Optional[SupplierResolver] = None
+_supplier_resolver_lock = threading.Lock()
+
+
+def get_supplier_resolver() -> SupplierResolver:
+    """
+    Returns the shared SupplierResolver. Building its name index takes seconds with a bulk company file
+    imported, so async callers should call this from a worker thread.
+    """
+    global _supplier_resolver
+    with _supplier_resolver_lock:
+        if _supplier_resolver is None:
+            _supplier_resolver = SupplierResolver()
+    return _supplier_resolver
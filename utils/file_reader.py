@@ -1,83 +1,92 @@
-import os
+import threading
+import time
 import pandas as pd
-import pytesseract
-from pdf2image import convert_from_bytes
 from pathlib import Path
 from datetime import date
 from typing import Optional
 import logging
+from utils.contract_records import AWARD_COLUMNS
+from utils.file_summary import summarise_csv, summarise_parquet
+from utils.pdf_ocr import extract_pdf_text
+from utils.contracts_store import AWARDS_DIR, CUBE_SOURCE_COLUMNS, build_award_cube, read_award_cube, read_awards
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(asctime)s  - %(message)s')
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
 
-def read_csv_summary(filename: str) -> str:
+# Rollup name -> aggregate columns it groups by.
+ROLLUP_DIMENSIONS = {
+    "supplier": ["Supplier Name"],
+    "buyer": ["Buyer Name"],
+    "month": ["Award Month"],
+    "supplier_month": ["Supplier Name", "Award Month"],
+    "buyer_supplier": ["Buyer Name", "Supplier Name"],
+}
+
+def read_csv_summary(filename: str, sample_fraction: Optional[float] = None) -> dict:
     """
-    Read a CSV file and return a simple summary.
+    Summarise a CSV file (rows, and per column type, nulls, distinct values and min/max/mean or length)
+    in one streaming pass. Summaries are cached until the file changes.
     Args:
         filename: Name of the CSV file (e.g. 'sample.csv')
+        sample_fraction: Only read this fraction of rows, for a quick estimate of a large file.
     Returns:
-        A string describing the file's contents.
+        A dictionary describing the file's contents.
     """
-    file_path = DATA_DIR / filename
-    df = pd.read_csv(file_path)
-    #return f"CSV file '{filename}' has {len(df)} rows and {len(df.columns)} columns. More information {df.describe()} and as a whole is {df}"
-    return f"CSV file info is '{df.info()}' and the description is '{df.describe()}'"
+    return summarise_csv(DATA_DIR / filename, sample_fraction=sample_fraction)
 
-def read_parquet_summary(filename: str) -> str:
+def read_parquet_summary(filename: str) -> dict:
     """
-    Read a Parquet file and return a simple summary.
+    Summarise a Parquet file (rows, schema and column statistics) from its footer metadata, without reading the data.
     Args:
         filename: Name of the Parquet file (e.g. 'sample.parquet')
     Returns:
-        A string describing the file's contents.
+        A dictionary describing the file's contents.
     """
-    file_path = DATA_DIR / filename
-    df = pd.read_parquet(file_path)
-    return f"Parquet file '{filename}' has {len(df)} rows and {len(df.columns)} columns."
+    return summarise_parquet(DATA_DIR / filename)
 
 def read_pdf_to_text(DATA_DIR:Path, file)->dict:
-    custom_config = r'--psm 6'
+    """
+    Reads a PDF into {file: {page_index: text}}. Pages with an embedded text layer are read directly; only
+    image-only pages are OCR'd, in parallel across a process pool (see utils.pdf_ocr.extract_pdf_text, which
+    also returns per-page timings).
+    """
     document ={}
     file = str(file)
     document[file]={}
 
     try:
-        with open(os.path.join(DATA_DIR, file), 'rb') as f:
-            pdf_file = convert_from_bytes(f.read())
+        result = extract_pdf_text(Path(DATA_DIR) / file)
     except Exception as e:
         print(f"Failed to read or convert {file} due to: {e}")
         return document
-    
 
-    for (i,page) in enumerate(pdf_file) :
-        try:
-            page_data= pytesseract.image_to_string(image=page, 
-                                                    config=custom_config, 
-                                                    output_type= pytesseract.Output.DICT)
-            document[file][i] = page_data['text']
-        except Exception as e:
-            print(f"Failed page {i+1} in {file} due to: {e}")
+    document[file] = result.pages
     return document
 
 
 class ContractAnalyser:
     """
-    A class to load and analyze government contract data from a CSV file.
+    A class to load and analyze government contract data from the partitioned Parquet contracts store.
     """
-    def __init__(self, data_dir: Path = DATA_DIR, file_name: str = "from_jan_govt_contracts.csv", year: int = date.today().year):
+    def __init__(self, dataset_dir: Path = AWARDS_DIR, year: int = date.today().year, columns: Optional[list[str]] = None):
         """
         Initializes the analyzer, loads and processes the contract data.
 
         Args:
-            data_dir (Path): The directory where the data file is located.
-            file_name (str): The name of the CSV file.
+            dataset_dir (Path): The root of the partitioned awards dataset.
             year (int): The year to filter the analysis for. Defaults to the current year.
+            columns (list[str], optional): Columns to load. Defaults to every award column.
         """
-        self.file_path = data_dir / file_name
+        self.file_path = dataset_dir
         self.year = year        
+        self.columns = columns or AWARD_COLUMNS
         self.contracts_df: Optional[pd.DataFrame] = None
+        self.aggregates: Optional[pd.DataFrame] = None
+        self.load_seconds: Optional[float] = None
+        self.memory_bytes: Optional[int] = None
+        self.load_error: Optional[str] = None
 
         
         self._load_and_prepare_data()
@@ -85,21 +94,115 @@ class ContractAnalyser:
     def _load_and_prepare_data(self):
         """Loads and performs initial cleaning and transformation of the data."""
         try:
+            started = time.perf_counter()
+
+            # Only this year's partitions and the requested columns are read.
+            self.contracts_df = read_awards(year=self.year, columns=self.columns, awards_dir=self.file_path)
 
-            df = pd.read_csv(self.file_path,low_memory=False, usecols=[
-                                                                        'Award ID','Award Status','Award Date',  "Award Year", "Award Month", "Award Day",
-                                                                        'Data Award Published', 'Award Value', 'Award Value Currency',	
-                                                                        'Contracted Period Start Date',	'Contracted Period End Date',	
-                                                                        'Award Description','OCID', 'Contract ID', 'Tender ID',
-                                                                        'Tender Title','Party ID','Party Name', 'Buyer ID', 'Buyer Name', 'Supplier ID', 'Supplier Name','Zaizi'
-                                                                        ])
-            #This year only, note you did this. 
-            self.contracts_df = df[df['Award Year'] == self.year].copy()
-
-            logger.info("Dataframe has been generated.")
+            # Aggregates are maintained per partition on ingest; only data written before that needs building here.
+            self.aggregates = read_award_cube(self.year, awards_dir=self.file_path)
+            if self.aggregates is None:
+                source_df = (self.contracts_df if set(CUBE_SOURCE_COLUMNS) <= set(self.contracts_df.columns)
+                             else read_awards(year=self.year, columns=CUBE_SOURCE_COLUMNS, awards_dir=self.file_path))
+                self.aggregates = build_award_cube(source_df)
+
+            self.load_seconds = time.perf_counter() - started
+            self.memory_bytes = int(self.contracts_df.memory_usage(deep=True).sum())
+            logger.info(f"Dataframe has been generated: {len(self.contracts_df)} awards for {self.year} "
+                        f"in {self.load_seconds:.3f}s using {self.memory_bytes / 1e6:.1f} MB.")
         
         except FileNotFoundError:
+            self.load_error = f"The awards dataset was not found at {self.file_path}"
             logger.error(f"Error: The file was not found at {self.file_path}")
 
         except Exception as e:
-            logger.error(f"An error occurred during data loading: {e}")
\ No newline at end of file
+            self.load_error = str(e)
+            logger.error(f"An error occurred during data loading: {e}")
+
+
+    def rollup(self, dimension: str = "supplier", zaizi_only: bool = False, supplier: Optional[str] = None,
+               buyer: Optional[str] = None, sort_by: str = "total_value", top_n: Optional[int] = 10) -> dict:
+        """
+        Answers market rollups (award counts, total value and value share) from the pre-computed aggregates,
+        without touching the award rows.
+
+        Args:
+            dimension (str): One of ROLLUP_DIMENSIONS.
+            zaizi_only (bool): Only count awards won by Zaizi.
+            supplier (str, optional): Only count suppliers whose name contains this text.
+            buyer (str, optional): Only count buyers whose name contains this text.
+            sort_by (str): "total_value", "awards" or one of the dimension's columns.
+            top_n (int, optional): Number of groups to return. None returns every group.
+
+        Raises:
+            RuntimeError: If the year's data could not be loaded.
+        """
+        if self.aggregates is None:
+            raise RuntimeError(f"The {self.year} award data could not be loaded: {self.load_error}")
+        cube = self.aggregates
+        if zaizi_only:
+            cube = cube[cube["Zaizi"].astype(bool)]
+        if supplier:
+            cube = cube[cube["Supplier Name"].str.contains(supplier, case=False, na=False, regex=False)]
+        if buyer:
+            cube = cube[cube["Buyer Name"].str.contains(buyer, case=False, na=False, regex=False)]
+
+        keys = ROLLUP_DIMENSIONS[dimension]
+        grouped = (cube.groupby(keys, dropna=False)
+                       .agg(awards=("awards", "sum"), total_value=("total_value", "sum"))
+                       .reset_index())
+        total_value = float(grouped["total_value"].sum())
+        grouped["value_share"] = grouped["total_value"] / total_value if total_value else 0.0
+        grouped = grouped.sort_values(sort_by, ascending=sort_by in keys)
+
+        return {
+            "year": self.year,
+            "groups": len(grouped),
+            "total_awards": int(grouped["awards"].sum()),
+            "total_value": total_value,
+            "rows": (grouped if top_n is None else grouped.head(top_n)).to_dict(orient="records"),
+        }
+
+
+# Process-wide analysers, keyed by (dataset_dir, year), with the fingerprint of the files they were loaded from.
+_analysers: dict = {}
+_analyser_lock = threading.Lock()
+
+
+def _dataset_fingerprint(dataset_dir: Path, year: int) -> tuple:
+    """
+    Path, mtime and size of every Parquet file (awards and aggregates) of the year. Any rewrite by the loader changes it.
+    """
+    dataset_dir = Path(dataset_dir)
+    files = sorted([*(dataset_dir / f"award_year={year}").rglob("*.parquet"),
+                    *(dataset_dir.parent / "aggregates" / f"award_year={year}").rglob("*.parquet")])
+    return tuple((str(path), path.stat().st_mtime_ns, path.stat().st_size) for path in files)
+
+
+def get_contract_analyser(year: Optional[int] = None, dataset_dir: Path = AWARDS_DIR) -> ContractAnalyser:
+    """
+    Returns the shared ContractAnalyser for a year, reloading it only when the year's data files have changed
+    or the last load failed. Concurrent callers that find it stale wait for a single reload.
+    """
+    year = year or date.today().year
+    key = (Path(dataset_dir), year)
+
+    cached = _analysers.get(key)
+    if cached is not None and cached[0] == _dataset_fingerprint(dataset_dir, year):
+        return cached[1]
+
+    with _analyser_lock:
+        # Another caller may have reloaded while this one waited for the lock.
+        fingerprint = _dataset_fingerprint(dataset_dir, year)
+        cached = _analysers.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        analyser = ContractAnalyser(dataset_dir=dataset_dir, year=year)
+        # A failed load (load_seconds is only set on success) is not kept, so the next call retries it
+        # rather than serving a transient read error until the files change.
+        if analyser.load_seconds is not None:
+            _analysers[key] = (fingerprint, analyser)
+        else:
+            _analysers.pop(key, None)
+        return analyser
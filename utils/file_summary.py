@@ -0,0 +1,184 @@
+import math
+import random
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+CSV_CHUNK_ROWS = 100_000
+# Distinct values are counted exactly up to this many per column, then reported as a lower bound.
+MAX_TRACKED_DISTINCT = 1000
+MAX_EXAMPLES = 3
+
+
+def _fingerprint(path: Path) -> tuple[str, int, int]:
+    stat = path.stat()
+    return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+
+def _plain(value):
+    """
+    Converts Parquet statistics values (bytes, dates, decimals) to JSON-friendly values.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def summarise_parquet(path: Path) -> dict:
+    """
+    Summarises a Parquet file from its footer metadata only: row count, schema and per-column
+    null counts, min/max and sizes. No data pages are read.
+    """
+    path = Path(path)
+    return _summarise_parquet(*_fingerprint(path))
+
+
+@lru_cache(maxsize=128)
+def _summarise_parquet(path: str, size: int, mtime_ns: int) -> dict:
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.metadata
+    schema = parquet_file.schema_arrow
+
+    columns = {}
+    for index in range(metadata.num_columns):
+        name = metadata.schema.column(index).path
+        null_count, minimum, maximum, complete = 0, None, None, True
+        compressed = uncompressed = 0
+        for row_group in range(metadata.num_row_groups):
+            chunk = metadata.row_group(row_group).column(index)
+            compressed += chunk.total_compressed_size
+            uncompressed += chunk.total_uncompressed_size
+            stats = chunk.statistics
+            if stats is None or not stats.has_min_max or not stats.has_null_count:
+                complete = False
+                continue
+            null_count += stats.null_count
+            minimum = stats.min if minimum is None else min(minimum, stats.min)
+            maximum = stats.max if maximum is None else max(maximum, stats.max)
+        columns[name] = {
+            "type": str(schema.field(name).type) if name in schema.names else metadata.schema.column(index).physical_type,
+            "null_count": null_count if complete else None,
+            "min": _plain(minimum) if complete else None,
+            "max": _plain(maximum) if complete else None,
+            "compressed_bytes": compressed,
+            "uncompressed_bytes": uncompressed,
+        }
+
+    return {
+        "file": Path(path).name,
+        "format": "parquet",
+        "bytes": size,
+        "rows": metadata.num_rows,
+        "row_groups": metadata.num_row_groups,
+        "created_by": metadata.created_by,
+        "columns": columns,
+    }
+
+
+class _ColumnStats:
+    """
+    Running statistics of one CSV column, updated chunk by chunk in constant memory.
+    """
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.numeric = True
+        self.numeric_count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max_length = 0
+        self.distinct: set = set()
+        self.distinct_capped = False
+        self.examples: list = []
+
+    def update(self, values: pd.Series):
+        present = values.dropna()
+        self.count += len(values)
+        self.nulls += len(values) - len(present)
+        if present.empty:
+            return
+
+        if self.numeric:
+            numbers = pd.to_numeric(present, errors="coerce")
+            if numbers.isna().any():
+                self.numeric = False
+            else:
+                # Merge the chunk's mean and sum of squared deviations into the running ones (Chan et al.).
+                numbers = numbers.astype(float)
+                chunk_count, chunk_mean = len(numbers), float(numbers.mean())
+                chunk_m2 = float(((numbers - chunk_mean) ** 2).sum())
+                count = self.numeric_count + chunk_count
+                delta = chunk_mean - self.mean
+                self.mean += delta * chunk_count / count
+                self.m2 += chunk_m2 + delta ** 2 * self.numeric_count * chunk_count / count
+                self.numeric_count = count
+                self.minimum = min(self.minimum, float(numbers.min()))
+                self.maximum = max(self.maximum, float(numbers.max()))
+
+        self.max_length = max(self.max_length, int(present.str.len().max()))
+        if not self.distinct_capped:
+            self.distinct.update(present.unique()[:MAX_TRACKED_DISTINCT + 1])
+            if len(self.distinct) > MAX_TRACKED_DISTINCT:
+                self.distinct_capped = True
+                self.distinct = set()
+        if len(self.examples) < MAX_EXAMPLES:
+            self.examples.extend(present.unique()[:MAX_EXAMPLES - len(self.examples)].tolist())
+
+    def summary(self) -> dict:
+        summary = {
+            "type": "numeric" if self.numeric and self.numeric_count else "text",
+            "non_null": self.count - self.nulls,
+            "null_count": self.nulls,
+            "distinct": f">{MAX_TRACKED_DISTINCT}" if self.distinct_capped else len(self.distinct),
+            "examples": self.examples,
+        }
+        if summary["type"] == "numeric":
+            summary.update(min=self.minimum, max=self.maximum, mean=self.mean,
+                           std=math.sqrt(self.m2 / self.numeric_count))
+        else:
+            summary["max_length"] = self.max_length
+        return summary
+
+
+def summarise_csv(path: Path, sample_fraction: Optional[float] = None, chunk_rows: int = CSV_CHUNK_ROWS) -> dict:
+    """
+    Summarises a CSV file in a single streaming pass, chunk_rows rows at a time, so memory stays bounded
+    whatever the file size. With sample_fraction only that (random) fraction of rows is parsed and the
+    statistics are estimates.
+    """
+    path = Path(path)
+    return _summarise_csv(*_fingerprint(path), sample_fraction=sample_fraction, chunk_rows=chunk_rows)
+
+
+@lru_cache(maxsize=128)
+def _summarise_csv(path: str, size: int, mtime_ns: int, sample_fraction: Optional[float], chunk_rows: int) -> dict:
+    skiprows = None
+    if sample_fraction is not None and sample_fraction < 1:
+        rng = random.Random(0)
+        skiprows = lambda row: row > 0 and rng.random() >= sample_fraction
+
+    stats: dict[str, _ColumnStats] = {}
+    rows = 0
+    for chunk in pd.read_csv(path, dtype=str, chunksize=chunk_rows, skiprows=skiprows):
+        rows += len(chunk)
+        for column in chunk.columns:
+            stats.setdefault(column, _ColumnStats()).update(chunk[column])
+
+    summary = {
+        "file": Path(path).name,
+        "format": "csv",
+        "bytes": size,
+        "rows": rows,
+        "columns": {column: column_stats.summary() for column, column_stats in stats.items()},
+    }
+    if skiprows is not None:
+        summary.update(sampled=True, sample_fraction=sample_fraction,
+                       estimated_rows=round(rows / sample_fraction) if sample_fraction else None)
+    return summary
@@ -0,0 +1,106 @@
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+# A quoted phrase, or a single term optionally ending in * for a prefix query.
+_QUERY_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+")
+
+
+def build_match_expression(query: str, operator: str = "AND") -> Optional[str]:
+    """
+    Turns a user query into an FTS5 MATCH expression. With operator "AND" every term or "quoted phrase"
+    must match; with "OR" any may, and BM25 ranks documents matching more of them first.
+    A term ending in * matches as a prefix (e.g. digit* finds digital and digitisation).
+    Punctuation is dropped, so user input never reaches FTS5 as syntax.
+    """
+    parts = []
+    for phrase, term in _QUERY_TOKEN.findall(query):
+        words = _WORD.findall(phrase or term)
+        if not words:
+            continue
+        expression = '"' + " ".join(words) + '"'
+        if term and term.endswith("*"):
+            expression += "*"
+        parts.append(expression)
+    return f" {operator} ".join(parts) or None
+
+
+def bm25_score(rank: float) -> float:
+    """
+    FTS5 reports BM25 as a negative number (lower is better); this flips it so higher is better.
+    """
+    return round(-rank, 4)
+
+
+class FtsIndex:
+    """
+    An on-disk full-text index of keyed documents, backed by SQLite FTS5.
+
+    Each document is a row of `table` (its unique key and the attributes searches filter on) and a row of
+    `table`_fts (its text columns) sharing a rowid, so re-indexing a key replaces its text. Subclasses
+    turn their documents into rows for _index_rows and run their searches on self._conn under self._lock.
+    """
+    def __init__(self, path: Path, table: str, key: str, attributes: dict[str, str], text_columns: list[str],
+                 filtered: Iterable[str] = ()):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.table, self.fts_table, self.key = table, f"{table}_fts", key
+        self.attributes, self.text_columns = list(attributes), list(text_columns)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        columns = "".join(f", {name} {sql_type}" for name, sql_type in attributes.items())
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (rowid INTEGER PRIMARY KEY, {key} TEXT NOT NULL UNIQUE{columns})")
+        for name in filtered:
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_{name} ON {table} ({name})")
+        self._conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts_table} USING fts5("
+                           f"{', '.join(self.text_columns)}, tokenize = '{TOKENIZER}')")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return count
+
+    def _index_rows(self, rows: Iterable[tuple]):
+        """
+        Indexes (or re-indexes) documents given as (key, *attributes, *text columns) tuples.
+        """
+        keyed = [self.key, *self.attributes]
+        upsert = (f"INSERT INTO {self.table} ({', '.join(keyed)}) VALUES ({', '.join('?' for _ in keyed)}) "
+                  f"ON CONFLICT ({self.key}) DO UPDATE SET "
+                  + ", ".join(f"{name} = excluded.{name}" for name in keyed) + " RETURNING rowid")
+        insert_text = (f"INSERT INTO {self.fts_table} (rowid, {', '.join(self.text_columns)}) "
+                       f"VALUES (?, {', '.join('?' for _ in self.text_columns)})")
+        with self._lock:
+            for row in rows:
+                (rowid,) = self._conn.execute(upsert, row[:len(keyed)]).fetchone()
+                self._conn.execute(f"DELETE FROM {self.fts_table} WHERE rowid = ?", (rowid,))
+                self._conn.execute(insert_text, (rowid, *row[len(keyed):]))
+            self._conn.commit()
+
+    def delete(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(f"DELETE FROM {self.table} WHERE {self.key} = ? RETURNING rowid", (key,)).fetchone()
+                if row:
+                    self._conn.execute(f"DELETE FROM {self.fts_table} WHERE rowid = ?", row)
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.execute(f"DELETE FROM {self.fts_table}")
+            self._conn.commit()
+
+    def optimize(self):
+        """
+        Merges the FTS5 index segments, e.g. after a bulk rebuild.
+        """
+        with self._lock:
+            self._conn.execute(f"INSERT INTO {self.fts_table} ({self.fts_table}) VALUES ('optimize')")
+            self._conn.commit()
@@ -0,0 +1,79 @@
+import json
+import logging
+import os
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class IngestCheckpoint:
+    """
+    Persisted progress of the Contracts Finder ingestion.
+
+    The watermark is the last published date up to which every interval has been fetched and
+    merged into the contracts file. Intervals completed after the watermark (they finish out of
+    order when fetched concurrently) are kept in completed_intervals, so a crashed run resumes
+    without fetching them again. The file is rewritten atomically after every change.
+    """
+    def __init__(self, path: Path, initial_start: date):
+        self.path = Path(path)
+        self.initial_start = initial_start
+        self.watermark: Optional[date] = None
+        self.completed_intervals: set[tuple[date, date]] = set()
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, "r") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Could not read checkpoint {self.path}, starting from {self.initial_start}: {e}")
+            return
+        if state.get("watermark"):
+            self.watermark = date.fromisoformat(state["watermark"])
+        self.completed_intervals = {
+            (date.fromisoformat(start), date.fromisoformat(end)) for start, end in state.get("completed_intervals", [])
+        }
+
+    def save(self):
+        state = {
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "completed_intervals": sorted([start.isoformat(), end.isoformat()] for start, end in self.completed_intervals),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def next_start(self) -> date:
+        """
+        The first published date that still needs fetching.
+        """
+        return self.watermark + timedelta(days=1) if self.watermark else self.initial_start
+
+    def pending(self, intervals: list[tuple[date, date]]) -> list[tuple[date, date]]:
+        return [interval for interval in intervals if interval not in self.completed_intervals]
+
+    def mark_completed(self, interval: tuple[date, date]):
+        self.completed_intervals.add(interval)
+        self.save()
+
+    def advance_watermark(self):
+        """
+        Moves the watermark over every contiguous completed interval and forgets those intervals.
+        Call once the completed intervals' records are safely merged into the contracts file.
+        """
+        while True:
+            following = [interval for interval in self.completed_intervals if interval[0] == self.next_start]
+            if not following:
+                break
+            interval = following[0]
+            self.completed_intervals.discard(interval)
+            self.watermark = interval[1]
+        self.save()
@@ -0,0 +1,191 @@
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import pypdfium2 as pdfium
+
+logger = logging.getLogger(__name__)
+
+TESSERACT_CONFIG = r'--psm 6'
+DPI = 200
+# The CPUs this process may run on, which can be fewer than the machine has (containers, taskset).
+OCR_WORKERS = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+# Pages queued or in progress at once. Each worker holds a single rasterised page, so memory is bounded
+# by this window rather than by the length of the document.
+WINDOW_PAGES = 2 * OCR_WORKERS
+# A page whose text layer has fewer letters and digits than this (e.g. a scan with only a stamped page
+# number) is treated as image-only and OCR'd.
+MIN_TEXT_CHARS = 50
+
+
+@dataclass
+class PageTiming:
+    page: int
+    rasterise_seconds: float
+    ocr_seconds: float
+    error: Optional[str] = None
+    method: str = "ocr"
+    text_seconds: float = 0.0
+
+
+@dataclass
+class OcrResult:
+    file: str
+    pages: dict[int, str] = field(default_factory=dict)
+    timings: list[PageTiming] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def timing_summary(self) -> dict:
+        ocr = [timing.ocr_seconds for timing in self.timings if timing.method == "ocr"]
+        rasterise = [timing.rasterise_seconds for timing in self.timings if timing.method == "ocr"]
+        text = [timing.text_seconds for timing in self.timings if timing.method == "text"]
+        return {
+            "file": self.file,
+            "pages": len(self.timings),
+            "text_layer_pages": sum(timing.method == "text" for timing in self.timings),
+            "ocr_pages": sum(timing.method == "ocr" for timing in self.timings),
+            "failed_pages": [timing.page for timing in self.timings if timing.error],
+            "seconds": round(self.seconds, 3),
+            "pages_per_second": round(len(self.timings) / self.seconds, 2) if self.seconds else None,
+            "mean_rasterise_seconds": round(sum(rasterise) / len(rasterise), 3) if rasterise else None,
+            "mean_ocr_seconds": round(sum(ocr) / len(ocr), 3) if ocr else None,
+            "mean_text_layer_seconds": round(sum(text) / len(text), 5) if text else None,
+            "slowest_page": max(self.timings, key=lambda timing: timing.rasterise_seconds + timing.ocr_seconds
+                                + timing.text_seconds).page if self.timings else None,
+        }
+
+
+def _init_worker():
+    # Tesseract's own threading would oversubscribe the cores the pool already uses, one page per process.
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def ocr_page(path: str, page: int, dpi: int = DPI, config: str = TESSERACT_CONFIG) -> tuple[int, str, PageTiming]:
+    """
+    Rasterises and OCRs a single (0-based) page. Runs in a pool worker, so only the path crosses processes.
+    """
+    # Only OCR workers need these; documents with a text layer never load them.
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    started = time.perf_counter()
+    try:
+        image = convert_from_path(path, dpi=dpi, first_page=page + 1, last_page=page + 1)[0]
+    except Exception as e:
+        return page, "", PageTiming(page, time.perf_counter() - started, 0.0, error=f"rasterise: {e}")
+    rasterised = time.perf_counter()
+    try:
+        text = pytesseract.image_to_string(image=image, config=config, output_type=pytesseract.Output.DICT)['text']
+    except Exception as e:
+        return page, "", PageTiming(page, rasterised - started, time.perf_counter() - rasterised, error=f"ocr: {e}")
+    return page, text, PageTiming(page, rasterised - started, time.perf_counter() - rasterised)
+
+
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_ocr_pool() -> ProcessPoolExecutor:
+    """
+    Returns the process-wide OCR pool, sized to the usable CPUs and reused across documents.
+    """
+    global _ocr_pool
+    if _ocr_pool is None:
+        # The pool is first used from the knowledge-base thread; forking a process that has other threads
+        # running (the event loop, HTTP clients) can leave a worker holding a copied, locked lock.
+        _ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS, initializer=_init_worker,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _ocr_pool
+
+
+def ocr_pdf(path: Path, pages: Optional[list[int]] = None, dpi: int = DPI, window_pages: int = WINDOW_PAGES,
+            pool: Optional[ProcessPoolExecutor] = None) -> OcrResult:
+    """
+    OCRs a PDF page by page across a process pool. Pages are rasterised lazily inside the workers and at
+    most window_pages are queued or in progress at once. Pages are returned in order whatever order they
+    finish in.
+
+    Args:
+        pages (list[int], optional): The (0-based) pages to OCR. Defaults to every page.
+    """
+    path = Path(path)
+    result = OcrResult(file=path.name)
+    started = time.perf_counter()
+    pending = list(range(page_count(path))) if pages is None else list(pages)
+    pool = pool or get_ocr_pool()
+
+    in_flight: set[Future] = set()
+    while pending or in_flight:
+        while pending and len(in_flight) < window_pages:
+            in_flight.add(pool.submit(ocr_page, str(path), pending.pop(0), dpi))
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            page, text, timing = future.result()
+            result.timings.append(timing)
+            if timing.error:
+                print(f"Failed page {page + 1} in {path.name} due to: {timing.error}")
+            else:
+                result.pages[page] = text
+
+    result.pages = dict(sorted(result.pages.items()))
+    result.timings.sort(key=lambda timing: timing.page)
+    result.seconds = time.perf_counter() - started
+    logger.info(f"OCR of {path.name}: {result.timing_summary()}")
+    return result
+
+
+def page_count(path: Path) -> int:
+    pdf = pdfium.PdfDocument(str(path))
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def has_text_layer(text: str, min_text_chars: int = MIN_TEXT_CHARS) -> bool:
+    return sum(character.isalnum() for character in text) >= min_text_chars
+
+
+def extract_pdf_text(path: Path, min_text_chars: int = MIN_TEXT_CHARS, dpi: int = DPI,
+                     pool: Optional[ProcessPoolExecutor] = None) -> OcrResult:
+    """
+    Extracts the text of a PDF, reading each page's embedded text layer directly and OCR'ing (see ocr_pdf)
+    only the pages without a usable one.
+    """
+    path = Path(path)
+    result = OcrResult(file=path.name)
+    started = time.perf_counter()
+
+    image_only_pages = []
+    pdf = pdfium.PdfDocument(str(path))
+    try:
+        for page_index in range(len(pdf)):
+            page_started = time.perf_counter()
+            page = pdf[page_index]
+            text_page = page.get_textpage()
+            text = text_page.get_text_bounded()
+            text_page.close()
+            page.close()
+            if has_text_layer(text, min_text_chars):
+                result.pages[page_index] = text
+                result.timings.append(PageTiming(page_index, 0.0, 0.0, method="text",
+                                                 text_seconds=time.perf_counter() - page_started))
+            else:
+                image_only_pages.append(page_index)
+    finally:
+        pdf.close()
+
+    if image_only_pages:
+        ocr_result = ocr_pdf(path, pages=image_only_pages, dpi=dpi, pool=pool)
+        result.pages.update(ocr_result.pages)
+        result.timings.extend(ocr_result.timings)
+
+    result.pages = dict(sorted(result.pages.items()))
+    result.timings.sort(key=lambda timing: timing.page)
+    result.seconds = time.perf_counter() - started
+    logger.info(f"Text extraction of {path.name}: {result.timing_summary()}")
+    return result
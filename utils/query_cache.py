@@ -0,0 +1,75 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+def normalise_query(query: str) -> str:
+    """
+    Case-folds a query, collapses whitespace and drops trailing punctuation, so near-identical
+    queries ("Turnover in 2023?" and "turnover in 2023") share a cache entry.
+    """
+    return " ".join(query.casefold().split()).rstrip("?!. ")
+
+
+class VersionedLRUCache:
+    """
+    A bounded in-memory least-recently-used cache whose entries belong to one version of an index.
+
+    Index versions only increase. A lookup or store for a newer version clears the cache; one for an older
+    version (a search still running against the previous index) is ignored, so stale results are never kept.
+    Each entry remembers how long it took to compute, and hits add that to seconds_saved.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.seconds_saved = 0.0
+        self._entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_current(self, version: int) -> bool:
+        if self.version is None or version > self.version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.version = version
+        return version == self.version
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key) if self._is_current(version) else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.seconds_saved += entry[1]
+            return entry[0]
+
+    def put(self, key: Hashable, version: int, value: Any, seconds: float):
+        with self._lock:
+            if not self._is_current(version):
+                return
+            self._entries[key] = (value, seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "seconds_saved": round(self.seconds_saved, 3),
+        }
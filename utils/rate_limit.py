@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+
+
+class RateLimitScheduler:
+    """
+    Client-side token bucket for a per-key API quota (by default the Companies House one, 600 requests
+    per rolling 5 minutes). Callers are admitted one at a time in arrival order, 429 responses
+    are retried after Retry-After (or a jittered exponential backoff), and the bucket is kept in
+    step with the X-Ratelimit-Remain header Companies House returns.
+    """
+    def __init__(self, capacity: int = 600, window_seconds: float = 300.0, max_retries: int = 3,
+                 backoff_base: float = 1.0, backoff_cap: float = 60.0, name: str = "Companies House"):
+        self.name = name
+        self.capacity = capacity
+        self.window_seconds = window_seconds
+        self.refill_rate = capacity / window_seconds
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._throttled = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        # asyncio.Lock wakes waiters in FIFO order, which is what makes the queue fair.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    async def acquire(self):
+        """
+        Waits until a request may be sent and consumes one token.
+        """
+        self._waiting += 1
+        try:
+            async with self._get_lock():
+                while True:
+                    self._refill()
+                    blocked_for = self._blocked_until - time.monotonic()
+                    if blocked_for > 0:
+                        await asyncio.sleep(blocked_for)
+                    elif self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    else:
+                        await asyncio.sleep((1 - self._tokens) / self.refill_rate)
+        finally:
+            self._waiting -= 1
+
+    def _sync_with_headers(self, response: httpx.Response):
+        remaining = response.headers.get("X-Ratelimit-Remain")
+        if remaining is not None and remaining.isdigit():
+            self._refill()
+            self._tokens = min(self._tokens, float(remaining))
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = response.headers.get("Retry-After")
+        delay = None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    delay = None
+        if delay is None or delay < 0:
+            delay = min(self.backoff_cap, self.backoff_base * 2 ** attempt)
+        # Jitter spreads out callers that were throttled together.
+        return delay + random.uniform(0, self.backoff_base)
+
+    async def run(self, send):
+        """
+        Sends a request through the bucket, retrying on 429.
+
+        Args:
+            send: A zero-argument callable returning an awaitable httpx.Response.
+
+        Returns:
+            The first non-429 response, or the last 429 once retries are exhausted.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire()
+            response = await send()
+            self._sync_with_headers(response)
+            if response.status_code != 429:
+                return response
+
+            self._throttled += 1
+            self._tokens = 0.0
+            if attempt == self.max_retries:
+                # No retry follows, so don't hold back the other callers for one.
+                logging.warning(f"{self.name} rate limit hit, giving up after {self.max_retries} retries.")
+                return response
+            delay = self._retry_delay(response, attempt)
+            logging.warning(f"{self.name} rate limit hit, retrying in {delay:.1f}s (retry {attempt + 1}/{self.max_retries}).")
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+            # Releases the connection of a streamed response; a no-op for one already read.
+            await response.aclose()
+
+    def stats(self) -> dict:
+        """
+        Reports the current queue depth and remaining request budget.
+        """
+        self._refill()
+        return {
+            "queue_depth": self._waiting,
+            "remaining_budget": int(self._tokens),
+            "capacity": self.capacity,
+            "window_seconds": self.window_seconds,
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 2),
+            "throttled_responses": self._throttled,
+        }
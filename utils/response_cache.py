@@ -0,0 +1,142 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    A small persistent cache of successful Companies House responses backed by SQLite.
+
+    Entries expire after a per-endpoint TTL, the table is bounded to max_entries with
+    least-recently-used eviction, and expired entries keep their ETag so they can be
+    revalidated with If-None-Match instead of re-downloaded.
+    """
+    def __init__(self, path: Path, max_entries: int = 5000, default_ttl_seconds: float = 86400.0,
+                 ttl_seconds: Optional[dict] = None):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.ttl_seconds = ttl_seconds or {}
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                expires_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_accessed ON responses (last_accessed)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(company_number: str, purpose: str, query_params: Optional[dict]) -> str:
+        return json.dumps([company_number, purpose, sorted((query_params or {}).items())], default=str)
+
+    def ttl_for(self, purpose: str) -> float:
+        # The profile endpoint has no purpose, so it is configured under "profile".
+        return float(self.ttl_seconds.get(purpose or "profile", self.default_ttl_seconds))
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Returns the stored entry (fresh or stale) and marks it as recently used, or None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status_code, headers, body, etag, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_accessed = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+
+        url, status_code, headers, body, etag, expires_at = row
+        return {
+            "url": url,
+            "status_code": status_code,
+            "headers": json.loads(headers),
+            "body": body,
+            "etag": etag,
+            "fresh": expires_at > time.time(),
+        }
+
+    def put(self, key: str, purpose: str, response: httpx.Response):
+        """
+        Stores a successful response and evicts the least recently used entries beyond max_entries.
+        """
+        now = time.time()
+        headers = {k: v for k, v in response.headers.items() if k.lower() in ("content-type", "etag", "last-modified")}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, str(response.request.url), response.status_code, json.dumps(headers), response.content,
+                 response.headers.get("ETag"), now + self.ttl_for(purpose), now),
+            )
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                excess = count - self.max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_accessed LIMIT ?)",
+                    (excess,),
+                )
+                self.evictions += excess
+            self._conn.commit()
+
+    def refresh(self, key: str, purpose: str):
+        """
+        Extends the lifetime of an entry after the API confirmed it is unchanged (304).
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_accessed = ? WHERE key = ?",
+                (now + self.ttl_for(purpose), now, key),
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def to_response(entry: dict) -> httpx.Response:
+        return httpx.Response(
+            status_code=entry["status_code"],
+            headers=entry["headers"],
+            content=entry["body"],
+            request=httpx.Request("GET", entry["url"]),
+        )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidations,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
@@ -1,19 +1,43 @@
+from __future__ import annotations
 from dotenv import load_dotenv
 load_dotenv()
+import hashlib
+import json
 import os
+import threading
+import time
 from pathlib import Path
-from langchain_core.documents import Document
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_community.vectorstores import FAISS
-from utils.file_reader import read_pdf_to_text
+from typing import TYPE_CHECKING, Callable, Optional
 import asyncio
+from utils.config import config
+from utils.query_cache import VersionedLRUCache, normalise_query
 
+# langchain, FAISS and the PDF readers take seconds to import, so they are imported where they are used:
+# the server can then start (and register the knowledge base tools) before the index is loaded.
+if TYPE_CHECKING:
+    from langchain_core.documents import Document
+    from langchain_core.embeddings import Embeddings
+    from langchain_community.vectorstores import FAISS
+    from utils.chunk_index import ChunkKeywordIndex
+    from utils.document_store import DocumentStore
+
+
+KNOWLEDGE_BASE_SETTINGS = config.get("knowledge_base", {})
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CHUNK_SIZE = 1500
+CHUNK_OVERLAP = 300
+# Stored next to the FAISS files: which version of each PDF is indexed, and the ids of its chunks.
+MANIFEST_FILE = "manifest.json"
+# Reciprocal rank fusion constant: a hit's fused score is the sum of 1 / (RRF_K + rank) over the rankings.
+RRF_K = 60
+# Each ranking contributes this many candidates per requested hit before fusion.
+CANDIDATES_PER_HIT = 4
 
 
 def convert_dict_to_langchain_doc(dictionary: dict) -> list:
+    from langchain_core.documents import Document
+
     documents = []
     for file_name in dictionary:
         for page, text in dictionary[file_name].items():
@@ -26,112 +50,429 @@ def convert_dict_to_langchain_doc(dictionary: dict) -> list:
     return documents
 
 def read_pdf_to_langchain_document(file_name, directory:Path):
+    from utils.file_reader import read_pdf_to_text
+
     text_dictionary = read_pdf_to_text(DATA_DIR=directory, file=file_name)
     text_doc_list = convert_dict_to_langchain_doc(text_dictionary)
     return text_doc_list
 
 def store_doc_in_new_vector_store(doc_list:list):
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain_community.vectorstores import FAISS
+    from utils.embeddings import get_embeddings
+
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
     chunks = text_splitter.split_documents(documents=doc_list)
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+    embeddings = get_embeddings()
     vector_store = FAISS.from_documents(chunks, embeddings)
     vector_store.save_local("faiss_index")
     return vector_store
 
-async def all_docs_to_new_vector_store_async(docs_directory: Path) -> FAISS:
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(index_path: Path) -> Optional[dict]:
+    manifest_path = Path(index_path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        return None
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def save_manifest(index_path: Path, manifest: dict):
+    manifest_path = Path(index_path) / MANIFEST_FILE
+    tmp_path = manifest_path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def chunk_pdf(path: Path, file_name: str, file_hash: str, company_number: Optional[str] = None) -> list[Document]:
     """
-    Asynchronously reads all PDFs, creates embeddings, and saves them to a new vector store.
+    Reads and splits the PDF at path into chunks whose ids are derived from its file_name and content hash.
+    Every chunk is tagged with company_number (None if the PDF is not a known filing).
+
+    Raises:
+        RuntimeError: If some pages could not be read or OCR'd. Any other error reading the file is raised as is.
     """
-    file_name_list = [p.name for p in docs_directory.glob('*.pdf')]
-    documents = []
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from utils.pdf_ocr import extract_pdf_text
 
-    # This part remains synchronous, but could be parallelized with asyncio.gather
-    for file_name in file_name_list:
-        text_dict_for_file = read_pdf_to_text(DATA_DIR=docs_directory, file=file_name)
-        if file_name in text_dict_for_file:
-            for page, text in text_dict_for_file[file_name].items():
-                doc = Document(
-                    page_content=text,
-                    metadata={"source": file_name, "page": page + 1}
-                )
-                documents.append(doc)
-
-    print(f"Processing {len(documents)} pages into a new knowledge base...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1500, chunk_overlap=300)
-    chunks = text_splitter.split_documents(documents=documents)
-    
-    # Extract the text content from the Document chunks
-    chunk_texts = [chunk.page_content for chunk in chunks]
-
-    print("Creating embeddings asynchronously...")
-    embeddings_model = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-    
-    # Asynchronously create embeddings for all the chunk texts
-    vector_embeddings = await embeddings_model.aembed_documents(chunk_texts)
-
-    # Combine the texts and their corresponding vector embeddings
-    text_embedding_pairs = list(zip(chunk_texts, vector_embeddings))
-
-    # Get the metadata from the original chunks
-    metadatas = [chunk.metadata for chunk in chunks]
-    
-    # Create the FAISS index from embeddings, letting the constructor handle the docstore
-    vector_store = FAISS.from_embeddings(
-        text_embeddings=text_embedding_pairs, 
-        embedding=embeddings_model,
-        metadatas=metadatas
-    )
-
-    print("Saving new knowledge base...")
-    # NOTE: save_local is synchronous
-    vector_store.save_local("faiss_index")
-    print("New knowledge base created and saved as 'faiss_index'")
+    result = extract_pdf_text(Path(path))
+    failed_pages = [timing.page + 1 for timing in result.timings if timing.error]
+    if failed_pages:
+        raise RuntimeError(f"pages {failed_pages} could not be read")
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    chunks = text_splitter.split_documents(documents=convert_dict_to_langchain_doc({file_name: result.pages}))
+    for i, chunk in enumerate(chunks):
+        chunk.id = f"{file_name}#{file_hash[:12]}#{i}"
+        chunk.metadata["company_number"] = company_number
+    return chunks
+
+
+def _changed_files(docs_directory: Path, manifest_files: dict) -> dict:
+    """
+    Fingerprints every PDF as {file_name: {"sha256", "size", "mtime_ns"}}. Files whose size and mtime match
+    the manifest keep their recorded hash, so an unchanged corpus is not re-read.
+    """
+    files = {}
+    for path in sorted(docs_directory.glob('*.pdf')):
+        stat = path.stat()
+        known = manifest_files.get(path.name)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            files[path.name] = {"sha256": known["sha256"], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        else:
+            files[path.name] = {"sha256": file_sha256(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    return files
+
+
+async def sync_vector_store_async(docs_directory: Path, index_path: Path, embeddings: Optional[Embeddings] = None,
+                                  full_rebuild: bool = False,
+                                  on_progress: Optional[Callable[[str, int, int], None]] = None,
+                                  keyword_index: Optional[ChunkKeywordIndex] = None,
+                                  company_numbers: Optional[dict[str, str]] = None,
+                                  stored_files: Optional[dict[str, dict]] = None) -> tuple[Optional[FAISS], dict]:
+    """
+    Brings the FAISS index at index_path, and the keyword index next to it, in line with the PDFs in
+    docs_directory. Only added or changed PDFs are read, chunked and embedded; the chunks of changed and
+    deleted PDFs are removed. PDFs that cannot be read (or have pages that fail OCR) are left out of the
+    manifest, so the next sync tries them again.
+    on_progress(stage, done, total) is called as PDFs are read ("reading") and once embedded ("embedding").
+    company_numbers maps the SHA-256 of known filings to their company number (see
+    DocumentStore.company_numbers_by_sha256); the chunks of other PDFs have no company number.
+    stored_files are filings downloaded to the document store (see DocumentStore.pdf_files), indexed along
+    with docs_directory under their "filings/..." names. A filing also copied into docs_directory is only
+    indexed under the copy's name.
+
+    The manifest's index version goes up whenever the indexed chunks change, so caches of search results
+    can tell when they are stale.
+
+    Returns:
+        tuple: (the vector store, or None if there are no documents,
+                {"added", "changed", "deleted", "failed", "unchanged", "chunks_embedded", "index_version"})
+    """
+    from langchain_community.vectorstores import FAISS
+    from utils.chunk_index import KEYWORD_INDEX_FILE, ChunkKeywordIndex, normalise_company_number
+    from utils.embeddings import get_embeddings
+
+    embeddings = embeddings or get_embeddings()
+    company_numbers = dict(company_numbers or {})
+    index_path = Path(index_path)
+    keyword_index = keyword_index or ChunkKeywordIndex(index_path / KEYWORD_INDEX_FILE)
+    model = getattr(embeddings, "model", type(embeddings).__name__)
+
+    previous = load_manifest(index_path)
+    manifest = None if full_rebuild else previous
+    vector_store = None
+    rebuilt = False
+    if manifest is not None and manifest.get("embedding_model") == model and (index_path / "index.faiss").exists():
+        vector_store = FAISS.load_local(index_path, embeddings, allow_dangerous_deserialization=True)
+    else:
+        # No manifest (or another embedding model): the existing index cannot be updated in place.
+        # The version carries on from the replaced index, so it still only goes up.
+        manifest = {"embedding_model": model, "version": (previous or {}).get("version", 0), "files": {}}
+        keyword_index.clear()
+        rebuilt = True
+
+    indexed = manifest["files"]
+    current = _changed_files(docs_directory, indexed)
+    paths = {name: Path(docs_directory) / name for name in current}
+    copied = {entry["sha256"] for entry in current.values()}
+    for name, stored in (stored_files or {}).items():
+        if stored["sha256"] in copied:
+            continue
+        # The store records each blob's hash, so stored filings are never re-hashed.
+        stat = Path(stored["path"]).stat()
+        current[name] = {"sha256": stored["sha256"], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        paths[name] = Path(stored["path"])
+        if stored.get("company_number"):
+            company_numbers.setdefault(stored["sha256"], stored["company_number"])
+    added = [name for name in current if name not in indexed]
+    changed = [name for name in current if name in indexed and indexed[name]["sha256"] != current[name]["sha256"]]
+    deleted = [name for name in indexed if name not in current]
+
+    for name in changed + deleted:
+        del indexed[name]
+
+    chunks, failed = [], []
+    to_read = added + changed
+    for done, name in enumerate(to_read, start=1):
+        try:
+            company_number = company_numbers.get(current[name]["sha256"])
+            file_chunks = chunk_pdf(paths[name], name, current[name]["sha256"],
+                                    normalise_company_number(company_number) if company_number else None)
+        except Exception as e:
+            print(f"Failed to read {name}, it will be retried on the next sync: {e}")
+            failed.append(name)
+        else:
+            indexed[name] = dict(current[name], chunk_ids=[chunk.id for chunk in file_chunks])
+            chunks.extend(file_chunks)
+        if on_progress:
+            on_progress("reading", done, len(to_read))
+    # Unchanged files may have been touched; keep their new mtime so they are not re-hashed next time.
+    for name in indexed:
+        indexed[name].update(size=current[name]["size"], mtime_ns=current[name]["mtime_ns"])
+
+    # The index is saved before the manifest, so a sync interrupted in between leaves the manifest behind the
+    # index. The index is reconciled with the chunk ids the manifest now lists rather than with the manifest's
+    # changes: only chunks the index holds are deleted, and chunks it already holds are not embedded again.
+    stored_ids = set(vector_store.index_to_docstore_id.values()) if vector_store is not None else set()
+    listed_ids = {chunk_id for entry in indexed.values() for chunk_id in entry["chunk_ids"]}
+    stale_ids = [chunk_id for chunk_id in stored_ids if chunk_id not in listed_ids]
+    if stale_ids:
+        vector_store.delete(stale_ids)
+        keyword_index.delete(stale_ids)
+    chunks = [chunk for chunk in chunks if chunk.id not in stored_ids]
+
+    if chunks:
+        print(f"Embedding {len(chunks)} chunks from {len(added)} added and {len(changed)} changed PDFs...")
+        texts = [chunk.page_content for chunk in chunks]
+        vectors = await embeddings.aembed_documents(texts)
+        metadatas = [chunk.metadata for chunk in chunks]
+        ids = [chunk.id for chunk in chunks]
+        if vector_store is None:
+            vector_store = FAISS.from_embeddings(text_embeddings=list(zip(texts, vectors)), embedding=embeddings,
+                                                 metadatas=metadatas, ids=ids)
+        else:
+            vector_store.add_embeddings(text_embeddings=list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+        keyword_index.add(chunks)
+        if on_progress:
+            on_progress("embedding", len(chunks), len(chunks))
+    if vector_store is not None and len(keyword_index) != len(vector_store.index_to_docstore_id):
+        # An index built before the keyword index existed (or an interrupted sync): re-index every chunk.
+        keyword_index.clear()
+        keyword_index.add(vector_store.docstore.search(chunk_id) for chunk_id in vector_store.index_to_docstore_id.values())
 
+    manifest["version"] = manifest.get("version", 0) + (1 if chunks or stale_ids or rebuilt else 0)
+    stats = {"added": added, "changed": changed, "deleted": deleted, "failed": failed,
+             "unchanged": len(current) - len(added) - len(changed), "chunks_embedded": len(chunks),
+             "index_version": manifest["version"]}
+    if vector_store is not None and (chunks or stale_ids or not (index_path / "index.faiss").exists()):
+        vector_store.save_local(index_path)
+    if vector_store is not None:
+        index_path.mkdir(parents=True, exist_ok=True)
+        save_manifest(index_path, manifest)
+    print(f"Knowledge base is up to date: {stats}")
+    return vector_store, stats
+
+
+async def all_docs_to_new_vector_store_async(docs_directory: Path, index_path: Path = Path("faiss_index")) -> FAISS:
+    """
+    Asynchronously reads all PDFs, creates embeddings, and saves them to a new vector store.
+    """
+    vector_store, _ = await sync_vector_store_async(docs_directory, index_path, full_rebuild=True)
     return vector_store
 
-class KnowledgeBaseTool(): 
-    def __init__(self,index_directory, index_file):
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = RRF_K) -> list[tuple[str, float]]:
+    """
+    Fuses rankings of chunk ids (best first) into one: each id scores the sum of 1 / (k + rank) over the
+    rankings it appears in, so chunks ranked well by both keyword and vector search come first.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class KnowledgeBaseTool():
+    def __init__(self,index_directory, index_file, docs_directory: Path = DATA_DIR,
+                 document_store: Optional[DocumentStore] = None):
         self.index_dir = index_directory
         self.index_file = index_file
         self.index_path = os.path.join(self.index_dir, self.index_file)
+        self.docs_directory = Path(docs_directory)
+        # Where the company numbers of downloaded filings are looked up; defaults to the shared store.
+        self.document_store = document_store
 
         """
-        Initializes the RAG retriever by loading the vector store.
+        Initializes the RAG retriever without touching the index: call start_background() to load it
+        (indexing any PDFs added, changed or deleted since the last run) without blocking the server.
         """
-        if not os.path.exists(self.index_path):
-            print("Loading PDFs into knowledge base for the first time. This may take a few minutes.")
-            asyncio.run(all_docs_to_new_vector_store_async(docs_directory=DATA_DIR))
-        
-        # Ensure the same embedding model as during indexing 
-        embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-        
-        # Load the vector store
-        self.vector_store = FAISS.load_local(
-            self.index_path, 
-            embeddings, 
-            allow_dangerous_deserialization=True
-        )
-        
-
-        
-        # Create a retriever
-        self.retriever = self.vector_store.as_retriever(search_kwargs={"k": 5})
-        print("Knowledge Base Tool initialized successfully.")
-
-    def search(self, query: str) -> str:
+        self.embeddings = None
+        self.vector_store = None
+        self.keyword_index: Optional[ChunkKeywordIndex] = None
+        # The vector store, its {chunk id: FAISS position} map and index version, swapped in together after each refresh.
+        self._searchable: Optional[tuple[FAISS, dict[str, int], int]] = None
+        # Both caches are emptied when a refresh changes the index version.
+        self.result_cache = VersionedLRUCache(int(KNOWLEDGE_BASE_SETTINGS.get("result_cache_size", 256)))
+        self.query_embedding_cache = VersionedLRUCache(int(KNOWLEDGE_BASE_SETTINGS.get("query_embedding_cache_size", 1024)))
+        self.state = "not_started"  # not_started, building, ready or failed
+        self.progress = 0
+        self.error: Optional[str] = None
+        self.last_refresh: Optional[dict] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._searchable is not None or self.state == "ready"
+
+    def _on_progress(self, stage: str, done: int, total: int):
+        # Reading and OCR'ing PDFs dominates, so it accounts for the first 90%.
+        self.progress = int(90 * done / total) if stage == "reading" and total else 99
+
+    def start_background(self) -> bool:
         """
-        Searches the knowledge base for relevant documents and returns them as a string.
-        This is the function that will be exposed as a tool.
+        Loads or updates the index in a background thread. Returns False if a build is already running.
         """
-        print(f"Searching for: {query}")
-        retrieved_docs = self.retriever.invoke(query)
-        
-        # Format the retrieved documents into a single string
-        context = "\n\n".join([doc.page_content for doc in retrieved_docs])
-        return context
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self.state, self.progress, self.error = "building", 0, None
+            self._thread = threading.Thread(target=self._build, name="knowledge-base-build", daemon=True)
+            self._thread.start()
+            return True
+
+    def _build(self):
+        started = time.perf_counter()
+        try:
+            stats = asyncio.run(self.refresh_async())
+            self.state, self.progress = "ready", 100
+            print(f"Knowledge Base Tool initialized successfully in {time.perf_counter() - started:.1f}s: {stats}")
+        except Exception as e:
+            self.state, self.error = "failed", str(e)
+            print(f"Failed to build the knowledge base due to: {e}")
+
+    async def refresh_async(self) -> dict:
+        """
+        Picks up PDFs added to, changed in or deleted from the data directory, and filings downloaded to the
+        document store, without a full rebuild.
+        """
+        from utils.chunk_index import KEYWORD_INDEX_FILE, ChunkKeywordIndex
+        from utils.document_store import get_document_store
+        from utils.embeddings import get_embeddings
+
+        self.embeddings = self.embeddings or get_embeddings()
+        self.keyword_index = self.keyword_index or ChunkKeywordIndex(Path(self.index_path) / KEYWORD_INDEX_FILE)
+        document_store = self.document_store or get_document_store()
+        vector_store, stats = await sync_vector_store_async(docs_directory=self.docs_directory,
+                                                            index_path=Path(self.index_path), embeddings=self.embeddings,
+                                                            on_progress=self._on_progress, keyword_index=self.keyword_index,
+                                                            company_numbers=document_store.company_numbers_by_sha256(),
+                                                            stored_files=document_store.pdf_files())
+        # Searches keep using the old store until the new one is swapped in.
+        self.vector_store = vector_store
+        self._searchable = None if vector_store is None else (
+            vector_store, {chunk_id: position for position, chunk_id in vector_store.index_to_docstore_id.items()},
+            stats["index_version"])
+        self.last_refresh = stats
+        return stats
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "progress": self.progress,
+            "error": self.error,
+            "last_refresh": self.last_refresh,
+            "index_version": self._searchable[2] if self._searchable else None,
+            "result_cache": self.result_cache.stats(),
+            "query_embedding_cache": self.query_embedding_cache.stats(),
+        }
+
+    def _embed_query(self, query: str, version: int) -> list[float]:
+        key = (self.embeddings.model, query)
+        vector = self.query_embedding_cache.get(key, version)
+        if vector is None:
+            started = time.perf_counter()
+            vector = self.embeddings.embed_query(query)
+            self.query_embedding_cache.put(key, version, vector, time.perf_counter() - started)
+        return vector
+
+    def _vector_search(self, vector_store: FAISS, positions: dict[str, int], version: int, query: str, limit: int,
+                       allowed: Optional[list[str]]) -> dict[str, float]:
+        """
+        Returns {chunk id: L2 distance} for the nearest chunks, nearest first. When allowed is given, only
+        those chunks are searched, so a selective filter still returns its nearest chunks.
+        """
+        import faiss
+        import numpy as np
 
+        # FAISS rejects k=0, e.g. once every PDF has been removed and the index is empty.
+        if limit <= 0 or vector_store.index.ntotal == 0:
+            return {}
 
+        vector = np.array([self._embed_query(query, version)], dtype=np.float32)
+        params = None
+        if allowed is not None:
+            selected = np.array([positions[chunk_id] for chunk_id in allowed if chunk_id in positions], dtype=np.int64)
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(selected))
+        distances, indices = vector_store.index.search(vector, min(limit, vector_store.index.ntotal), params=params)
+        return {vector_store.index_to_docstore_id[i]: float(distance)
+                for distance, i in zip(distances[0], indices[0]) if i != -1}
+
+    def search(self, query: str, k: int = 5, source: Optional[str] = None, company_number: Optional[str] = None,
+               page_from: Optional[int] = None, page_to: Optional[int] = None, mode: str = "hybrid") -> list[dict]:
+        """
+        Searches the knowledge base, fusing keyword (BM25) and vector similarity rankings.
+        This is the function that will be exposed as a tool.
+
+        Results are cached by normalised query and arguments (see utils.query_cache) until the index changes.
+
+        Args:
+            query (str): The question or keywords, e.g. a company number or a figure.
+            k (int): Number of hits to return.
+            source (str, optional): Only search this PDF (file name).
+            company_number (str, optional): Only search filings of this company.
+            page_from (int, optional): First page to search (1-based).
+            page_to (int, optional): Last page to search.
+            mode (str): "hybrid", or "keyword" / "vector" for a single ranking.
+
+        Returns:
+            list: Up to k hits, best first, as {"text", "source", "page", "company_number", "chunk_id",
+                  "score", "keyword_score", "vector_distance"}; a score is None if that ranking missed the chunk.
+        """
+        print(f"Searching for: {query}")
+        if self._searchable is None:
+            return []
+        vector_store, positions, version = self._searchable
+        query = normalise_query(query)
+        key = (query, k, source, company_number, page_from, page_to, mode)
+        cached = self.result_cache.get(key, version)
+        if cached is not None:
+            return [dict(hit) for hit in cached]
 
+        started = time.perf_counter()
+        hits = self._search(vector_store, positions, version, query, k, source, company_number, page_from, page_to, mode)
+        self.result_cache.put(key, version, hits, time.perf_counter() - started)
+        return [dict(hit) for hit in hits]
 
+    def _search(self, vector_store: FAISS, positions: dict[str, int], version: int, query: str, k: int,
+                source: Optional[str], company_number: Optional[str], page_from: Optional[int], page_to: Optional[int],
+                mode: str) -> list[dict]:
+        filters = dict(source=source, company_number=company_number, page_from=page_from, page_to=page_to)
+        allowed = None
+        if any(value is not None for value in filters.values()):
+            allowed = self.keyword_index.chunk_ids(**filters)
+            if not allowed:
+                return []
 
+        candidates = k * CANDIDATES_PER_HIT
+        keyword_hits = dict(self.keyword_index.search(query, limit=candidates, **filters)) if mode != "vector" else {}
+        vector_hits = self._vector_search(vector_store, positions, version, query, candidates, allowed) if mode != "keyword" else {}
 
+        hits = []
+        for chunk_id, score in reciprocal_rank_fusion([list(keyword_hits), list(vector_hits)]):
+            document = vector_store.docstore.search(chunk_id)
+            if isinstance(document, str):
+                # Indexed by a refresh that has not been swapped in yet.
+                continue
+            hits.append({
+                "text": document.page_content,
+                "source": document.metadata.get("source"),
+                "page": document.metadata.get("page"),
+                "company_number": document.metadata.get("company_number"),
+                "chunk_id": chunk_id,
+                "score": round(score, 5),
+                "keyword_score": keyword_hits.get(chunk_id),
+                "vector_distance": round(vector_hits[chunk_id], 4) if chunk_id in vector_hits else None,
+            })
+            if len(hits) == k:
+                break
+        return hits